@@ -1,8 +1,19 @@
 import { MongoClient } from 'mongodb'
+import { createHash } from 'crypto'
 import { v4 as uuidv4 } from 'uuid'
 import { NextResponse } from 'next/server'
 import OpenAI from 'openai'
 import { createClient } from '@supabase/supabase-js'
+import { ensureIndexes } from '@/lib/mongo-indexes'
+import { TtlCache } from '@/lib/ttl-cache'
+import { createSseStream, SSE_HEADERS } from '@/lib/sse'
+import { ServerTiming, runWithTiming, timed, applyServerTiming } from '@/lib/server-timing'
+import { InFlight } from '@/lib/in-flight'
+import { ResilientCompletions, TokenBucket, CircuitBreaker, UpstreamUnavailableError } from '@/lib/openai-call'
+import { parseAiJson, ACCOMMODATIONS_SCHEMA, INSIGHTS_SCHEMA, ADVANCED_REVIEW_SCHEMA } from '@/lib/ai-json'
+import { EventBuffer, onShutdown } from '@/lib/event-buffer'
+import { UserDirectory } from '@/lib/user-directory'
+import { SessionEvents } from '@/lib/session-events'
 
 // MongoDB connection
 let client
@@ -10,24 +21,135 @@ let db
 
 async function connectToMongo() {
   if (!client) {
-    client = new MongoClient(process.env.MONGO_URL)
-    await client.connect()
-    db = client.db(process.env.DB_NAME)
+    await timed('mongo_connect', async () => {
+      client = new MongoClient(process.env.MONGO_URL)
+      await client.connect()
+      db = client.db(process.env.DB_NAME)
+      await ensureIndexes(db)
+    })
   }
   return db
 }
 
+// user_events are buffered and written with insertMany, off the request path
+const events = new EventBuffer(async (batch) => {
+  const database = await connectToMongo()
+  await database.collection('user_events').insertMany(batch, { ordered: false })
+}, {
+  maxBatch: parseInt(process.env.EVENT_BATCH_SIZE || '500', 10),
+  flushIntervalMs: parseInt(process.env.EVENT_FLUSH_MS || '250', 10),
+  highWaterMark: parseInt(process.env.EVENT_HIGH_WATER || '5000', 10),
+  maxPending: parseInt(process.env.EVENT_MAX_PENDING || '20000', 10)
+})
+
+// Side effects (notification emails) that run after the response is sent
+const backgroundTasks = new Set()
+
+function runInBackground(promise) {
+  backgroundTasks.add(promise)
+  promise
+    .catch(error => console.error('Background task failed:', error))
+    .finally(() => backgroundTasks.delete(promise))
+}
+
+// Background tasks may still log events, so they settle before the last flush.
+// `next dev` re-evaluates this module on every reload, so the listeners are
+// registered once per process and always run the latest module's task.
+globalThis.__eventShutdownTask = async () => {
+  await Promise.allSettled([...backgroundTasks])
+  await events.close()
+}
+if (!globalThis.__eventShutdownRegistered) {
+  globalThis.__eventShutdownRegistered = true
+  onShutdown(() => globalThis.__eventShutdownTask())
+}
+
 // Supabase client for server-side operations
 const supabase = createClient(
   process.env.NEXT_PUBLIC_SUPABASE_URL,
   process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY
 )
 
-// OpenAI connection
+// OpenAI connection (OPENAI_BASE_URL points it at a local stand-in for perf runs)
 const openai = new OpenAI({
   apiKey: process.env.OPENAI_API_KEY,
+  baseURL: process.env.OPENAI_BASE_URL || undefined,
+  maxRetries: 0
+})
+
+// Every completion goes through one policy: paced to the account quota
+// (OPENAI_RPM / OPENAI_BURST), retried with jittered backoff on 429/5xx within
+// a per-call deadline, and failed fast with a 503 while the breaker is open
+const completions = new ResilientCompletions(openai, {
+  deadlineMs: parseInt(process.env.OPENAI_DEADLINE_MS || '45000', 10),
+  maxRetries: parseInt(process.env.OPENAI_MAX_RETRIES || '3', 10),
+  limiter: new TokenBucket({
+    ratePerMinute: parseInt(process.env.OPENAI_RPM || '500', 10),
+    burst: parseInt(process.env.OPENAI_BURST || '50', 10)
+  }),
+  breaker: new CircuitBreaker({
+    failureThreshold: parseInt(process.env.OPENAI_BREAKER_THRESHOLD || '5', 10),
+    cooldownMs: parseInt(process.env.OPENAI_BREAKER_COOLDOWN_MS || '10000', 10)
+  })
 })
 
+// Identity cache: a page that calls several endpoints would otherwise pay the
+// Supabase auth + profile round-trips on every request. Tokens map to their
+// user for a short TTL (never past the JWT's own expiry); profiles are keyed by
+// user id and dropped with invalidateUserProfile wherever the API changes the
+// plan. Changes made elsewhere (Stripe checkout, client-side profile edits)
+// arrive through POST /auth/profile/refresh, which the client calls after them.
+const authTokenCache = new TtlCache({
+  maxEntries: parseInt(process.env.AUTH_CACHE_MAX_ENTRIES || '1000', 10),
+  ttlMs: parseInt(process.env.AUTH_CACHE_TTL_MS || '60000', 10)
+})
+
+const profileCache = new TtlCache({
+  maxEntries: parseInt(process.env.AUTH_CACHE_MAX_ENTRIES || '1000', 10),
+  ttlMs: parseInt(process.env.AUTH_CACHE_TTL_MS || '60000', 10)
+})
+
+function tokenCacheKey(token) {
+  return createHash('sha256').update(token).digest('hex')
+}
+
+// Milliseconds until the token's `exp` claim, or the cache TTL for opaque tokens
+function tokenTtl(token) {
+  try {
+    const payload = JSON.parse(Buffer.from(token.split('.')[1], 'base64url').toString('utf8'))
+    if (typeof payload.exp === 'number') {
+      return Math.min(authTokenCache.ttlMs, payload.exp * 1000 - Date.now())
+    }
+  } catch (error) {
+    // Not a JWT
+  }
+  return authTokenCache.ttlMs
+}
+
+async function getUserProfile(userId) {
+  const cached = profileCache.get(userId)
+  if (cached) {
+    return cached
+  }
+
+  const { data: profile, error } = await timed('supabase_profile', () => supabase
+    .from('user_profiles')
+    .select('*')
+    .eq('id', userId)
+    .single())
+
+  if (error || !profile) {
+    return null
+  }
+  profileCache.set(userId, profile)
+  return profile
+}
+
+function invalidateUserProfile(userId) {
+  profileCache.delete(userId)
+  users.invalidate(userId)
+}
+
 // Auth middleware
 const withAuth = async (request) => {
   const authHeader = request.headers.get('authorization')
@@ -39,20 +161,27 @@ const withAuth = async (request) => {
   const token = authHeader.split(' ')[1]
 
   try {
-    const { data: { user }, error: userError } = await supabase.auth.getUser(token)
-    
-    if (userError || !user) {
-      return { user: null, profile: null, error: 'Invalid token' }
+    const tokenKey = tokenCacheKey(token)
+    let user = authTokenCache.get(tokenKey)
+
+    if (!user) {
+      const { data, error: userError } = await timed('supabase_auth', () => supabase.auth.getUser(token))
+
+      if (userError || !data.user) {
+        return { user: null, profile: null, error: 'Invalid token' }
+      }
+
+      user = data.user
+      const ttl = tokenTtl(token)
+      if (ttl > 0) {
+        authTokenCache.set(tokenKey, user, ttl)
+      }
     }
 
     // Get user profile from Supabase
-    const { data: profile, error: profileError } = await supabase
-      .from('user_profiles')
-      .select('*')
-      .eq('id', user.id)
-      .single()
+    const profile = await getUserProfile(user.id)
 
-    if (profileError || !profile) {
+    if (!profile) {
       return { user, profile: null, error: 'Profile not found' }
     }
 
@@ -67,11 +196,257 @@ const withAuth = async (request) => {
 function handleCORS(response) {
   response.headers.set('Access-Control-Allow-Origin', '*')
   response.headers.set('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-  response.headers.set('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+  response.headers.set('Access-Control-Allow-Headers', 'Content-Type, Authorization, If-None-Match, Last-Event-ID')
+  response.headers.set('Access-Control-Expose-Headers', 'X-Next-Cursor, X-Sync-Since, ETag, X-Cache, X-Coalesced, Retry-After, Server-Timing')
+  response.headers.set('Timing-Allow-Origin', '*')
   response.headers.set('Access-Control-Allow-Credentials', 'true')
   return response
 }
 
+// 503 + Retry-After when OpenAI is unavailable, otherwise a plain 500
+function generationErrorResponse(error, message) {
+  if (error instanceof UpstreamUnavailableError) {
+    const response = NextResponse.json(
+      { error: 'The AI service is temporarily unavailable. Please try again shortly.' },
+      { status: 503 }
+    )
+    response.headers.set('Retry-After', String(Math.ceil(error.retryAfterMs / 1000)))
+    return handleCORS(response)
+  }
+  return handleCORS(NextResponse.json({ error: message }, { status: 500 }))
+}
+
+// Generated accommodations keyed on the normalized questionnaire. childName and
+// additionalInfo are part of the prompt (and of the output), so they are part
+// of the key: a hit never hands one family's plan to another.
+const accommodationCache = new TtlCache({
+  maxEntries: parseInt(process.env.ACCOMMODATION_CACHE_MAX_ENTRIES || '500', 10),
+  ttlMs: parseInt(process.env.ACCOMMODATION_CACHE_TTL_MS || String(24 * 60 * 60 * 1000), 10)
+})
+
+function normalizeText(value) {
+  return typeof value === 'string' ? value.trim().replace(/\s+/g, ' ').toLowerCase() : ''
+}
+
+function normalizeList(values) {
+  return [...new Set((values || []).map(normalizeText).filter(Boolean))].sort()
+}
+
+function accommodationCacheKey(accommodationData, planType, model) {
+  const normalized = {
+    model,
+    planType,
+    gradeLevel: normalizeText(accommodationData.gradeLevel),
+    diagnosisAreas: normalizeList(accommodationData.diagnosisAreas),
+    sensoryPreferences: normalizeList(accommodationData.sensoryPreferences),
+    behavioralChallenges: normalizeList(accommodationData.behavioralChallenges),
+    communicationMethod: normalizeText(accommodationData.communicationMethod),
+    childName: normalizeText(accommodationData.childName),
+    additionalInfo: normalizeText(accommodationData.additionalInfo)
+  }
+  return createHash('sha256').update(JSON.stringify(normalized)).digest('hex')
+}
+
+// Double-clicks and UI retries send the same generation several times within
+// seconds. Concurrent identical requests from one user share a single OpenAI
+// call and a single stored record; followers get X-Coalesced: true.
+const generationRequests = new InFlight()
+
+// Strings normalized, string lists sorted, object keys ordered
+function normalizeValue(value) {
+  if (typeof value === 'string') {
+    return normalizeText(value)
+  }
+  if (Array.isArray(value)) {
+    return value.every(item => typeof item === 'string') ? normalizeList(value) : value.map(normalizeValue)
+  }
+  if (value && typeof value === 'object') {
+    return Object.fromEntries(Object.keys(value).sort().map(key => [key, normalizeValue(value[key])]))
+  }
+  return value ?? null
+}
+
+function coalesceKey(kind, parts) {
+  return `${kind}:${createHash('sha256').update(JSON.stringify(parts)).digest('hex')}`
+}
+
+// Await a coalesced call; followers' wait shows up as its own Server-Timing phase
+async function settleCoalesced({ promise, shared }) {
+  return shared ? timed('coalesced_wait', () => promise) : promise
+}
+
+// Session comments: oldest first, opaque keyset cursor over (timestamp, id).
+// Polling clients send back X-Sync-Since, the same kind of cursor for the
+// newest comment they hold, so comments sharing its timestamp are not skipped.
+const COMMENT_PAGE_SIZE = 100
+const COMMENT_MAX_PAGE_SIZE = 1000
+
+function encodeCommentCursor(comment) {
+  const timestamp = new Date(comment.timestamp).toISOString()
+  return Buffer.from(JSON.stringify({ t: timestamp, id: comment.id })).toString('base64url')
+}
+
+function decodeCommentCursor(cursor) {
+  try {
+    const { t, id } = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'))
+    const timestamp = new Date(t)
+    if (typeof id !== 'string' || isNaN(timestamp.getTime())) {
+      return null
+    }
+    return { timestamp, id }
+  } catch (error) {
+    return null
+  }
+}
+
+// `since` is an X-Sync-Since cursor, or a bare ISO timestamp (inclusive)
+function decodeCommentSince(since) {
+  const after = decodeCommentCursor(since)
+  if (after) {
+    return after
+  }
+  const timestamp = new Date(since)
+  return isNaN(timestamp.getTime()) ? null : { timestamp, id: '' }
+}
+
+// Comments strictly after the cursor in (timestamp, id) order
+function commentQuery(sessionId, after) {
+  if (!after) {
+    return { sessionId }
+  }
+  return {
+    sessionId,
+    $or: [
+      { timestamp: { $gt: after.timestamp } },
+      { timestamp: after.timestamp, id: { $gt: after.id } }
+    ]
+  }
+}
+
+// Comment and approval pushes for GET /api/session/:id/events
+const sessionEvents = new SessionEvents({
+  replaySize: parseInt(process.env.SESSION_EVENTS_REPLAY || '100', 10)
+})
+
+// Weak validator for a serialized JSON body
+function bodyEtag(body) {
+  return `W/"${createHash('sha1').update(body).digest('base64url')}"`
+}
+
+function etagMatches(request, etag) {
+  const header = request.headers.get('if-none-match')
+  return !!header && header.split(',').some(tag => tag.trim() === etag || tag.trim() === '*')
+}
+
+// Autism profile and accommodation history pagination: keyset cursor over
+// (created_at, id). created_at is kept as the database string, since a JS Date
+// would drop Postgres microseconds.
+const PROFILE_PAGE_SIZE = 50
+const PROFILE_MAX_PAGE_SIZE = 200
+const HISTORY_PAGE_SIZE = 50
+const HISTORY_MAX_PAGE_SIZE = 500
+
+function encodeRowCursor(row) {
+  return Buffer.from(JSON.stringify({ t: row.created_at, id: row.id })).toString('base64url')
+}
+
+function decodeRowCursor(cursor) {
+  try {
+    const { t, id } = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'))
+    // Both end up inside a PostgREST filter, so only timestamp/id characters are allowed
+    if (typeof t !== 'string' || isNaN(new Date(t).getTime()) || !/^[\w:.+-]+$/.test(t) ||
+        typeof id !== 'string' || !/^[\w-]+$/.test(id)) {
+      return null
+    }
+    return { createdAt: t, id }
+  } catch (error) {
+    return null
+  }
+}
+
+// Accommodation history columns, returned in the API's camelCase record shape
+const HISTORY_COLUMNS = 'id, student_id, child_name, grade_level, diagnosis_areas, sensory_preferences, ' +
+  'behavioral_challenges, communication_method, additional_info, plan_type, accommodations, created_by, ' +
+  'for_parent, status, created_at'
+
+function historyRecord(row) {
+  return {
+    id: row.id,
+    studentId: row.student_id,
+    childName: row.child_name,
+    gradeLevel: row.grade_level,
+    diagnosisAreas: row.diagnosis_areas,
+    sensoryPreferences: row.sensory_preferences,
+    behavioralChallenges: row.behavioral_challenges,
+    communicationMethod: row.communication_method,
+    additionalInfo: row.additional_info,
+    planType: row.plan_type,
+    accommodations: row.accommodations,
+    createdBy: row.created_by,
+    forParent: row.for_parent,
+    status: row.status,
+    timestamp: row.created_at
+  }
+}
+
+// One page of the sessions `userId` created or that were made for them,
+// strictly after the cursor in (created_at desc, id desc) order
+async function fetchHistoryPage(userId, after, limit) {
+  let query = supabase
+    .from('accommodation_sessions')
+    .select(HISTORY_COLUMNS)
+    .or(`created_by.eq.${userId},for_parent.eq.${userId}`)
+
+  if (after) {
+    query = query.or(`created_at.lt.${after.createdAt},and(created_at.eq.${after.createdAt},id.lt.${after.id})`)
+  }
+
+  const { data, error } = await query
+    .order('created_at', { ascending: false })
+    .order('id', { ascending: false })
+    .limit(limit)
+  if (error) throw error
+  return data || []
+}
+
+// Every history page after `after`, fetched only as the stream is read
+async function* historyPages(userId, after) {
+  while (true) {
+    const rows = await fetchHistoryPage(userId, after, HISTORY_PAGE_SIZE)
+    if (rows.length) {
+      yield rows.map(historyRecord)
+    }
+    if (rows.length < HISTORY_PAGE_SIZE) {
+      return
+    }
+    const last = rows[rows.length - 1]
+    after = { createdAt: last.created_at, id: last.id }
+  }
+}
+
+// Stream pages of records as NDJSON, fetching the next page on each pull
+function ndjsonStream(pages) {
+  const encoder = new TextEncoder()
+  return new ReadableStream({
+    async pull(controller) {
+      try {
+        const { value, done } = await pages.next()
+        if (done) {
+          controller.close()
+          return
+        }
+        controller.enqueue(encoder.encode(value.map(record => JSON.stringify(record)).join('\n') + '\n'))
+      } catch (error) {
+        console.error('History stream error:', error)
+        controller.error(error)
+      }
+    },
+    async cancel() {
+      await pages.return()
+    }
+  })
+}
+
 // OPTIONS handler for CORS
 export async function OPTIONS() {
   return handleCORS(new NextResponse(null, { status: 200 }))
@@ -156,6 +531,58 @@ const mockUsers = {
   }
 }
 
+// Ids per `in` filter, keeping the PostgREST URL well under proxy limits
+const USER_LOOKUP_CHUNK = 200
+
+// Names/roles for session and comment enrichment: the mock users by id, then
+// Supabase profiles in one bulk lookup per response
+const users = new UserDirectory(async (ids) => {
+  const chunks = []
+  for (let i = 0; i < ids.length; i += USER_LOOKUP_CHUNK) {
+    chunks.push(ids.slice(i, i + USER_LOOKUP_CHUNK))
+  }
+  const results = await timed('supabase_users', () => Promise.all(chunks.map(chunk => supabase
+    .from('user_profiles')
+    .select('id, first_name, last_name, role')
+    .in('id', chunk))))
+
+  return results.flatMap(({ data, error }) => {
+    if (error) {
+      throw new Error(`User lookup failed: ${error.message}`)
+    }
+    return data.map(profile => ({
+      id: profile.id,
+      name: [profile.first_name, profile.last_name].filter(Boolean).join(' ') || 'Unknown',
+      role: profile.role
+    }))
+  })
+}, {
+  users: Object.values(mockUsers),
+  cache: new TtlCache({
+    maxEntries: parseInt(process.env.USER_DIRECTORY_MAX_ENTRIES || '20000', 10),
+    ttlMs: parseInt(process.env.USER_DIRECTORY_TTL_MS || '600000', 10)
+  })
+})
+
+// Session with createdByName/forParentName filled in from `names`
+function withOwnerNames(session, names) {
+  return {
+    ...session,
+    createdByName: names.get(session.createdBy)?.name || 'Unknown',
+    forParentName: names.get(session.forParent)?.name || 'Unknown'
+  }
+}
+
+// Comment with the author's userName/userRole filled in from `names`
+function withAuthor(comment, names) {
+  const author = names.get(comment.userId)
+  return {
+    ...comment,
+    userName: author?.name || 'Unknown',
+    userRole: author?.role || 'unknown'
+  }
+}
+
 // Hero Plan Features - Legal Risk Assessment
 const legalRiskAnalyzer = {
   assessRisks: (accommodationData) => {
@@ -265,7 +692,7 @@ Provide analysis in this exact JSON format:
 }`
 
   try {
-    const completion = await openai.chat.completions.create({
+    const completion = await completions.create({
       model: "gpt-4o", // Using GPT-4o for Hero features
       messages: [
         {
@@ -281,32 +708,506 @@ Provide analysis in this exact JSON format:
       max_tokens: 3000
     })
 
-    const response = completion.choices[0].message.content
-    let reviewData
+    const reply = completion.choices[0]
+    return await timed('parse_json', () => parseAiJson(reply.message.content, {
+      schema: ADVANCED_REVIEW_SCHEMA,
+      finishReason: reply.finish_reason
+    }).data)
+  } catch (error) {
+    console.error('Advanced AI Review Error:', error)
+    throw error
+  }
+}
 
-    try {
-      // Clean the response
-      let cleanedResponse = response.trim()
-      if (cleanedResponse.startsWith('```json')) {
-        cleanedResponse = cleanedResponse.replace(/^```json\s*/, '').replace(/\s*```$/, '')
-      } else if (cleanedResponse.startsWith('```')) {
-        cleanedResponse = cleanedResponse.replace(/^```\s*/, '').replace(/\s*```$/, '')
+// Autism profile generation, shared by the JSON and SSE endpoints
+function buildAutismProfilePrompt(student, intake, profileType) {
+  const { sensoryPreferences, communicationStyle, behavioralTriggers, homeSupports, goals, supplementalDocuments } = intake
+
+  return `You are an expert autism specialist and special education advocate. Create a comprehensive, professional autism profile for educators based on the following information:
+
+STUDENT INFORMATION:
+Name: ${student.name}
+Grade Level: ${student.grade_level}
+Known Diagnoses: ${student.diagnosis_areas?.join(', ') || 'Not specified'}
+
+SENSORY PREFERENCES:
+Selected preferences: ${sensoryPreferences.selected?.join(', ') || 'None specified'}
+What calms them: ${sensoryPreferences.calming_strategies || 'Not specified'}
+
+COMMUNICATION STYLE:
+Primary method: ${communicationStyle.primary_method || 'Not specified'}
+Effective strategies: ${communicationStyle.effective_strategies || 'Not specified'}
+
+BEHAVIORAL TRIGGERS:
+Known triggers: ${behavioralTriggers.triggers?.join(', ') || 'None specified'}
+Other situations: ${behavioralTriggers.other_triggers || 'Not specified'}
+
+HOME SUPPORTS THAT WORK:
+${homeSupports || 'No specific supports documented'}
+
+GOALS FOR THIS YEAR:
+${goals || 'No specific goals documented'}
+
+Create a professional autism profile that includes:
+
+1. STUDENT OVERVIEW (2-3 sentences summarizing the student's strengths and needs)
+
+2. SENSORY CONSIDERATIONS (Specific sensory needs and recommended accommodations)
+
+3. COMMUNICATION APPROACH (How the student communicates best and recommended strategies)
+
+4. BEHAVIORAL SUPPORTS (Triggers to avoid and positive behavioral strategies)
+
+5. RECOMMENDED CLASSROOM ACCOMMODATIONS (Specific, actionable accommodations for teachers)
+
+6. GOALS AND PRIORITIES (Key areas of focus for educational support)
+
+${profileType === 'hero' ? `
+
+ENHANCED HERO PROFILE SECTIONS (additional):
+
+7. INDIVIDUAL STRENGTHS & INTERESTS (Leverage unique abilities and special interests)
+
+8. LEARNING STYLE & PREFERENCES (Specific teaching methods and approaches that work)
+
+9. ENVIRONMENTAL CONSIDERATIONS (Optimal classroom setup and environmental factors)
+
+10. LONG-TERM DEVELOPMENTAL OUTLOOK (Future planning and transition considerations)
+
+${supplementalDocuments?.length > 0 ? `
+
+DOCUMENT INSIGHTS: The following information has been gathered from uploaded documents:
+${supplementalDocuments.map(doc => `- ${doc.name}: ${doc.content.substring(0, 200)}...`).join('\n')}
+Please integrate these insights into the profile where relevant.
+` : ''}
+
+ENHANCED ANALYSIS: Provide detailed implementation strategies, specific classroom modifications, legal compliance considerations, and comprehensive accommodation recommendations. Generate a 5-6 paragraph profile with actionable insights for educators.` : ''}
+
+Write in a professional, strengths-based tone that emphasizes the student's abilities while clearly outlining support needs. Use person-first language and focus on practical, implementable strategies for educators.
+
+Format the response as a clear, organized profile that can be shared with teachers and support staff.`
+}
+
+function autismProfileCompletion(prompt, profileType) {
+  return {
+    model: "gpt-4o",
+    messages: [
+      {
+        role: "system",
+        content: "You are an expert autism specialist and special education advocate with deep knowledge of IDEA law, evidence-based practices, and strengths-based approaches to autism support. Create comprehensive, professional autism profiles for educational teams."
+      },
+      {
+        role: "user", 
+        content: prompt
       }
-      
-      reviewData = JSON.parse(cleanedResponse)
-    } catch (parseError) {
-      throw new Error('Invalid response format from AI')
+    ],
+    temperature: 0.7,
+    max_tokens: profileType === 'hero' ? 2500 : 1500
+  }
+}
+
+// Provide fallback insights if AI generation fails
+const FALLBACK_PROFILE_INSIGHTS = {
+  profileInsights: {
+    topNeeds: ["Visual supports", "Structured routines", "Sensory regulation"],
+    topRecommendations: ["Clear visual schedules", "Quiet workspace option", "Movement breaks"],
+    redFlags: ["Loud, chaotic environments", "Sudden changes", "Overwhelming social demands"]
+  },
+  helpfulSupports: ["Visual schedules", "Calm down space", "Clear expectations", "Positive reinforcement"],
+  situationsToAvoid: ["Unexpected changes", "Loud noises", "Crowded spaces", "Rushed transitions"],
+  classroomTips: ["Provide advance notice", "Use visual cues", "Allow processing time", "Celebrate successes"],
+  topNeeds: [
+    "Consistent daily structure and predictable routines",
+    "Visual supports for communication and transitions", 
+    "Sensory regulation tools and break opportunities",
+    "Clear, concrete instructions with processing time",
+    "Positive behavior support strategies",
+    "Social skills development with peer support",
+    "Executive function scaffolding and organization tools",
+    "Family-school collaboration and communication"
+  ]
+}
+
+// Hero Plan: additional insights and recommendations. Built from the same
+// intake as the narrative (not from its text) so both calls run concurrently.
+async function generateProfileInsights(student, intake) {
+  const {
+    sensoryPreferences,
+    communicationStyle,
+    behavioralTriggers,
+    homeSupports,
+    goals,
+    individualStrengths,
+    learningStyle,
+    environmentalPreferences,
+    supplementalDocuments
+  } = intake
+
+  try {
+    const insightsPrompt = `Based on this student's intake information, provide specific insights and actionable recommendations in JSON format:
+
+STUDENT:
+- Grade level: ${student.grade_level || 'Not specified'}
+- Known diagnoses: ${student.diagnosis_areas?.join(', ') || 'Not specified'}
+
+STUDENT DATA:
+- Sensory needs: ${sensoryPreferences.selected?.join(', ') || 'Not specified'}
+- What calms them: ${sensoryPreferences.calming_strategies || 'Not specified'}
+- Communication: ${communicationStyle.primary_method || 'Not specified'}
+- Effective communication strategies: ${communicationStyle.effective_strategies || 'Not specified'}
+- Behavioral triggers: ${behavioralTriggers.triggers?.join(', ') || 'Not specified'}
+- Other triggers: ${behavioralTriggers.other_triggers || 'Not specified'}
+- Home supports: ${homeSupports || 'Not specified'}
+- Goals: ${goals || 'Not specified'}
+- Strengths and interests: ${individualStrengths || 'Not specified'}
+- Learning style: ${learningStyle || 'Not specified'}
+- Environmental preferences: ${environmentalPreferences || 'Not specified'}
+${supplementalDocuments?.length > 0 ? `
+DOCUMENT INSIGHTS:
+${supplementalDocuments.map(doc => `- ${doc.name}: ${doc.content.substring(0, 200)}...`).join('\n')}
+` : ''}
+Respond with ONLY valid JSON in this exact format:
+{
+  "topNeeds": ["need1", "need2", "need3", "need4", "need5", "need6", "need7", "need8"],
+  "topRecommendations": ["rec1", "rec2", "rec3"],
+  "redFlags": ["flag1", "flag2", "flag3"],
+  "helpfulSupports": ["support1", "support2", "support3", "support4"],
+  "situationsToAvoid": ["situation1", "situation2", "situation3", "situation4"],
+  "classroomTips": ["tip1", "tip2", "tip3", "tip4"]
+}`
+
+    const insightsCompletion = await timed('openai_insights', () => completions.create({
+      model: "gpt-4o",
+      messages: [
+        {
+          role: "system",
+          content: "You are an expert autism specialist. Generate specific, actionable insights in valid JSON format only. Provide exactly 8 top needs, 3 recommendations, 3 red flags, 4 supports, 4 situations to avoid, and 4 classroom tips. No explanations or additional text."
+        },
+        {
+          role: "user",
+          content: insightsPrompt
+        }
+      ],
+      temperature: 0.3,
+      max_tokens: 1200
+    }))
+
+    const insightsReply = insightsCompletion.choices[0]
+    const insights = await timed('parse_json', () => parseAiJson(insightsReply.message.content, {
+      schema: INSIGHTS_SCHEMA,
+      finishReason: insightsReply.finish_reason
+    }).data)
+    return {
+      profileInsights: {
+        topNeeds: insights.topNeeds?.slice(0, 3) || [],
+        topRecommendations: insights.topRecommendations || [],
+        redFlags: insights.redFlags || []
+      },
+      helpfulSupports: insights.helpfulSupports || [],
+      situationsToAvoid: insights.situationsToAvoid || [],
+      classroomTips: insights.classroomTips || [],
+      topNeeds: insights.topNeeds || []
     }
+  } catch (insightsError) {
+    console.error('Failed to generate insights:', insightsError)
+    return FALLBACK_PROFILE_INSIGHTS
+  }
+}
 
-    return reviewData
-  } catch (error) {
-    console.error('Advanced AI Review Error:', error)
-    throw error
+// Save a generated profile, log it and build the API response
+async function saveAutismProfile({ user, profile, student, intake, profileType, generatedProfile, insights }) {
+  const {
+    sensoryPreferences,
+    communicationStyle,
+    behavioralTriggers,
+    homeSupports,
+    goals,
+    individualStrengths,
+    learningStyle,
+    environmentalPreferences,
+    supplementalDocuments
+  } = intake
+
+  const { data: autismProfile, error: saveError } = await timed('supabase_insert', () => supabase
+    .from('autism_profiles')
+    .insert([{
+      user_id: user.id,
+      student_id: student.id,
+      sensory_preferences: sensoryPreferences,
+      communication_style: communicationStyle,
+      behavioral_triggers: behavioralTriggers,
+      home_supports: homeSupports,
+      goals: goals,
+      generated_profile: generatedProfile,
+      profile_type: profileType,
+      // Hero Plan exclusive data
+      ...(profileType === 'hero' && {
+        individual_strengths: individualStrengths || '',
+        learning_style: learningStyle || '', 
+        environmental_preferences: environmentalPreferences || '',
+        supplemental_documents: supplementalDocuments || [],
+        profile_insights: insights.profileInsights,
+        helpful_supports: insights.helpfulSupports,
+        situations_to_avoid: insights.situationsToAvoid,
+        classroom_tips: insights.classroomTips
+      })
+    }])
+    .select()
+    .single())
+
+  if (saveError) throw saveError
+
+  // Log profile generation
+  await logUserEvent(user.id, 'autism_profile_generated', {
+    studentId: student.id,
+    studentName: student.name,
+    profileType,
+    profileLength: generatedProfile.length,
+    hasSupplementalDocs: profileType === 'hero' && (supplementalDocuments?.length > 0),
+    insightsGenerated: profileType === 'hero' && insights !== null
+  })
+
+  const response = {
+    profileId: autismProfile.id,
+    generatedProfile,
+    profileType,
+    studentName: student.name,
+    createdBy: profile.first_name + ' ' + profile.last_name
+  }
+
+  // Add Hero Plan exclusive data to response
+  if (profileType === 'hero') {
+    Object.assign(response, insights)
+  }
+
+  return response
+}
+
+// Accommodation generation, shared by the single, SSE and batch endpoints
+
+// Use student data if available, otherwise use provided data
+function resolveAccommodationData(studentData, input) {
+  return {
+    childName: studentData?.name || input.childName,
+    gradeLevel: studentData?.grade_level || input.gradeLevel,
+    diagnosisAreas: studentData?.diagnosis_areas || input.diagnosisAreas,
+    sensoryPreferences: studentData?.sensory_preferences || input.sensoryPreferences,
+    behavioralChallenges: studentData?.behavioral_challenges || input.behavioralChallenges,
+    communicationMethod: studentData?.communication_method || input.communicationMethod,
+    additionalInfo: studentData?.additional_notes || input.additionalInfo
   }
 }
 
+const ACCOMMODATION_MODEL = "gpt-4o"
+
+function accommodationCompletion(accommodationData, planType) {
+  // Enhanced prompt for Hero users
+  const accommodationCount = planType === 'hero' ? 15 : 8
+
+  const prompt = `You are an expert IEP accommodation specialist. Create ${accommodationCount} personalized, specific, and implementable IEP accommodations for a child with the following profile:
+
+Child Name: ${accommodationData.childName}
+Grade Level: ${accommodationData.gradeLevel}
+Diagnosis Areas: ${accommodationData.diagnosisAreas.join(', ')}
+Sensory Preferences: ${accommodationData.sensoryPreferences.join(', ')}
+Behavioral Challenges: ${accommodationData.behavioralChallenges.join(', ')}
+Communication Method: ${accommodationData.communicationMethod}
+Additional Information: ${accommodationData.additionalInfo}
+
+${planType === 'hero' ? 'HERO PLAN: Provide enhanced, detailed accommodations with legal compliance considerations and implementation timelines.' : ''}
+
+Generate accommodations that are:
+1. Specific and actionable for teachers
+2. Evidence-based and legally compliant
+3. Tailored to this child's unique needs
+4. Appropriate for their grade level
+5. Cover different areas: academic, behavioral, sensory, communication, and environmental
+
+Return the accommodations in this exact JSON format:
+{
+  "accommodations": [
+    {
+      "title": "Clear, concise accommodation title",
+      "description": "Detailed description of the accommodation and when to use it",
+      "category": "Academic|Behavioral|Sensory|Communication|Environmental",
+      "implementation": "Specific steps for implementation"
+    }
+  ]
+}
+
+Focus on practical accommodations that address the specific challenges mentioned.`
+
+  return {
+    model: ACCOMMODATION_MODEL,
+    messages: [
+      {
+        role: "system",
+        content: planType === 'hero' 
+          ? "You are an expert IEP accommodation specialist with deep knowledge of autism support strategies, special education law, and evidence-based practices. For Hero Plan users, provide enhanced detail, legal compliance notes, and comprehensive implementation guidance. Always respond with valid JSON only."
+          : "You are an expert IEP accommodation specialist with deep knowledge of autism support strategies, special education law, and evidence-based practices. Always respond with valid JSON only."
+      },
+      {
+        role: "user",
+        content: prompt
+      }
+    ],
+    temperature: 0.7,
+    max_tokens: planType === 'hero' ? 3500 : 2500
+  }
+}
+
+// Cached or freshly generated accommodations for one child
+async function generateAccommodationPlan(accommodationData, planType, skipCache) {
+  const cacheKey = accommodationCacheKey(accommodationData, planType, ACCOMMODATION_MODEL)
+  const cached = skipCache ? undefined : accommodationCache.get(cacheKey)
+  if (cached) {
+    return { accommodationsData: cached, cacheStatus: 'HIT' }
+  }
+
+  const request = accommodationCompletion(accommodationData, planType)
+  const completion = await timed('openai_accommodations', () => completions.create(request))
+
+  let parsed
+  try {
+    const reply = completion.choices[0]
+    parsed = await timed('parse_json', () => parseAiJson(reply.message.content, {
+      schema: ACCOMMODATIONS_SCHEMA,
+      finishReason: reply.finish_reason
+    }))
+  } catch (parseError) {
+    console.error('Failed to parse OpenAI response:', parseError)
+    throw new Error('Invalid response format from AI')
+  }
+
+  // A reply cut off at max_tokens keeps its finished items; one follow-up call
+  // asks for the rest instead of throwing the whole generation away
+  let accommodationsData = parsed.data
+  let complete = !parsed.needsContinuation
+  if (!complete) {
+    try {
+      accommodationsData = await continueAccommodations(request, accommodationsData)
+      complete = true
+    } catch (continuationError) {
+      console.error('Accommodation continuation failed:', continuationError)
+    }
+  }
+
+  // Partial plans are served but not cached, so the next request tries again
+  if (complete) {
+    accommodationCache.set(cacheKey, accommodationsData)
+  }
+  return { accommodationsData, cacheStatus: skipCache ? 'BYPASS' : 'MISS' }
+}
+
+async function continueAccommodations(request, accommodationsData) {
+  const have = accommodationsData.accommodations
+  const completion = await timed('openai_continuation', () => completions.create({
+    ...request,
+    messages: [
+      ...request.messages,
+      {
+        role: "user",
+        content: `Your previous reply was cut off. It already contained these accommodations: ${have.map(item => item.title).join('; ')}. Return ONLY the remaining accommodations in the same {"accommodations": [...]} JSON format, without repeating any of them.`
+      }
+    ]
+  }))
+
+  const reply = completion.choices[0]
+  const { data } = await timed('parse_json', () => parseAiJson(reply.message.content, {
+    schema: ACCOMMODATIONS_SCHEMA,
+    finishReason: reply.finish_reason
+  }))
+  const titles = new Set(have.map(item => item.title.toLowerCase()))
+  const added = data.accommodations.filter(item => !titles.has(item.title.toLowerCase()))
+  return { ...accommodationsData, accommodations: [...have, ...added] }
+}
+
+// Save a generated plan, log it and build the API response
+async function saveAccommodationSession({ user, profile, studentId, studentData, accommodationData, planType, accommodationsData }) {
+  // Save to accommodation_sessions with student reference
+  const { data: session, error: sessionError } = await timed('supabase_insert', () => supabase
+    .from('accommodation_sessions')
+    .insert([{
+      student_id: studentId,
+      child_name: accommodationData.childName,
+      grade_level: accommodationData.gradeLevel,
+      diagnosis_areas: accommodationData.diagnosisAreas,
+      sensory_preferences: accommodationData.sensoryPreferences,
+      behavioral_challenges: accommodationData.behavioralChallenges,
+      communication_method: accommodationData.communicationMethod,
+      additional_info: accommodationData.additionalInfo,
+      plan_type: planType,
+      accommodations: accommodationsData.accommodations,
+      created_by: user.id,
+      for_parent: studentData?.parent_id || user.id
+    }])
+    .select()
+    .single())
+
+  if (sessionError) throw sessionError
+
+  // Log accommodation generation
+  await logUserEvent(user.id, 'accommodations_generated', {
+    studentId,
+    studentName: accommodationData.childName,
+    accommodationCount: accommodationsData.accommodations.length,
+    planType: planType
+  })
+
+  return {
+    sessionId: session.id,
+    ...accommodationsData,
+    createdBy: profile.first_name + ' ' + profile.last_name,
+    createdByRole: profile.role,
+    planType: planType,
+    studentId
+  }
+}
+
+// Generate and store one plan; identical concurrent calls share the work.
+// Returns { result, cacheStatus, shared }.
+async function generateAccommodationSession({ user, profile, studentId, studentData, accommodationData, planType, skipCache }) {
+  const key = coalesceKey('accommodations', {
+    user: user.id,
+    studentId: studentId || null,
+    plan: accommodationCacheKey(accommodationData, planType, ACCOMMODATION_MODEL),
+    skipCache
+  })
+  const call = generationRequests.run(key, async () => {
+    const { accommodationsData, cacheStatus } = await generateAccommodationPlan(accommodationData, planType, skipCache)
+    const result = await saveAccommodationSession({ user, profile, studentId, studentData, accommodationData, planType, accommodationsData })
+    return { result, cacheStatus }
+  })
+  return { ...(await settleCoalesced(call)), shared: call.shared }
+}
+
+// Run `worker` over `items` with at most `limit` calls in flight
+async function runWithConcurrency(items, limit, worker) {
+  let next = 0
+  const lanes = Array.from({ length: Math.min(limit, items.length) }, async () => {
+    while (next < items.length) {
+      await worker(items[next++])
+    }
+  })
+  await Promise.all(lanes)
+}
+
+const ACCOMMODATION_BATCH_MAX = parseInt(process.env.ACCOMMODATION_BATCH_MAX || '50', 10)
+const ACCOMMODATION_BATCH_CONCURRENCY = parseInt(process.env.ACCOMMODATION_BATCH_CONCURRENCY || '4', 10)
+
+// Debug `_timing` blocks are only added when enabled here and asked for with X-Debug-Timing: 1
+const SERVER_TIMING_DEBUG = process.env.SERVER_TIMING_DEBUG === 'true'
+
+// Every response carries the phases timed while it was handled in Server-Timing
+async function handleRoute(request, context) {
+  const timing = new ServerTiming()
+  const response = await runWithTiming(timing, () => routeRequest(request, context))
+  const debug = SERVER_TIMING_DEBUG && request.headers.get('x-debug-timing') === '1'
+  return applyServerTiming(response, timing, debug)
+}
+
 // Route handler function
-async function handleRoute(request, { params }) {
+async function routeRequest(request, { params }) {
   const { path = [] } = params
   const route = `/${path.join('/')}`
   const method = request.method
@@ -383,10 +1284,7 @@ async function handleRoute(request, { params }) {
 
       } catch (error) {
         console.error('Advanced Review Error:', error)
-        return handleCORS(NextResponse.json(
-          { error: "Failed to generate advanced review" }, 
-          { status: 500 }
-        ))
+        return generationErrorResponse(error, "Failed to generate advanced review")
       }
     }
 
@@ -515,7 +1413,9 @@ async function handleRoute(request, { params }) {
     // ===== AUTISM PROFILE GENERATOR =====
 
     // Generate Autism Profile - POST /api/autism-profiles/generate
-    if (route === '/autism-profiles/generate' && method === 'POST') {
+    // POST /api/autism-profiles/generate/stream sends the same result as SSE:
+    // meta, token/paragraph while the narrative is written, insights (hero), done
+    if ((route === '/autism-profiles/generate' || route === '/autism-profiles/generate/stream') && method === 'POST') {
       const { user, profile, error } = await withAuth(request)
       if (error) {
         return handleCORS(NextResponse.json({ error }, { status: 401 }))
@@ -535,6 +1435,17 @@ async function handleRoute(request, { params }) {
         environmentalPreferences,
         supplementalDocuments
       } = body
+      const intake = {
+        sensoryPreferences,
+        communicationStyle,
+        behavioralTriggers,
+        homeSupports,
+        goals,
+        individualStrengths,
+        learningStyle,
+        environmentalPreferences,
+        supplementalDocuments
+      }
 
       if (!studentId) {
         return handleCORS(NextResponse.json({ error: "Student ID is required" }, { status: 400 }))
@@ -545,338 +1456,182 @@ async function handleRoute(request, { params }) {
         let hasAccess = false
         let studentData = null
 
-        const { data: student, error: studentError } = await supabase
+        const { data: student, error: studentError } = await timed('supabase_student', () => supabase
           .from('students')
           .select('*')
           .eq('id', studentId)
-          .single()
+          .single())
 
         if (studentError || !student) {
           return handleCORS(NextResponse.json({ error: "Student not found" }, { status: 404 }))
-        }
-
-        studentData = student
-
-        if (profile.role === 'parent' && student.parent_id === user.id) {
-          hasAccess = true
-        } else if (profile.role === 'advocate') {
-          const { data: assignment } = await supabase
-            .from('student_advocate_assignments')
-            .select('id')
-            .eq('student_id', studentId)
-            .eq('advocate_id', user.id)
-            .eq('is_active', true)
-            .single()
-          hasAccess = !!assignment
-        }
-
-        if (!hasAccess) {
-          return handleCORS(NextResponse.json({ error: "Access denied to this student" }, { status: 403 }))
-        }
-
-        // Determine profile type based on user plan
-        let profileType = 'standard'
-        if (profile.role === 'advocate' || profile.plan_type === 'hero') {
-          profileType = 'hero'
-        }
-
-        // Create comprehensive prompt for AI generation
-        const prompt = `You are an expert autism specialist and special education advocate. Create a comprehensive, professional autism profile for educators based on the following information:
-
-STUDENT INFORMATION:
-Name: ${student.name}
-Grade Level: ${student.grade_level}
-Known Diagnoses: ${student.diagnosis_areas?.join(', ') || 'Not specified'}
-
-SENSORY PREFERENCES:
-Selected preferences: ${sensoryPreferences.selected?.join(', ') || 'None specified'}
-What calms them: ${sensoryPreferences.calming_strategies || 'Not specified'}
-
-COMMUNICATION STYLE:
-Primary method: ${communicationStyle.primary_method || 'Not specified'}
-Effective strategies: ${communicationStyle.effective_strategies || 'Not specified'}
-
-BEHAVIORAL TRIGGERS:
-Known triggers: ${behavioralTriggers.triggers?.join(', ') || 'None specified'}
-Other situations: ${behavioralTriggers.other_triggers || 'Not specified'}
-
-HOME SUPPORTS THAT WORK:
-${homeSupports || 'No specific supports documented'}
-
-GOALS FOR THIS YEAR:
-${goals || 'No specific goals documented'}
-
-Create a professional autism profile that includes:
-
-1. STUDENT OVERVIEW (2-3 sentences summarizing the student's strengths and needs)
-
-2. SENSORY CONSIDERATIONS (Specific sensory needs and recommended accommodations)
-
-3. COMMUNICATION APPROACH (How the student communicates best and recommended strategies)
-
-4. BEHAVIORAL SUPPORTS (Triggers to avoid and positive behavioral strategies)
-
-5. RECOMMENDED CLASSROOM ACCOMMODATIONS (Specific, actionable accommodations for teachers)
-
-6. GOALS AND PRIORITIES (Key areas of focus for educational support)
-
-${profileType === 'hero' ? `
-
-ENHANCED HERO PROFILE SECTIONS (additional):
-
-7. INDIVIDUAL STRENGTHS & INTERESTS (Leverage unique abilities and special interests)
-
-8. LEARNING STYLE & PREFERENCES (Specific teaching methods and approaches that work)
-
-9. ENVIRONMENTAL CONSIDERATIONS (Optimal classroom setup and environmental factors)
-
-10. LONG-TERM DEVELOPMENTAL OUTLOOK (Future planning and transition considerations)
-
-${supplementalDocuments?.length > 0 ? `
-
-DOCUMENT INSIGHTS: The following information has been gathered from uploaded documents:
-${supplementalDocuments.map(doc => `- ${doc.name}: ${doc.content.substring(0, 200)}...`).join('\n')}
-Please integrate these insights into the profile where relevant.
-` : ''}
-
-ENHANCED ANALYSIS: Provide detailed implementation strategies, specific classroom modifications, legal compliance considerations, and comprehensive accommodation recommendations. Generate a 5-6 paragraph profile with actionable insights for educators.` : ''}
-
-Write in a professional, strengths-based tone that emphasizes the student's abilities while clearly outlining support needs. Use person-first language and focus on practical, implementable strategies for educators.
-
-Format the response as a clear, organized profile that can be shared with teachers and support staff.`
-
-        const completion = await openai.chat.completions.create({
-          model: "gpt-4o",
-          messages: [
-            {
-              role: "system",
-              content: "You are an expert autism specialist and special education advocate with deep knowledge of IDEA law, evidence-based practices, and strengths-based approaches to autism support. Create comprehensive, professional autism profiles for educational teams."
-            },
-            {
-              role: "user", 
-              content: prompt
-            }
-          ],
-          temperature: 0.7,
-          max_tokens: profileType === 'hero' ? 2500 : 1500
-        })
-
-        const generatedProfile = completion.choices[0].message.content
-
-        // Hero Plan: Generate additional insights and recommendations
-        let profileInsights = null
-        let helpfulSupports = []
-        let situationsToAvoid = []
-        let classroomTips = []
-        let topNeeds = []
+        }
 
-        if (profileType === 'hero') {
-          try {
-            const insightsPrompt = `Based on this autism profile, provide specific insights and actionable recommendations in JSON format:
+        studentData = student
 
-PROFILE:
-${generatedProfile}
+        if (profile.role === 'parent' && student.parent_id === user.id) {
+          hasAccess = true
+        } else if (profile.role === 'advocate') {
+          const { data: assignment } = await timed('supabase_assignment', () => supabase
+            .from('student_advocate_assignments')
+            .select('id')
+            .eq('student_id', studentId)
+            .eq('advocate_id', user.id)
+            .eq('is_active', true)
+            .single())
+          hasAccess = !!assignment
+        }
 
-STUDENT DATA:
-- Sensory needs: ${sensoryPreferences.selected?.join(', ') || 'Not specified'}
-- Communication: ${communicationStyle.primary_method || 'Not specified'}
-- Behavioral triggers: ${behavioralTriggers.triggers?.join(', ') || 'Not specified'}
-- Home supports: ${homeSupports || 'Not specified'}
-- Goals: ${goals || 'Not specified'}
+        if (!hasAccess) {
+          return handleCORS(NextResponse.json({ error: "Access denied to this student" }, { status: 403 }))
+        }
 
-Respond with ONLY valid JSON in this exact format:
-{
-  "topNeeds": ["need1", "need2", "need3", "need4", "need5", "need6", "need7", "need8"],
-  "topRecommendations": ["rec1", "rec2", "rec3"],
-  "redFlags": ["flag1", "flag2", "flag3"],
-  "helpfulSupports": ["support1", "support2", "support3", "support4"],
-  "situationsToAvoid": ["situation1", "situation2", "situation3", "situation4"],
-  "classroomTips": ["tip1", "tip2", "tip3", "tip4"]
-}`
+        // Determine profile type based on user plan
+        let profileType = 'standard'
+        if (profile.role === 'advocate' || profile.plan_type === 'hero') {
+          profileType = 'hero'
+        }
 
-            const insightsCompletion = await openai.chat.completions.create({
-              model: "gpt-4o",
-              messages: [
-                {
-                  role: "system",
-                  content: "You are an expert autism specialist. Generate specific, actionable insights in valid JSON format only. Provide exactly 8 top needs, 3 recommendations, 3 red flags, 4 supports, 4 situations to avoid, and 4 classroom tips. No explanations or additional text."
-                },
-                {
-                  role: "user",
-                  content: insightsPrompt
-                }
-              ],
-              temperature: 0.3,
-              max_tokens: 1200
-            })
-
-            const insightsResponse = insightsCompletion.choices[0].message.content
-            let cleanedInsights = insightsResponse.trim()
-            
-            // Clean JSON response
-            if (cleanedInsights.startsWith('```json')) {
-              cleanedInsights = cleanedInsights.replace(/^```json\s*/, '').replace(/\s*```$/, '')
-            } else if (cleanedInsights.startsWith('```')) {
-              cleanedInsights = cleanedInsights.replace(/^```\s*/, '').replace(/\s*```$/, '')
+        // Create comprehensive prompt for AI generation
+        const prompt = buildAutismProfilePrompt(student, intake, profileType)
+        const completionRequest = autismProfileCompletion(prompt, profileType)
+
+        if (route.endsWith('/stream')) {
+          const stream = createSseStream(async (send, signal) => {
+            send('meta', { profileType, studentName: student.name })
+
+            // Started before the narrative; sent as the final event once both are done
+            const insightsPromise = profileType === 'hero' ? generateProfileInsights(student, intake) : null
+
+            const completion = await completions.create({ ...completionRequest, stream: true }, { signal })
+            let generatedProfile = ''
+            let paragraphStart = 0
+            let paragraphIndex = 0
+            const emitParagraph = (text) => {
+              if (text.trim()) {
+                send('paragraph', { index: paragraphIndex++, text: text.trim() })
+              }
             }
 
-            const insights = JSON.parse(cleanedInsights)
-            profileInsights = {
-              topNeeds: insights.topNeeds?.slice(0, 3) || [],
-              topRecommendations: insights.topRecommendations || [],
-              redFlags: insights.redFlags || []
+            for await (const chunk of completion) {
+              const delta = chunk.choices[0]?.delta?.content
+              if (!delta) continue
+              generatedProfile += delta
+              send('token', { text: delta })
+
+              // Emit each paragraph as soon as its blank-line terminator arrives
+              let boundary = generatedProfile.indexOf('\n\n', paragraphStart)
+              while (boundary !== -1) {
+                emitParagraph(generatedProfile.slice(paragraphStart, boundary))
+                paragraphStart = boundary + 2
+                boundary = generatedProfile.indexOf('\n\n', paragraphStart)
+              }
             }
-            helpfulSupports = insights.helpfulSupports || []
-            situationsToAvoid = insights.situationsToAvoid || []
-            classroomTips = insights.classroomTips || []
-            topNeeds = insights.topNeeds || []
-
-          } catch (insightsError) {
-            console.error('Failed to generate insights:', insightsError)
-            // Provide fallback insights if AI generation fails
-            profileInsights = {
-              topNeeds: ["Visual supports", "Structured routines", "Sensory regulation"],
-              topRecommendations: ["Clear visual schedules", "Quiet workspace option", "Movement breaks"],
-              redFlags: ["Loud, chaotic environments", "Sudden changes", "Overwhelming social demands"]
+            emitParagraph(generatedProfile.slice(paragraphStart))
+
+            const insights = await insightsPromise
+            if (insights) {
+              send('insights', insights)
             }
-            helpfulSupports = ["Visual schedules", "Calm down space", "Clear expectations", "Positive reinforcement"]
-            situationsToAvoid = ["Unexpected changes", "Loud noises", "Crowded spaces", "Rushed transitions"]
-            classroomTips = ["Provide advance notice", "Use visual cues", "Allow processing time", "Celebrate successes"]
-            topNeeds = [
-              "Consistent daily structure and predictable routines",
-              "Visual supports for communication and transitions", 
-              "Sensory regulation tools and break opportunities",
-              "Clear, concrete instructions with processing time",
-              "Positive behavior support strategies",
-              "Social skills development with peer support",
-              "Executive function scaffolding and organization tools",
-              "Family-school collaboration and communication"
-            ]
-          }
-        }
 
-        // Save to database
-        const { data: autismProfile, error: saveError } = await supabase
-          .from('autism_profiles')
-          .insert([{
-            user_id: user.id,
-            student_id: studentId,
-            sensory_preferences: sensoryPreferences,
-            communication_style: communicationStyle,
-            behavioral_triggers: behavioralTriggers,
-            home_supports: homeSupports,
-            goals: goals,
-            generated_profile: generatedProfile,
-            profile_type: profileType,
-            // Hero Plan exclusive data
-            ...(profileType === 'hero' && {
-              individual_strengths: individualStrengths || '',
-              learning_style: learningStyle || '', 
-              environmental_preferences: environmentalPreferences || '',
-              supplemental_documents: supplementalDocuments || [],
-              profile_insights: profileInsights,
-              helpful_supports: helpfulSupports,
-              situations_to_avoid: situationsToAvoid,
-              classroom_tips: classroomTips
-            })
-          }])
-          .select()
-          .single()
+            send('done', await saveAutismProfile({ user, profile, student, intake, profileType, generatedProfile, insights }))
+          })
+          return handleCORS(new NextResponse(stream, { headers: SSE_HEADERS }))
+        }
 
-        if (saveError) throw saveError
+        const key = coalesceKey('autism-profile', { user: user.id, studentId, profileType, intake: normalizeValue(intake) })
+        const call = generationRequests.run(key, async () => {
+          // Hero insights only need the intake, so they overlap the narrative call
+          const [completion, insights] = await Promise.all([
+            timed('openai_narrative', () => completions.create(completionRequest)),
+            profileType === 'hero' ? generateProfileInsights(student, intake) : null
+          ])
+          const generatedProfile = completion.choices[0].message.content
 
-        // Log profile generation
-        await logUserEvent(user.id, 'autism_profile_generated', {
-          studentId,
-          studentName: student.name,
-          profileType,
-          profileLength: generatedProfile.length,
-          hasSupplementalDocs: profileType === 'hero' && (formData.supplementalDocuments?.length > 0),
-          insightsGenerated: profileType === 'hero' && profileInsights !== null
+          return saveAutismProfile({ user, profile, student, intake, profileType, generatedProfile, insights })
         })
 
-        const response = {
-          profileId: autismProfile.id,
-          generatedProfile,
-          profileType,
-          studentName: student.name,
-          createdBy: profile.first_name + ' ' + profile.last_name
-        }
-
-        // Add Hero Plan exclusive data to response
-        if (profileType === 'hero') {
-          response.profileInsights = profileInsights
-          response.helpfulSupports = helpfulSupports
-          response.situationsToAvoid = situationsToAvoid
-          response.classroomTips = classroomTips
-          response.topNeeds = topNeeds
+        const generated = NextResponse.json(await settleCoalesced(call))
+        if (call.shared) {
+          generated.headers.set('X-Coalesced', 'true')
         }
-
-        return handleCORS(NextResponse.json(response))
+        return handleCORS(generated)
 
       } catch (error) {
         console.error('Autism Profile Generation Error:', error)
-        return handleCORS(NextResponse.json({ error: "Failed to generate autism profile" }, { status: 500 }))
+        return generationErrorResponse(error, "Failed to generate autism profile")
       }
     }
 
     // Get Autism Profiles - GET /api/autism-profiles
+    // ?limit=&cursor= pages by keyset on (created_at, id), next cursor in X-Next-Cursor.
+    // Advocates go through the advocate_autism_profiles RPC, which joins their
+    // active assignments in the database instead of filtering a page in JS.
     if (route === '/autism-profiles' && method === 'GET') {
       const { user, profile, error } = await withAuth(request)
       if (error) {
         return handleCORS(NextResponse.json({ error }, { status: 401 }))
       }
 
+      const { searchParams } = new URL(request.url)
+      const cursorParam = searchParams.get('cursor')
+      const after = cursorParam ? decodeRowCursor(cursorParam) : null
+      if (cursorParam && !after) {
+        return handleCORS(NextResponse.json({ error: "Invalid cursor" }, { status: 400 }))
+      }
+      const requested = parseInt(searchParams.get('limit') || PROFILE_PAGE_SIZE, 10)
+      const limit = Math.min(Math.max(requested || PROFILE_PAGE_SIZE, 1), PROFILE_MAX_PAGE_SIZE)
+
       try {
-        let query = supabase
-          .from('autism_profiles')
-          .select(`
-            id,
-            student_id,
-            generated_profile,
-            profile_type,
-            is_shared,
-            created_at,
-            students (
+        let rows
+        // One extra row tells whether another page exists
+        if (profile.role === 'advocate') {
+          const { data, error: fetchError } = await timed('supabase_profiles', () => supabase.rpc('advocate_autism_profiles', {
+            p_advocate_id: user.id,
+            p_before: after?.createdAt ?? null,
+            p_before_id: after?.id ?? null,
+            p_limit: limit + 1
+          }))
+          if (fetchError) throw fetchError
+          rows = data || []
+        } else {
+          let query = supabase
+            .from('autism_profiles')
+            .select(`
               id,
-              name,
-              grade_level,
-              parent_id
-            )
-          `)
-
-        // Apply role-based filtering
-        if (profile.role === 'parent') {
-          query = query.eq('user_id', user.id)
-        } else if (profile.role === 'advocate') {
-          // Advocates see profiles for assigned students
-          query = query.in('student_id', 
-            // This would need a subquery - for now let's get all and filter
-          )
-        }
-
-        const { data, error: fetchError } = await query
-          .order('created_at', { ascending: false })
-          .limit(50)
-
-        if (fetchError) throw fetchError
+              student_id,
+              generated_profile,
+              profile_type,
+              is_shared,
+              created_at,
+              students (
+                id,
+                name,
+                grade_level,
+                parent_id
+              )
+            `)
 
-        // For advocates, filter by assigned students
-        let filteredData = data || []
-        if (profile.role === 'advocate') {
-          const { data: assignments } = await supabase
-            .from('student_advocate_assignments')
-            .select('student_id')
-            .eq('advocate_id', user.id)
-            .eq('is_active', true)
+          if (profile.role === 'parent') {
+            query = query.eq('user_id', user.id)
+          }
+          if (after) {
+            query = query.or(`created_at.lt.${after.createdAt},and(created_at.eq.${after.createdAt},id.lt.${after.id})`)
+          }
 
-          const assignedStudentIds = assignments?.map(a => a.student_id) || []
-          filteredData = filteredData.filter(profile => 
-            assignedStudentIds.includes(profile.student_id)
-          )
+          const { data, error: fetchError } = await timed('supabase_profiles', () => query
+            .order('created_at', { ascending: false })
+            .order('id', { ascending: false })
+            .limit(limit + 1))
+          if (fetchError) throw fetchError
+          rows = data || []
         }
 
-        return handleCORS(NextResponse.json({ profiles: filteredData }))
+        const profiles = rows.slice(0, limit)
+        const response = NextResponse.json({ profiles })
+        if (rows.length > limit) {
+          response.headers.set('X-Next-Cursor', encodeRowCursor(profiles[profiles.length - 1]))
+        }
+        return handleCORS(response)
 
       } catch (error) {
         console.error('Failed to fetch autism profiles:', error)
@@ -1360,6 +2115,7 @@ Respond with ONLY valid JSON in this exact format:
           .from('user_profiles')
           .update({ plan_type: 'free', updated_at: new Date().toISOString() })
           .eq('id', user.id)
+        invalidateUserProfile(user.id)
 
         // Log cancellation
         await logUserEvent(user.id, 'subscription_cancelled', { subscriptionId: subscriptions.data[0].id })
@@ -1373,19 +2129,41 @@ Respond with ONLY valid JSON in this exact format:
 
     // ===== PLAN ENFORCEMENT =====
 
+    // Current user's profile - GET /api/auth/profile
+    if (route === '/auth/profile' && method === 'GET') {
+      const { user, profile, error } = await withAuth(request)
+      if (error) {
+        return handleCORS(NextResponse.json({ error }, { status: 401 }))
+      }
+
+      return handleCORS(NextResponse.json({ profile }))
+    }
+
+    // Re-read the profile after it changed outside the API (Stripe checkout
+    // return, profile edits made from the client) - POST /api/auth/profile/refresh
+    if (route === '/auth/profile/refresh' && method === 'POST') {
+      const { user, error } = await withAuth(request)
+      if (error) {
+        return handleCORS(NextResponse.json({ error }, { status: 401 }))
+      }
+
+      invalidateUserProfile(user.id)
+      const profile = await getUserProfile(user.id)
+      if (!profile) {
+        return handleCORS(NextResponse.json({ error: 'Profile not found' }, { status: 404 }))
+      }
+
+      return handleCORS(NextResponse.json({ profile }))
+    }
+
     // Check Plan Access - POST /api/auth/check-plan
     if (route === '/auth/check-plan' && method === 'POST') {
       const body = await request.json()
       const { userId, requiredPlan, feature } = body
 
-      // Get user profile from Supabase
-      const { data: profile, error } = await supabase
-        .from('user_profiles')
-        .select('*')
-        .eq('id', userId)
-        .single()
+      const profile = await getUserProfile(userId)
 
-      if (error || !profile) {
+      if (!profile) {
         return handleCORS(NextResponse.json({ hasAccess: false, error: 'User not found' }))
       }
 
@@ -1433,7 +2211,7 @@ Respond with ONLY valid JSON in this exact format:
       await logUserEvent(advocateId, 'parent_assigned', { parentId, matchReason })
       
       // Trigger advocate notification email
-      await sendAdvocateMatchNotification(advocateId, parentId)
+      runInBackground(sendAdvocateMatchNotification(advocateId, parentId))
 
       return handleCORS(NextResponse.json({ success: true }))
     }
@@ -1446,17 +2224,15 @@ Respond with ONLY valid JSON in this exact format:
       await logUserEvent(userId, 'user_signup', { userEmail, role, planType })
       
       // Send welcome email based on plan type
-      if (planType === 'hero') {
-        await sendHeroPlanWelcomeEmail(userEmail, userId)
-      } else {
-        await sendWelcomeEmail(userEmail, userId)
-      }
+      runInBackground(planType === 'hero' ? sendHeroPlanWelcomeEmail(userEmail, userId) : sendWelcomeEmail(userEmail, userId))
 
       return handleCORS(NextResponse.json({ success: true }))
     }
 
     // Generate Accommodations - POST /api/accommodations/generate
-    if (route === '/accommodations/generate' && method === 'POST') {
+    // POST /api/accommodations/generate/stream sends the same result as SSE:
+    // meta, token while the JSON is written, done
+    if ((route === '/accommodations/generate' || route === '/accommodations/generate/stream') && method === 'POST') {
       const { user, profile, error } = await withAuth(request)
       if (error) {
         return handleCORS(NextResponse.json({ error }, { status: 401 }))
@@ -1472,7 +2248,8 @@ Respond with ONLY valid JSON in this exact format:
         behavioralChallenges,
         communicationMethod,
         additionalInfo,
-        selectedParentId // For advocates working on behalf of parents
+        selectedParentId, // For advocates working on behalf of parents
+        bypassCache // Force a fresh generation (the result still refreshes the cache)
       } = body
 
       if (!studentId && (!childName || !gradeLevel || !diagnosisAreas?.length || !communicationMethod)) {
@@ -1488,11 +2265,11 @@ Respond with ONLY valid JSON in this exact format:
 
       // If studentId is provided, fetch student data
       if (studentId) {
-        const { data: student, error: studentError } = await supabase
+        const { data: student, error: studentError } = await timed('supabase_student', () => supabase
           .from('students')
           .select('*')
           .eq('id', studentId)
-          .single()
+          .single())
 
         if (studentError || !student) {
           return handleCORS(NextResponse.json({ error: "Student not found" }, { status: 404 }))
@@ -1506,24 +2283,24 @@ Respond with ONLY valid JSON in this exact format:
         }
 
         if (profile.role === 'advocate') {
-          const { data: assignment } = await supabase
+          const { data: assignment } = await timed('supabase_assignment', () => supabase
             .from('student_advocate_assignments')
             .select('id')
             .eq('student_id', studentId)
             .eq('advocate_id', user.id)
             .eq('is_active', true)
-            .single()
+            .single())
 
           if (!assignment) {
             return handleCORS(NextResponse.json({ error: "Access denied to this student" }, { status: 403 }))
           }
 
           // Get parent's plan type for advocates
-          const { data: parent } = await supabase
+          const { data: parent } = await timed('supabase_parent_plan', () => supabase
             .from('user_profiles')
             .select('plan_type')
             .eq('id', student.parent_id)
-            .single()
+            .single())
           
           if (parent) {
             actualPlanType = parent.plan_type
@@ -1531,136 +2308,270 @@ Respond with ONLY valid JSON in this exact format:
         }
       }
 
-      // Use student data if available, otherwise use provided data
-      const accommodationData = {
-        childName: studentData?.name || childName,
-        gradeLevel: studentData?.grade_level || gradeLevel,
-        diagnosisAreas: studentData?.diagnosis_areas || diagnosisAreas,
-        sensoryPreferences: studentData?.sensory_preferences || sensoryPreferences,
-        behavioralChallenges: studentData?.behavioral_challenges || behavioralChallenges,
-        communicationMethod: studentData?.communication_method || communicationMethod,
-        additionalInfo: studentData?.additional_notes || additionalInfo
-      }
+      const accommodationData = resolveAccommodationData(studentData, body)
+      const skipCache = bypassCache === true || (request.headers.get('cache-control') || '').includes('no-cache')
+      const saveSession = (accommodationsData) => saveAccommodationSession({
+        user, profile, studentId, studentData, accommodationData, planType: actualPlanType, accommodationsData
+      })
 
-      // Enhanced prompt for Hero users
-      const accommodationCount = actualPlanType === 'hero' ? 15 : 8
-      const modelToUse = "gpt-4o"
-      
-      const prompt = `You are an expert IEP accommodation specialist. Create ${accommodationCount} personalized, specific, and implementable IEP accommodations for a child with the following profile:
+      if (route.endsWith('/stream')) {
+        const cacheKey = accommodationCacheKey(accommodationData, actualPlanType, ACCOMMODATION_MODEL)
+        const cached = skipCache ? undefined : accommodationCache.get(cacheKey)
+        const cacheStatus = skipCache ? 'BYPASS' : (cached ? 'HIT' : 'MISS')
+
+        const stream = createSseStream(async (send, signal) => {
+          send('meta', { planType: actualPlanType, cache: cacheStatus })
+
+          let accommodationsData = cached
+          if (!accommodationsData) {
+            const completionRequest = accommodationCompletion(accommodationData, actualPlanType)
+            const completion = await completions.create({ ...completionRequest, stream: true }, { signal })
+            let content = ''
+            let finishReason
+            for await (const chunk of completion) {
+              const delta = chunk.choices[0]?.delta?.content
+              if (delta) {
+                content += delta
+                send('token', { text: delta })
+              }
+              finishReason = chunk.choices[0]?.finish_reason || finishReason
+            }
+            // Tokens already went to the client, so a cut-off reply keeps its finished items
+            const parsed = parseAiJson(content, { schema: ACCOMMODATIONS_SCHEMA, finishReason })
+            accommodationsData = parsed.data
+            // Partial plans are served but not cached, as in generateAccommodationPlan
+            if (!parsed.needsContinuation) {
+              accommodationCache.set(cacheKey, accommodationsData)
+            }
+          }
 
-Child Name: ${accommodationData.childName}
-Grade Level: ${accommodationData.gradeLevel}
-Diagnosis Areas: ${accommodationData.diagnosisAreas.join(', ')}
-Sensory Preferences: ${accommodationData.sensoryPreferences.join(', ')}
-Behavioral Challenges: ${accommodationData.behavioralChallenges.join(', ')}
-Communication Method: ${accommodationData.communicationMethod}
-Additional Information: ${accommodationData.additionalInfo}
+          send('done', await saveSession(accommodationsData))
+        })
+        const streamed = new NextResponse(stream, { headers: SSE_HEADERS })
+        streamed.headers.set('X-Cache', cacheStatus)
+        return handleCORS(streamed)
+      }
 
-${actualPlanType === 'hero' ? 'HERO PLAN: Provide enhanced, detailed accommodations with legal compliance considerations and implementation timelines.' : ''}
+      try {
+        const { result, cacheStatus, shared } = await generateAccommodationSession({
+          user, profile, studentId, studentData, accommodationData, planType: actualPlanType, skipCache
+        })
 
-Generate accommodations that are:
-1. Specific and actionable for teachers
-2. Evidence-based and legally compliant
-3. Tailored to this child's unique needs
-4. Appropriate for their grade level
-5. Cover different areas: academic, behavioral, sensory, communication, and environmental
+        const generated = NextResponse.json(result)
+        generated.headers.set('X-Cache', cacheStatus)
+        if (shared) {
+          generated.headers.set('X-Coalesced', 'true')
+        }
+        return handleCORS(generated)
 
-Return the accommodations in this exact JSON format:
-{
-  "accommodations": [
-    {
-      "title": "Clear, concise accommodation title",
-      "description": "Detailed description of the accommodation and when to use it",
-      "category": "Academic|Behavioral|Sensory|Communication|Environmental",
-      "implementation": "Specific steps for implementation"
+      } catch (openaiError) {
+        console.error('OpenAI API Error:', openaiError)
+        return generationErrorResponse(openaiError, "Failed to generate accommodations. Please try again.")
+      }
     }
-  ]
-}
 
-Focus on practical accommodations that address the specific challenges mentioned.`
+    // Batch Accommodations - POST /api/accommodations/generate/batch
+    // Body: { students: [<generate payload>, ...], concurrency, bypassCache }.
+    // Authenticates once, loads students, assignments and parent plans with one
+    // query each, then streams one NDJSON line per student as it finishes
+    // (in completion order, tagged with its index) and a final summary line.
+    if (route === '/accommodations/generate/batch' && method === 'POST') {
+      const { user, profile, error } = await withAuth(request)
+      if (error) {
+        return handleCORS(NextResponse.json({ error }, { status: 401 }))
+      }
 
-      try {
-        const completion = await openai.chat.completions.create({
-          model: modelToUse,
-          messages: [
-            {
-              role: "system",
-              content: actualPlanType === 'hero' 
-                ? "You are an expert IEP accommodation specialist with deep knowledge of autism support strategies, special education law, and evidence-based practices. For Hero Plan users, provide enhanced detail, legal compliance notes, and comprehensive implementation guidance. Always respond with valid JSON only."
-                : "You are an expert IEP accommodation specialist with deep knowledge of autism support strategies, special education law, and evidence-based practices. Always respond with valid JSON only."
-            },
-            {
-              role: "user",
-              content: prompt
-            }
-          ],
-          temperature: 0.7,
-          max_tokens: actualPlanType === 'hero' ? 3500 : 2500
-        })
+      const body = await request.json()
+      const items = Array.isArray(body.students) ? body.students : []
 
-        const response = completion.choices[0].message.content
-        let accommodationsData
+      if (items.length === 0) {
+        return handleCORS(NextResponse.json({ error: "students must be a non-empty array" }, { status: 400 }))
+      }
+      if (items.length > ACCOMMODATION_BATCH_MAX) {
+        return handleCORS(NextResponse.json(
+          { error: `A batch can hold at most ${ACCOMMODATION_BATCH_MAX} students` },
+          { status: 400 }
+        ))
+      }
 
-        try {
-          let cleanedResponse = response.trim()
-          
-          if (cleanedResponse.startsWith('```json')) {
-            cleanedResponse = cleanedResponse.replace(/^```json\s*/, '').replace(/\s*```$/, '')
-          } else if (cleanedResponse.startsWith('```')) {
-            cleanedResponse = cleanedResponse.replace(/^```\s*/, '').replace(/\s*```$/, '')
+      const concurrency = Math.min(
+        Math.max(parseInt(body.concurrency, 10) || ACCOMMODATION_BATCH_CONCURRENCY, 1),
+        ACCOMMODATION_BATCH_CONCURRENCY
+      )
+      const skipCache = body.bypassCache === true || (request.headers.get('cache-control') || '').includes('no-cache')
+
+      const studentIds = [...new Set(items.map(item => item?.studentId).filter(Boolean))]
+      let students = new Map()
+      let assignedStudents = new Set()
+      let parentPlans = new Map()
+
+      if (studentIds.length > 0) {
+        const { data: studentRows, error: studentsError } = await supabase
+          .from('students')
+          .select('*')
+          .in('id', studentIds)
+
+        if (studentsError) throw studentsError
+        students = new Map(studentRows.map(student => [student.id, student]))
+
+        if (profile.role === 'advocate') {
+          const { data: assignments } = await supabase
+            .from('student_advocate_assignments')
+            .select('student_id')
+            .in('student_id', studentIds)
+            .eq('advocate_id', user.id)
+            .eq('is_active', true)
+          assignedStudents = new Set((assignments || []).map(assignment => assignment.student_id))
+
+          // Get parents' plan types for advocates
+          const parentIds = [...new Set(
+            [...students.values()].filter(student => assignedStudents.has(student.id)).map(student => student.parent_id)
+          )]
+          if (parentIds.length > 0) {
+            const { data: parents } = await supabase
+              .from('user_profiles')
+              .select('id, plan_type')
+              .in('id', parentIds)
+            parentPlans = new Map((parents || []).map(parent => [parent.id, parent.plan_type]))
           }
-          
-          accommodationsData = JSON.parse(cleanedResponse)
-        } catch (parseError) {
-          console.error('Failed to parse OpenAI response:', parseError)
-          throw new Error('Invalid response format from AI')
         }
+      }
 
-        // Save to accommodation_sessions with student reference
-        const { data: session, error: sessionError } = await supabase
-          .from('accommodation_sessions')
-          .insert([{
-            student_id: studentId,
-            child_name: accommodationData.childName,
-            grade_level: accommodationData.gradeLevel,
-            diagnosis_areas: accommodationData.diagnosisAreas,
-            sensory_preferences: accommodationData.sensoryPreferences,
-            behavioral_challenges: accommodationData.behavioralChallenges,
-            communication_method: accommodationData.communicationMethod,
-            additional_info: accommodationData.additionalInfo,
-            plan_type: actualPlanType,
-            accommodations: accommodationsData.accommodations,
-            created_by: user.id,
-            for_parent: studentData?.parent_id || user.id
-          }])
-          .select()
-          .single()
+      // Same validation and access rules as the single endpoint, per student
+      const jobs = items.map((item = {}, index) => {
+        const { studentId } = item
+        const studentData = studentId ? students.get(studentId) : null
 
-        if (sessionError) throw sessionError
+        if (!studentId && (!item.childName || !item.gradeLevel || !item.diagnosisAreas?.length || !item.communicationMethod)) {
+          return { index, studentId, status: 400, error: "Student ID or complete child information is required" }
+        }
+        if (studentId && !studentData) {
+          return { index, studentId, status: 404, error: "Student not found" }
+        }
+        if (studentData && profile.role === 'parent' && studentData.parent_id !== user.id) {
+          return { index, studentId, status: 403, error: "Access denied to this student" }
+        }
+        if (studentData && profile.role === 'advocate' && !assignedStudents.has(studentId)) {
+          return { index, studentId, status: 403, error: "Access denied to this student" }
+        }
 
-        // Log accommodation generation
-        await logUserEvent(user.id, 'accommodations_generated', {
-          studentId,
-          studentName: accommodationData.childName,
-          accommodationCount: accommodationsData.accommodations.length,
-          planType: actualPlanType
-        })
+        const planType = (profile.role === 'advocate' && studentData && parentPlans.get(studentData.parent_id)) || profile.plan_type
+        return { index, studentId, studentData, planType, accommodationData: resolveAccommodationData(studentData, item) }
+      })
 
-        return handleCORS(NextResponse.json({
-          sessionId: session.id,
-          ...accommodationsData,
-          createdBy: profile.first_name + ' ' + profile.last_name,
-          createdByRole: profile.role,
-          planType: actualPlanType,
-          studentId
+      const encoder = new TextEncoder()
+      let cancelled = false
+      const stream = new ReadableStream({
+        async start(controller) {
+          const emit = (line) => {
+            if (!cancelled) {
+              controller.enqueue(encoder.encode(JSON.stringify(line) + '\n'))
+            }
+          }
+          const started = Date.now()
+          let succeeded = 0
+
+          await runWithConcurrency(jobs, concurrency, async (job) => {
+            if (cancelled) return
+            if (job.error) {
+              emit({ index: job.index, studentId: job.studentId, status: job.status, error: job.error })
+              return
+            }
+            try {
+              const { result, cacheStatus } = await generateAccommodationSession({
+                user,
+                profile,
+                studentId: job.studentId,
+                studentData: job.studentData,
+                accommodationData: job.accommodationData,
+                planType: job.planType,
+                skipCache
+              })
+              succeeded++
+              emit({ index: job.index, studentId: job.studentId, status: 200, cache: cacheStatus, result })
+            } catch (generationError) {
+              console.error('Batch accommodation error:', generationError)
+              const unavailable = generationError instanceof UpstreamUnavailableError
+              emit({
+                index: job.index,
+                studentId: job.studentId,
+                status: unavailable ? 503 : 500,
+                error: unavailable ? 'The AI service is temporarily unavailable. Please try again shortly.' : 'Failed to generate accommodations. Please try again.'
+              })
+            }
+          })
+
+          emit({ done: true, total: jobs.length, succeeded, failed: jobs.length - succeeded, concurrency, elapsedMs: Date.now() - started })
+          if (!cancelled) {
+            controller.close()
+          }
+        },
+        cancel() {
+          cancelled = true
+        }
+      })
+
+      return handleCORS(new NextResponse(stream, { headers: { 'Content-Type': 'application/x-ndjson' } }))
+    }
+
+    // In-process cache counters
+    if (route === '/cache/stats' && method === 'GET') {
+      return handleCORS(NextResponse.json({
+        accommodations: accommodationCache.stats(),
+        authTokens: authTokenCache.stats(),
+        profiles: profileCache.stats(),
+        userDirectory: users.stats(),
+        generationsInFlight: generationRequests.stats(),
+        events: { ...events.stats(), backgroundTasks: backgroundTasks.size },
+        sessionEvents: sessionEvents.stats(),
+        openai: completions.stats()
+      }))
+    }
+
+    // Accommodation history, newest first: the sessions the caller created or
+    // that were generated for them.
+    // ?limit=&cursor= pages by keyset (next cursor in X-Next-Cursor);
+    // ?format=ndjson (or Accept: application/x-ndjson) streams every record
+    if (route === '/accommodations' && method === 'GET') {
+      const { user, error } = await withAuth(request)
+      if (error) {
+        return handleCORS(NextResponse.json({ error }, { status: 401 }))
+      }
+
+      const { searchParams } = new URL(request.url)
+      const cursorParam = searchParams.get('cursor')
+      const after = cursorParam ? decodeRowCursor(cursorParam) : null
+
+      if (cursorParam && !after) {
+        return handleCORS(NextResponse.json({ error: "Invalid cursor" }, { status: 400 }))
+      }
+
+      const streaming = searchParams.get('format') === 'ndjson' ||
+        (request.headers.get('accept') || '').includes('application/x-ndjson')
+
+      if (streaming) {
+        return handleCORS(new NextResponse(ndjsonStream(historyPages(user.id, after)), {
+          headers: { 'Content-Type': 'application/x-ndjson' }
         }))
+      }
 
-      } catch (openaiError) {
-        console.error('OpenAI API Error:', openaiError)
-        return handleCORS(NextResponse.json(
-          { error: "Failed to generate accommodations. Please try again." }, 
-          { status: 500 }
-        ))
+      const requested = parseInt(searchParams.get('limit') || HISTORY_PAGE_SIZE, 10)
+      const limit = Math.min(Math.max(requested || HISTORY_PAGE_SIZE, 1), HISTORY_MAX_PAGE_SIZE)
+
+      try {
+        // Fetch one extra row to know whether another page exists
+        const rows = await timed('supabase_history', () => fetchHistoryPage(user.id, after, limit + 1))
+
+        const page = rows.slice(0, limit)
+        const response = NextResponse.json(page.map(historyRecord))
+        if (rows.length > limit) {
+          response.headers.set('X-Next-Cursor', encodeRowCursor(page[page.length - 1]))
+        }
+        return handleCORS(response)
+
+      } catch (error) {
+        console.error('Failed to fetch accommodation history:', error)
+        return handleCORS(NextResponse.json({ error: 'Failed to fetch history' }, { status: 500 }))
       }
     }
 
@@ -1687,55 +2598,107 @@ Focus on practical accommodations that address the specific challenges mentioned
         .limit(50)
         .toArray()
 
-      const enrichedSessions = sessions.map(({ _id, ...session }) => {
-        const createdByUser = Object.values(mockUsers).find(u => u.id === session.createdBy)
-        const forParentUser = mockUsers[session.forParent]
-        
-        return {
-          ...session,
-          createdByName: createdByUser?.name || 'Unknown',
-          forParentName: forParentUser?.name || 'Unknown'
-        }
-      })
+      const names = await users.resolve(sessions.flatMap(session => [session.createdBy, session.forParent]))
+      const enrichedSessions = sessions.map(({ _id, ...session }) => withOwnerNames(session, names))
       
       return handleCORS(NextResponse.json(enrichedSessions))
     }
 
-    // Get Single Session
-    if (route.startsWith('/session/') && method === 'GET') {
+    // Get Single Session - GET /api/session/:id
+    // Comments are paged separately (GET /api/session/:id/comments); the body
+    // carries an ETag so an unchanged session polls as a bodiless 304
+    if (route.match(/^\/session\/[^\/]+$/) && method === 'GET') {
       const sessionId = route.split('/')[2]
       
-      const session = await db.collection('accommodation_sessions')
-        .findOne({ id: sessionId })
+      const session = await timed('mongo_session', () => db.collection('accommodation_sessions')
+        .findOne({ id: sessionId }, { projection: { _id: 0 } }))
       
       if (!session) {
         return handleCORS(NextResponse.json({ error: "Session not found" }, { status: 404 }))
       }
 
-      const comments = await db.collection('session_comments')
-        .find({ sessionId })
-        .sort({ timestamp: 1 })
-        .toArray()
+      const names = await users.resolve([session.createdBy, session.forParent])
+      const body = JSON.stringify(withOwnerNames(session, names))
+      const etag = bodyEtag(body)
+      const headers = { ETag: etag, 'Cache-Control': 'private, no-cache' }
 
-      const enrichedComments = comments.map(({ _id, ...comment }) => {
-        const user = Object.values(mockUsers).find(u => u.id === comment.userId)
-        return {
-          ...comment,
-          userName: user?.name || 'Unknown',
-          userRole: user?.role || 'unknown'
-        }
-      })
+      if (etagMatches(request, etag)) {
+        return handleCORS(new NextResponse(null, { status: 304, headers }))
+      }
+      return handleCORS(new NextResponse(body, { headers: { ...headers, 'Content-Type': 'application/json' } }))
+    }
+
+    // Session Comments - GET /api/session/:id/comments?limit=&cursor=
+    // ?since=<previous X-Sync-Since> returns only comments added after it;
+    // X-Sync-Since is the value to send on the next poll
+    if (route.match(/^\/session\/[^\/]+\/comments$/) && method === 'GET') {
+      const sessionId = route.split('/')[2]
+      const { searchParams } = new URL(request.url)
+      const cursorParam = searchParams.get('cursor')
+      const sinceParam = searchParams.get('since')
+      const since = sinceParam ? decodeCommentSince(sinceParam) : null
+      const after = cursorParam ? decodeCommentCursor(cursorParam) : since
+
+      if (cursorParam && !after) {
+        return handleCORS(NextResponse.json({ error: "Invalid cursor" }, { status: 400 }))
+      }
+      if (sinceParam && !since) {
+        return handleCORS(NextResponse.json({ error: "Invalid since cursor" }, { status: 400 }))
+      }
+
+      const requested = parseInt(searchParams.get('limit') || COMMENT_PAGE_SIZE, 10)
+      const limit = Math.min(Math.max(requested || COMMENT_PAGE_SIZE, 1), COMMENT_MAX_PAGE_SIZE)
+
+      // Fetch one extra comment to know whether another page exists
+      const comments = await timed('mongo_comments', () => db.collection('session_comments')
+        .find(commentQuery(sessionId, after), { projection: { _id: 0 } })
+        .sort({ timestamp: 1, id: 1 })
+        .limit(limit + 1)
+        .toArray())
+
+      const page = comments.slice(0, limit)
+      const names = await users.resolve(page.map(comment => comment.userId))
+      const response = NextResponse.json(page.map(comment => withAuthor(comment, names)))
+      if (comments.length > limit) {
+        response.headers.set('X-Next-Cursor', encodeCommentCursor(page[page.length - 1]))
+      }
+      if (page.length) {
+        response.headers.set('X-Sync-Since', encodeCommentCursor(page[page.length - 1]))
+      } else if (sinceParam) {
+        response.headers.set('X-Sync-Since', sinceParam)
+      }
+      return handleCORS(response)
+    }
 
-      const { _id, ...cleanSession } = session
-      const createdByUser = Object.values(mockUsers).find(u => u.id === session.createdBy)
-      const forParentUser = mockUsers[session.forParent]
+    // Session Events - GET /api/session/:id/events (SSE)
+    // Pushes `comment` and `approval` events as they are written, so open
+    // workspaces need not poll. A reconnect with Last-Event-ID (or
+    // ?lastEventId=) replays what was missed, or sends `reset` when the client
+    // must re-fetch the session and comments instead.
+    if (route.match(/^\/session\/[^\/]+\/events$/) && method === 'GET') {
+      const sessionId = route.split('/')[2]
+      const { searchParams } = new URL(request.url)
+      const lastEventId = request.headers.get('last-event-id') || searchParams.get('lastEventId')
 
-      return handleCORS(NextResponse.json({
-        ...cleanSession,
-        createdByName: createdByUser?.name || 'Unknown',
-        forParentName: forParentUser?.name || 'Unknown',
-        comments: enrichedComments
+      const session = await timed('mongo_session', () => db.collection('accommodation_sessions')
+        .findOne({ id: sessionId }, { projection: { _id: 0, id: 1 } }))
+      if (!session) {
+        return handleCORS(NextResponse.json({ error: "Session not found" }, { status: 404 }))
+      }
+
+      const stream = createSseStream((send, signal) => new Promise(resolve => {
+        send('ready', { sessionId, subscribers: sessionEvents.subscriberCount(sessionId) + 1 })
+        const unsubscribe = sessionEvents.subscribe(
+          sessionId,
+          ({ id, event, data }) => send(event, data, id),
+          { lastEventId, onReset: () => send('reset', { sessionId }) }
+        )
+        signal.addEventListener('abort', () => {
+          unsubscribe()
+          resolve()
+        }, { once: true })
       }))
+      return handleCORS(new NextResponse(stream, { headers: SSE_HEADERS }))
     }
 
     // Add Comment
@@ -1762,13 +2725,10 @@ Focus on practical accommodations that address the specific challenges mentioned
 
       await db.collection('session_comments').insertOne(comment)
 
-      const user = Object.values(mockUsers).find(u => u.id === userId)
-      
-      return handleCORS(NextResponse.json({
-        ...comment,
-        userName: user?.name || 'Unknown',
-        userRole: user?.role || 'unknown'
-      }))
+      const names = await users.resolve([userId])
+      const enriched = withAuthor(comment, names)
+      sessionEvents.publish(sessionId, 'comment', enriched)
+      return handleCORS(NextResponse.json(enriched))
     }
 
     // Update Approval
@@ -1777,7 +2737,7 @@ Focus on practical accommodations that address the specific challenges mentioned
       const body = await request.json()
       const { userId, approved, section = 'accommodations' } = body
 
-      const user = Object.values(mockUsers).find(u => u.id === userId)
+      const user = mockUsers[userId]
       if (!user || user.role !== 'advocate') {
         return handleCORS(NextResponse.json(
           { error: "Only advocates can approve sessions" }, 
@@ -1792,11 +2752,19 @@ Focus on practical accommodations that address the specific challenges mentioned
         lastModified: new Date()
       }
 
-      await db.collection('accommodation_sessions').updateOne(
+      const { matchedCount } = await db.collection('accommodation_sessions').updateOne(
         { id: sessionId },
         { $set: update }
       )
 
+      if (matchedCount) {
+        sessionEvents.publish(sessionId, 'approval', {
+          section,
+          approved,
+          approvedBy: update['approvals.approvedBy'],
+          approvedAt: update['approvals.approvedAt']
+        })
+      }
       return handleCORS(NextResponse.json({ success: true, approved, section }))
     }
 
@@ -1879,20 +2847,12 @@ async function generateIEPTemplate(session, templateType) {
   return template
 }
 
-// Logging helper function
-async function logUserEvent(userId, eventType, eventData = {}) {
-  try {
-    await db.collection('user_events').insertOne({
-      id: uuidv4(),
-      userId,
-      eventType,
-      eventData,
-      timestamp: new Date(),
-      createdAt: new Date()
-    })
-  } catch (error) {
-    console.error('Failed to log user event:', error)
-  }
+// Logging helper function: queues the event for the next batched write.
+// Returns at once unless the buffer is backed up, then waits for a flush.
+function logUserEvent(userId, eventType, eventData = {}) {
+  const now = new Date()
+  const event = { id: uuidv4(), userId, eventType, eventData, timestamp: now, createdAt: now }
+  return events.saturated ? timed('event_backpressure', () => events.push(event)) : events.push(event)
 }
 
 // Email notification functions
@@ -1920,17 +2880,7 @@ async function sendHeroPlanWelcomeEmail(email, userId) {
 async function sendAdvocateMatchNotification(advocateId, parentId) {
   try {
     // Get advocate and parent details
-    const { data: advocate } = await supabase
-      .from('user_profiles')
-      .select('*')
-      .eq('id', advocateId)
-      .single()
-      
-    const { data: parent } = await supabase
-      .from('user_profiles')
-      .select('*')
-      .eq('id', parentId)
-      .single()
+    const [advocate, parent] = await Promise.all([getUserProfile(advocateId), getUserProfile(parentId)])
 
     if (advocate && parent) {
       console.log(`Notifying advocate ${advocate.email} about new parent assignment: ${parent.email}`)
@@ -82,6 +82,29 @@ const App = () => {
     loadUsers()
   }, [])
 
+  // Live comments and approvals for the open session, pushed over SSE
+  const sessionId = currentSession?.id
+  useEffect(() => {
+    if (!sessionId) return
+    const events = new EventSource(`/api/session/${sessionId}/events`)
+    events.addEventListener('comment', (event) => {
+      const comment = JSON.parse(event.data)
+      setComments(prev => prev.some(c => c.id === comment.id) ? prev : [...prev, comment])
+    })
+    events.addEventListener('approval', (event) => {
+      const { section, approved, approvedBy, approvedAt } = JSON.parse(event.data)
+      setCurrentSession(prev => prev && ({
+        ...prev,
+        approvals: { ...prev.approvals, [`${section}Approved`]: approved, approvedBy, approvedAt }
+      }))
+    })
+    // Missed events could not be replayed after a reconnect: reload the thread
+    events.addEventListener('reset', () => {
+      loadComments(sessionId).then(setComments).catch(error => console.error('Failed to reload comments:', error))
+    })
+    return () => events.close()
+  }, [sessionId])
+
   const loadUsers = async () => {
     try {
       const response = await fetch('/api/auth/users')
@@ -178,6 +201,20 @@ const App = () => {
     }
   }
 
+  // Every comment of a session, following the pagination cursor
+  const loadComments = async (sessionId) => {
+    const comments = []
+    let cursor = null
+    do {
+      const params = new URLSearchParams({ limit: '500', ...(cursor ? { cursor } : {}) })
+      const response = await fetch(`/api/session/${sessionId}/comments?${params}`)
+      if (!response.ok) throw new Error('Failed to load comments')
+      comments.push(...await response.json())
+      cursor = response.headers.get('X-Next-Cursor')
+    } while (cursor)
+    return comments
+  }
+
   const loadSession = async (sessionId) => {
     try {
       const response = await fetch(`/api/session/${sessionId}`)
@@ -185,7 +222,7 @@ const App = () => {
       
       setCurrentSession(session)
       setAccommodations(session.accommodations)
-      setComments(session.comments || [])
+      setComments(await loadComments(sessionId))
       setCurrentStep(3) // Go to results
       
       // Fill form data if needed
@@ -221,7 +258,7 @@ const App = () => {
       if (!response.ok) throw new Error('Failed to add comment')
 
       const comment = await response.json()
-      setComments(prev => [...prev, comment])
+      setComments(prev => prev.some(c => c.id === comment.id) ? prev : [...prev, comment])
       setNewComment('')
       toast.success('Comment added')
     } catch (error) {
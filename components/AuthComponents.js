@@ -119,9 +119,31 @@ export const AuthProvider = ({ children }) => {
 
     if (error) throw error
     setProfile(data)
+    await refreshServerProfile()
     return data
   }
 
+  // The API caches profiles; have it re-read this one after the plan or the
+  // profile changed outside the API (Stripe checkout, edits made here)
+  const refreshServerProfile = async () => {
+    if (!session?.access_token) return null
+
+    try {
+      const response = await fetch('/api/auth/profile/refresh', {
+        method: 'POST',
+        headers: { 'Authorization': `Bearer ${session.access_token}` }
+      })
+      if (!response.ok) return null
+
+      const { profile: refreshed } = await response.json()
+      setProfile(refreshed)
+      return refreshed
+    } catch (error) {
+      console.error('Error refreshing profile:', error)
+      return null
+    }
+  }
+
   const value = {
     user,
     profile,
@@ -131,6 +153,7 @@ export const AuthProvider = ({ children }) => {
     signUp,
     signOut,
     updateProfile,
+    refreshServerProfile,
     supabase
   }
 
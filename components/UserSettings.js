@@ -31,7 +31,7 @@ import {
 import { toast } from 'sonner'
 
 export const UserSettings = () => {
-  const { user, profile, updateProfile } = useAuth()
+  const { user, session, profile, updateProfile, refreshServerProfile } = useAuth()
   const [loading, setLoading] = useState(false)
   const [billingHistory, setBillingHistory] = useState([])
   const [stripePortalLoading, setStripePortalLoading] = useState(false)
@@ -60,6 +60,21 @@ export const UserSettings = () => {
     }
   }, [profile])
 
+  // Back from Stripe checkout: the plan changed, so refresh the API's cached profile
+  useEffect(() => {
+    const params = new URLSearchParams(window.location.search)
+    if (!session || params.get('success') !== 'true') return
+
+    params.delete('success')
+    const query = params.toString()
+    window.history.replaceState(null, '', `${window.location.pathname}${query ? `?${query}` : ''}`)
+    refreshServerProfile().then(refreshed => {
+      if (refreshed?.plan_type === 'hero') {
+        toast.success('Welcome to the Hero Plan!')
+      }
+    })
+  }, [session])
+
   const loadBillingHistory = async () => {
     try {
       const response = await fetch('/api/billing/history', {
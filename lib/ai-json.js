@@ -0,0 +1,242 @@
+// Parsing of JSON replies from the model.
+// Well-formed replies (with or without ```json fences) go straight to
+// JSON.parse. A reply cut off at max_tokens, or otherwise broken, is scanned
+// once to find the last point where every value so far was complete; the text
+// is cut there and the open arrays/objects are closed, so finished array items
+// survive. The result is then checked against a schema: invalid items are
+// dropped, and `needsContinuation` tells the caller the reply was incomplete.
+
+export class AiJsonError extends Error {
+  constructor(message) {
+    super(message)
+    this.name = 'AiJsonError'
+  }
+}
+
+// Schemas: { type: 'object', properties, required }, { type: 'array', items, minItems },
+// { type: 'string' }, { type: 'number' }, or {} for anything
+const string = { type: 'string' }
+const strings = { type: 'array', items: string }
+
+export const ACCOMMODATIONS_SCHEMA = {
+  type: 'object',
+  required: ['accommodations'],
+  properties: {
+    accommodations: {
+      type: 'array',
+      minItems: 1,
+      items: {
+        type: 'object',
+        required: ['title', 'description'],
+        properties: { title: string, description: string, category: string, implementation: string }
+      }
+    }
+  }
+}
+
+export const INSIGHTS_SCHEMA = {
+  type: 'object',
+  required: ['topNeeds'],
+  properties: {
+    topNeeds: { ...strings, minItems: 1 },
+    topRecommendations: strings,
+    redFlags: strings,
+    helpfulSupports: strings,
+    situationsToAvoid: strings,
+    classroomTips: strings
+  }
+}
+
+export const ADVANCED_REVIEW_SCHEMA = {
+  type: 'object',
+  required: ['overall_assessment'],
+  properties: {
+    overall_assessment: { type: 'object', required: ['summary'], properties: { summary: string } },
+    detailed_review: { type: 'object', properties: {} },
+    recommendations: {
+      type: 'object',
+      properties: {
+        immediate_actions: strings,
+        additional_accommodations: { type: 'array', items: { type: 'object', required: ['title'], properties: { title: string } } },
+        goals_suggestions: strings
+      }
+    },
+    next_steps: { type: 'object', properties: {} }
+  }
+}
+
+// Body of a reply without surrounding prose or ``` fences
+export function stripFences(text) {
+  let start = 0
+  let end = text.length
+  const fence = text.indexOf('```')
+  if (fence !== -1 && !text.slice(0, fence).trim()) {
+    const lineEnd = text.indexOf('\n', fence)
+    start = lineEnd === -1 ? end : lineEnd + 1
+    const closing = text.lastIndexOf('```')
+    if (closing > start) {
+      end = closing
+    }
+  }
+  const object = text.indexOf('{', start)
+  const array = text.indexOf('[', start)
+  if (object !== -1 || array !== -1) {
+    start = object === -1 ? array : (array === -1 ? object : Math.min(object, array))
+  }
+  return text.slice(start, end).trim()
+}
+
+// The longest prefix of `text` that closes into valid JSON, or null.
+// One pass; `cut`/`closers` remember the last position after a complete value.
+export function repairTruncated(text) {
+  const stack = []
+  let inString = false
+  let escaped = false
+  let cut = -1
+  let closers = ''
+  // After `"key"` inside an object we are waiting for its value
+  let pendingKey = false
+
+  const mark = (position) => {
+    cut = position
+    closers = stack.slice().reverse().map(open => (open === '{' ? '}' : ']')).join('')
+  }
+
+  for (let i = 0; i < text.length; i++) {
+    const char = text[i]
+    if (inString) {
+      if (escaped) {
+        escaped = false
+      } else if (char === '\\') {
+        escaped = true
+      } else if (char === '"') {
+        inString = false
+        const inObject = stack[stack.length - 1] === '{'
+        if (inObject && !pendingKey) {
+          pendingKey = true
+        } else {
+          pendingKey = false
+          mark(i + 1)
+        }
+      }
+      continue
+    }
+    switch (char) {
+      case '"':
+        inString = true
+        break
+      case '{':
+      case '[':
+        stack.push(char)
+        pendingKey = false
+        mark(i + 1)
+        break
+      case '}':
+      case ']':
+        stack.pop()
+        pendingKey = false
+        mark(i + 1)
+        if (!stack.length) {
+          return text.slice(0, i + 1)
+        }
+        break
+      case ':':
+        break
+      case ',':
+        pendingKey = false
+        break
+      default:
+        // End of a bare number/true/false/null
+        if (!/\s/.test(char) && (i + 1 === text.length || /[\s,\]}]/.test(text[i + 1]))) {
+          if (i + 1 < text.length) {
+            pendingKey = false
+            mark(i + 1)
+          }
+        }
+    }
+  }
+
+  if (cut === -1) {
+    return null
+  }
+  // Cuts only follow complete values or openers, never a key or a comma
+  return text.slice(0, cut) + closers
+}
+
+function typeOf(value) {
+  return Array.isArray(value) ? 'array' : (value === null ? 'null' : typeof value)
+}
+
+// `value` cut down to what `schema` accepts; `report.dropped` counts removed items
+function conform(value, schema, report) {
+  if (!schema || !schema.type) {
+    return value
+  }
+  if (typeOf(value) !== schema.type) {
+    return undefined
+  }
+  if (schema.type === 'array') {
+    const items = []
+    for (const item of value) {
+      const kept = conform(item, schema.items, report)
+      if (kept === undefined) {
+        report.dropped++
+      } else {
+        items.push(kept)
+      }
+    }
+    return items.length >= (schema.minItems || 0) ? items : undefined
+  }
+  if (schema.type === 'object') {
+    const result = { ...value }
+    for (const [key, propertySchema] of Object.entries(schema.properties || {})) {
+      if (key in value) {
+        const kept = conform(value[key], propertySchema, report)
+        if (kept === undefined) {
+          delete result[key]
+        } else {
+          result[key] = kept
+        }
+      }
+    }
+    return (schema.required || []).every(key => key in result) ? result : undefined
+  }
+  return value
+}
+
+// { data, repaired, dropped, truncated, needsContinuation }; throws AiJsonError
+// when nothing schema-valid can be recovered. Pass the completion's
+// finish_reason so a reply cut at max_tokens is flagged even if it parses.
+export function parseAiJson(text, { schema, finishReason } = {}) {
+  const body = stripFences(text || '')
+  let data
+  let repaired = false
+  try {
+    data = JSON.parse(body)
+  } catch {
+    const salvageable = repairTruncated(body)
+    try {
+      data = salvageable === null ? undefined : JSON.parse(salvageable)
+    } catch {
+      data = undefined
+    }
+    repaired = true
+  }
+  if (data === undefined) {
+    throw new AiJsonError('Invalid response format from AI')
+  }
+
+  const report = { dropped: 0 }
+  const conformed = conform(data, schema, report)
+  if (conformed === undefined) {
+    throw new AiJsonError('AI response does not match the expected format')
+  }
+  const truncated = repaired || finishReason === 'length'
+  return {
+    data: conformed,
+    repaired,
+    dropped: report.dropped,
+    truncated,
+    needsContinuation: truncated || report.dropped > 0
+  }
+}
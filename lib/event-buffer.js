@@ -0,0 +1,147 @@
+// In-process buffer for analytics/audit events.
+// Callers push and move on; events are written in batches by `flush(events)`
+// (an insertMany) once `maxBatch` are queued or `flushIntervalMs` after the
+// first one. Above `highWaterMark` pending events a push waits for the next
+// flush (backpressure); at `maxPending` new events are dropped and counted
+// rather than growing memory without bound. A failed batch is put back and
+// retried up to `maxAttempts` times.
+export class EventBuffer {
+  constructor(flush, {
+    maxBatch = 500,
+    flushIntervalMs = 250,
+    highWaterMark = 5000,
+    maxPending = 20000,
+    maxAttempts = 3
+  } = {}) {
+    this.flushBatch = flush
+    this.maxBatch = maxBatch
+    this.flushIntervalMs = flushIntervalMs
+    this.highWaterMark = highWaterMark
+    this.maxPending = maxPending
+    this.maxAttempts = maxAttempts
+    this.pending = []
+    this.timer = null
+    this.flushing = null
+    this.drainWaiters = []
+    this.closed = false
+    this.accepted = 0
+    this.written = 0
+    this.batches = 0
+    this.dropped = 0
+    this.failed = 0
+    this.waited = 0
+  }
+
+  get saturated() {
+    return this.pending.length >= this.highWaterMark
+  }
+
+  // Resolves true once accepted (at once unless saturated), false if dropped
+  push(event) {
+    if (this.closed || this.pending.length >= this.maxPending) {
+      this.dropped++
+      return Promise.resolve(false)
+    }
+    this.pending.push({ event, attempts: 0 })
+    this.accepted++
+
+    if (this.pending.length >= this.maxBatch) {
+      this.flush()
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => this.flush(), this.flushIntervalMs)
+      this.timer.unref?.()
+    }
+
+    if (this.pending.length <= this.highWaterMark) {
+      return Promise.resolve(true)
+    }
+    this.waited++
+    return new Promise(resolve => this.drainWaiters.push(() => resolve(true)))
+  }
+
+  // Write everything queued so far, one batch at a time
+  flush() {
+    clearTimeout(this.timer)
+    this.timer = null
+    if (!this.flushing) {
+      this.flushing = this.drain().finally(() => {
+        this.flushing = null
+        // Events pushed during the last write get their own timer
+        if (this.pending.length && !this.timer && !this.closed) {
+          this.timer = setTimeout(() => this.flush(), this.flushIntervalMs)
+          this.timer.unref?.()
+        }
+      })
+    }
+    return this.flushing
+  }
+
+  async drain() {
+    while (this.pending.length) {
+      const batch = this.pending.splice(0, this.maxBatch)
+      try {
+        await this.flushBatch(batch.map(entry => entry.event))
+        this.written += batch.length
+        this.batches++
+      } catch (error) {
+        console.error('Failed to write event batch:', error)
+        const retry = batch.filter(entry => ++entry.attempts < this.maxAttempts)
+        this.failed += batch.length - retry.length
+        this.pending.unshift(...retry)
+        this.releaseWaiters()
+        // Leave the rest to the next timer rather than hammering a failing store
+        return
+      }
+      this.releaseWaiters()
+    }
+  }
+
+  releaseWaiters() {
+    if (this.pending.length <= this.highWaterMark) {
+      this.drainWaiters.splice(0).forEach(resolve => resolve())
+    }
+  }
+
+  // Stop accepting events and write what is left (used on shutdown)
+  async close() {
+    this.closed = true
+    for (let attempt = 0; this.pending.length && attempt < this.maxAttempts; attempt++) {
+      await this.flush()
+    }
+    this.drainWaiters.splice(0).forEach(resolve => resolve())
+  }
+
+  stats() {
+    return {
+      pending: this.pending.length,
+      accepted: this.accepted,
+      written: this.written,
+      batches: this.batches,
+      dropped: this.dropped,
+      failed: this.failed,
+      waited: this.waited,
+      maxBatch: this.maxBatch,
+      flushIntervalMs: this.flushIntervalMs,
+      highWaterMark: this.highWaterMark,
+      maxPending: this.maxPending
+    }
+  }
+}
+
+// Run `task` (e.g. a final flush) before the process exits on SIGTERM/SIGINT,
+// giving up after `timeoutMs` so a dead store cannot block shutdown
+export function onShutdown(task, { timeoutMs = 5000 } = {}) {
+  const run = async (signal) => {
+    await Promise.race([
+      Promise.resolve().then(task).catch(error => console.error('Shutdown task failed:', error)),
+      new Promise(resolve => setTimeout(resolve, timeoutMs).unref?.())
+    ])
+    // With no other handler left the default action (exit) is ours to restore
+    if (signal && process.listenerCount(signal) === 0) {
+      process.kill(process.pid, signal)
+    }
+  }
+  process.once('SIGTERM', run)
+  process.once('SIGINT', run)
+  process.once('beforeExit', () => run())
+}
@@ -0,0 +1,34 @@
+// Request coalescing: concurrent callers with the same key share one promise.
+// The entry is dropped as soon as the work settles, so only overlapping calls
+// are merged; nothing is cached once the shared call has finished.
+export class InFlight {
+  constructor() {
+    this.pending = new Map()
+    this.started = 0
+    this.joined = 0
+  }
+
+  // { promise, shared }: `shared` is true when an identical call was already running
+  run(key, fn) {
+    const running = this.pending.get(key)
+    if (running) {
+      this.joined++
+      return { promise: running, shared: true }
+    }
+
+    this.started++
+    const promise = Promise.resolve()
+      .then(fn)
+      .finally(() => this.pending.delete(key))
+    this.pending.set(key, promise)
+    return { promise, shared: false }
+  }
+
+  stats() {
+    return {
+      inFlight: this.pending.size,
+      started: this.started,
+      joined: this.joined
+    }
+  }
+}
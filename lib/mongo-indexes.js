@@ -0,0 +1,32 @@
+import indexSet from './mongo-indexes.json'
+
+// Versioned index set for the hot Mongo query shapes in the API routes.
+// Generated and verified with `python -m tests.index_advisor --write`.
+// Indexes listed under `retired` served queries that are gone; they are
+// dropped on connect so they stop costing writes.
+export const MONGO_INDEX_VERSION = indexSet.version
+
+export async function ensureIndexes(db) {
+  const collections = Object.entries(indexSet.indexes)
+  const retired = Object.entries(indexSet.retired || {})
+  await Promise.all(retired.map(async ([collection, names]) => {
+    for (const name of names) {
+      try {
+        await db.collection(collection).dropIndex(name)
+      } catch (error) {
+        // Already gone (or never built) is the expected case
+        if (error.codeName !== 'IndexNotFound' && error.codeName !== 'NamespaceNotFound') {
+          console.error(`Failed to drop index ${name} on ${collection}:`, error)
+        }
+      }
+    }
+  }))
+  await Promise.all(collections.map(async ([collection, indexes]) => {
+    try {
+      await db.collection(collection).createIndexes(indexes)
+    } catch (error) {
+      // A conflicting index must not take the API down; log it and keep serving
+      console.error(`Failed to create indexes on ${collection}:`, error)
+    }
+  }))
+}
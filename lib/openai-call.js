@@ -0,0 +1,264 @@
+// Retry, rate-limit and circuit-breaker policy around OpenAI completions.
+// The SDK's own retries are disabled (maxRetries: 0) so every attempt goes
+// through here: a token bucket paces calls to the account quota, 429/5xx and
+// connection failures are retried with full-jitter backoff until the call's
+// deadline, and a breaker fails calls fast after repeated upstream failures.
+// Streams are retried only while opening; once tokens flow they are not replayed.
+import { APIConnectionError, APIError, APIUserAbortError } from 'openai'
+import { timed } from '@/lib/server-timing'
+
+// Thrown instead of calling OpenAI; routes answer 503 with Retry-After
+export class UpstreamUnavailableError extends Error {
+  constructor(message, retryAfterMs, cause) {
+    super(message, { cause })
+    this.name = 'UpstreamUnavailableError'
+    this.retryAfterMs = retryAfterMs
+  }
+}
+
+function sleep(ms, signal) {
+  return new Promise((resolve, reject) => {
+    if (signal?.aborted) {
+      return reject(signal.reason)
+    }
+    const timer = setTimeout(() => {
+      signal?.removeEventListener('abort', onAbort)
+      resolve()
+    }, ms)
+    const onAbort = () => {
+      clearTimeout(timer)
+      reject(signal.reason)
+    }
+    signal?.addEventListener('abort', onAbort, { once: true })
+  })
+}
+
+// `ratePerMinute` requests per minute, up to `burst` at once
+export class TokenBucket {
+  constructor({ ratePerMinute = 500, burst = 50 } = {}) {
+    this.ratePerMs = ratePerMinute / 60000
+    this.burst = burst
+    this.tokens = burst
+    this.updatedAt = Date.now()
+    this.waits = 0
+  }
+
+  refill() {
+    const now = Date.now()
+    this.tokens = Math.min(this.burst, this.tokens + (now - this.updatedAt) * this.ratePerMs)
+    this.updatedAt = now
+  }
+
+  // Milliseconds until a token is free; the token is taken (reserved) either way
+  reserve() {
+    this.refill()
+    this.tokens -= 1
+    return this.tokens >= 0 ? 0 : Math.ceil(-this.tokens / this.ratePerMs)
+  }
+
+  // Hand back a reservation the caller will not use
+  release() {
+    this.tokens = Math.min(this.burst, this.tokens + 1)
+  }
+
+  stats() {
+    this.refill()
+    return {
+      ratePerMinute: Math.round(this.ratePerMs * 60000),
+      burst: this.burst,
+      available: Math.max(0, Math.floor(this.tokens)),
+      waits: this.waits
+    }
+  }
+}
+
+// closed -> open after `failureThreshold` consecutive 5xx/connection
+// failures; after `cooldownMs` one probe call is let through (half_open) and
+// its outcome closes or re-opens the breaker
+export class CircuitBreaker {
+  constructor({ failureThreshold = 5, cooldownMs = 10000 } = {}) {
+    this.failureThreshold = failureThreshold
+    this.cooldownMs = cooldownMs
+    this.state = 'closed'
+    this.failures = 0
+    this.openedAt = 0
+    this.probing = false
+    this.rejected = 0
+    this.trips = 0
+  }
+
+  // Milliseconds the caller must wait before trying, or 0 to go ahead
+  check() {
+    if (this.state === 'open') {
+      const remaining = this.openedAt + this.cooldownMs - Date.now()
+      if (remaining > 0) {
+        this.rejected++
+        return remaining
+      }
+      this.state = 'half_open'
+    }
+    if (this.state === 'half_open') {
+      if (this.probing) {
+        this.rejected++
+        return this.cooldownMs
+      }
+      this.probing = true
+    }
+    return 0
+  }
+
+  success() {
+    this.state = 'closed'
+    this.failures = 0
+    this.probing = false
+  }
+
+  // A probe that never reached OpenAI counts neither way
+  release() {
+    this.probing = false
+  }
+
+  failure() {
+    this.failures++
+    this.probing = false
+    if (this.state === 'half_open' || this.failures >= this.failureThreshold) {
+      if (this.state !== 'open') {
+        this.trips++
+      }
+      this.state = 'open'
+      this.openedAt = Date.now()
+    }
+  }
+
+  stats() {
+    return {
+      state: this.state,
+      failures: this.failures,
+      failureThreshold: this.failureThreshold,
+      cooldownMs: this.cooldownMs,
+      trips: this.trips,
+      rejected: this.rejected
+    }
+  }
+}
+
+function isRetryable(error) {
+  if (error instanceof APIUserAbortError) {
+    return false
+  }
+  if (error instanceof APIConnectionError) {
+    return true
+  }
+  return error instanceof APIError && (error.status === 429 || error.status >= 500)
+}
+
+// Server-requested delay from Retry-After / retry-after-ms, if any
+function retryAfterMs(error) {
+  const headers = error?.headers
+  const header = (name) => (typeof headers?.get === 'function' ? headers.get(name) : headers?.[name])
+  const millis = parseFloat(header('retry-after-ms'))
+  if (!Number.isNaN(millis)) {
+    return millis
+  }
+  const seconds = parseFloat(header('retry-after'))
+  return Number.isNaN(seconds) ? undefined : seconds * 1000
+}
+
+export class ResilientCompletions {
+  constructor(openai, {
+    deadlineMs = 45000,
+    maxRetries = 3,
+    baseDelayMs = 250,
+    maxDelayMs = 8000,
+    limiter = new TokenBucket(),
+    breaker = new CircuitBreaker()
+  } = {}) {
+    this.openai = openai
+    this.deadlineMs = deadlineMs
+    this.maxRetries = maxRetries
+    this.baseDelayMs = baseDelayMs
+    this.maxDelayMs = maxDelayMs
+    this.limiter = limiter
+    this.breaker = breaker
+    this.calls = 0
+    this.retries = 0
+    this.failures = 0
+  }
+
+  // openai.chat.completions.create with the policy applied.
+  // `deadlineMs` bounds the whole call including waits and retries.
+  async create(request, { signal, deadlineMs = this.deadlineMs } = {}) {
+    this.calls++
+    const deadline = Date.now() + deadlineMs
+
+    for (let attempt = 0; ; attempt++) {
+      const blockedMs = this.breaker.check()
+      if (blockedMs) {
+        throw new UpstreamUnavailableError('OpenAI circuit breaker is open', blockedMs)
+      }
+
+      const waitMs = this.limiter.reserve()
+      if (waitMs) {
+        if (Date.now() + waitMs >= deadline) {
+          this.limiter.release()
+          this.breaker.release()
+          throw new UpstreamUnavailableError('OpenAI rate limit budget exhausted', waitMs)
+        }
+        this.limiter.waits++
+        try {
+          await timed('openai_ratelimit_wait', () => sleep(waitMs, signal))
+        } catch (aborted) {
+          this.breaker.release()
+          throw aborted
+        }
+      }
+
+      let error
+      try {
+        const remaining = deadline - Date.now()
+        const completion = await this.openai.chat.completions.create(request, { signal, timeout: remaining, maxRetries: 0 })
+        this.breaker.success()
+        return completion
+      } catch (caught) {
+        error = caught
+      }
+
+      if (!isRetryable(error)) {
+        // Caller aborts and bad requests say nothing about upstream health
+        this.breaker.release()
+        throw error
+      }
+      if (error.status === 429) {
+        // Throttled, not unhealthy: back off without moving the breaker
+        this.breaker.release()
+      } else {
+        this.breaker.failure()
+      }
+
+      const backoff = Math.random() * Math.min(this.maxDelayMs, this.baseDelayMs * 2 ** attempt)
+      const delay = Math.max(backoff, retryAfterMs(error) ?? 0)
+      if (attempt >= this.maxRetries || Date.now() + delay >= deadline || this.breaker.state === 'open') {
+        this.failures++
+        throw new UpstreamUnavailableError(
+          `OpenAI request failed after ${attempt + 1} attempt(s): ${error.message}`,
+          Math.max(delay, this.baseDelayMs),
+          error
+        )
+      }
+      this.retries++
+      await timed('openai_backoff', () => sleep(delay, signal))
+    }
+  }
+
+  stats() {
+    return {
+      calls: this.calls,
+      retries: this.retries,
+      failures: this.failures,
+      deadlineMs: this.deadlineMs,
+      maxRetries: this.maxRetries,
+      limiter: this.limiter.stats(),
+      breaker: this.breaker.stats()
+    }
+  }
+}
@@ -0,0 +1,78 @@
+// Per-request phase timings, reported in a Server-Timing response header.
+// The timer lives in AsyncLocalStorage, so a helper deep inside a handler can
+// time a phase with timed('name', fn) without the timer being passed down.
+// Phases may overlap (concurrent OpenAI calls) and may repeat; each is listed.
+import { AsyncLocalStorage } from 'async_hooks'
+import { NextResponse } from 'next/server'
+
+const storage = new AsyncLocalStorage()
+
+export class ServerTiming {
+  constructor() {
+    this.started = performance.now()
+    this.entries = []
+  }
+
+  add(name, durationMs) {
+    this.entries.push({ name, durationMs })
+  }
+
+  elapsed() {
+    return performance.now() - this.started
+  }
+
+  header() {
+    return [...this.entries, { name: 'total', durationMs: this.elapsed() }]
+      .map(({ name, durationMs }) => `${name};dur=${durationMs.toFixed(1)}`)
+      .join(', ')
+  }
+
+  // Phases summed per name, for the debug block
+  summary() {
+    const phases = {}
+    for (const { name, durationMs } of this.entries) {
+      phases[name] = Math.round(((phases[name] || 0) + durationMs) * 10) / 10
+    }
+    return { phases, totalMs: Math.round(this.elapsed() * 10) / 10 }
+  }
+}
+
+export function runWithTiming(timing, fn) {
+  return storage.run(timing, fn)
+}
+
+// Time `fn` as phase `name` of the current request (a no-op outside one)
+export async function timed(name, fn) {
+  const timing = storage.getStore()
+  if (!timing) {
+    return fn()
+  }
+  const started = performance.now()
+  try {
+    return await fn()
+  } finally {
+    timing.add(name, performance.now() - started)
+  }
+}
+
+// Set the header; with `debug`, also add a `_timing` block to JSON object bodies.
+// Streamed responses only carry the phases finished before their first byte.
+export async function applyServerTiming(response, timing, debug = false) {
+  const contentType = response.headers.get('content-type') || ''
+  if (debug && contentType.includes('application/json')) {
+    // Arrays have nowhere to put the block; they are passed through unchanged
+    const body = await response.json()
+    const annotated = body && typeof body === 'object' && !Array.isArray(body)
+      ? { ...body, _timing: timing.summary() }
+      : body
+    const rebuilt = NextResponse.json(annotated, { status: response.status })
+    response.headers.forEach((value, key) => {
+      if (key !== 'content-length') {
+        rebuilt.headers.set(key, value)
+      }
+    })
+    response = rebuilt
+  }
+  response.headers.set('Server-Timing', timing.header())
+  return response
+}
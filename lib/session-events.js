@@ -0,0 +1,114 @@
+// In-process pub/sub for session collaboration events (comments, approvals).
+// Routes publish after their write succeeds; every open
+// GET /session/:id/events stream of that session receives the event. The
+// last `replaySize` events per session are kept (for `replayTtlMs` after the
+// latest one) so a client reconnecting with Last-Event-ID gets what it missed;
+// ids carry this process's epoch, so an id from before a restart, or one whose
+// successors were already evicted, yields a `reset` instead.
+// Subscribers only see events published by the same server process.
+import { TtlCache } from '@/lib/ttl-cache'
+
+const EPOCH = Date.now().toString(36)
+
+export class SessionEvents {
+  constructor({ replaySize = 100, maxSessions = 5000, replayTtlMs = 10 * 60 * 1000 } = {}) {
+    this.replaySize = replaySize
+    this.subscribers = new Map()
+    this.recent = new TtlCache({ maxEntries: maxSessions, ttlMs: replayTtlMs })
+    this.sequence = 0
+    this.published = 0
+    this.delivered = 0
+  }
+
+  // Deliver { id, event, data } to every subscriber of `sessionId`; returns how many got it
+  publish(sessionId, event, data) {
+    const message = { id: `${EPOCH}-${++this.sequence}`, seq: this.sequence, event, data }
+    const recent = this.recent.get(sessionId) || { messages: [], evicted: false }
+    recent.messages.push(message)
+    if (recent.messages.length > this.replaySize) {
+      recent.messages.shift()
+      recent.evicted = true
+    }
+    this.recent.set(sessionId, recent)
+    this.published++
+
+    const listeners = this.subscribers.get(sessionId)
+    if (!listeners) {
+      return 0
+    }
+    for (const listener of listeners) {
+      try {
+        listener(message)
+      } catch (error) {
+        console.error('Session event listener failed:', error)
+      }
+    }
+    this.delivered += listeners.size
+    return listeners.size
+  }
+
+  // Call `listener(message)` for each new event; returns the unsubscribe function.
+  // With `lastEventId` the missed events are replayed first, or `onReset()` is
+  // called when they can no longer be replayed.
+  subscribe(sessionId, listener, { lastEventId, onReset } = {}) {
+    if (lastEventId) {
+      const missed = this.missedSince(sessionId, lastEventId)
+      if (missed === null) {
+        onReset?.()
+      } else {
+        missed.forEach(listener)
+      }
+    }
+
+    let listeners = this.subscribers.get(sessionId)
+    if (!listeners) {
+      listeners = new Set()
+      this.subscribers.set(sessionId, listeners)
+    }
+    listeners.add(listener)
+
+    return () => {
+      listeners.delete(listener)
+      if (!listeners.size && this.subscribers.get(sessionId) === listeners) {
+        this.subscribers.delete(sessionId)
+      }
+    }
+  }
+
+  // Events after `lastEventId`, or null when the gap cannot be filled
+  missedSince(sessionId, lastEventId) {
+    const [epoch, seq] = String(lastEventId).split('-')
+    const after = parseInt(seq, 10)
+    if (epoch !== EPOCH || Number.isNaN(after)) {
+      return null
+    }
+    const recent = this.recent.get(sessionId)
+    if (!recent) {
+      return []
+    }
+    // Sequence numbers are shared by all sessions, so a gap is only provable
+    // when this session's buffer has dropped events newer than `after`
+    if (recent.evicted && after < recent.messages[0].seq) {
+      return null
+    }
+    return recent.messages.filter(message => message.seq > after)
+  }
+
+  subscriberCount(sessionId) {
+    return this.subscribers.get(sessionId)?.size || 0
+  }
+
+  stats() {
+    let subscribers = 0
+    for (const listeners of this.subscribers.values()) {
+      subscribers += listeners.size
+    }
+    return {
+      sessions: this.subscribers.size,
+      subscribers,
+      published: this.published,
+      delivered: this.delivered,
+      replay: this.recent.stats()
+    }
+  }
+}
@@ -0,0 +1,47 @@
+// Server-sent events over a web ReadableStream.
+// `producer(send, signal)` runs once the client connects; every send(event, data, id)
+// is flushed as its own frame (`id` becomes the client's Last-Event-ID). Errors are reported as an `error` event, and the
+// producer sees `signal.aborted` once the client disconnects.
+export const SSE_HEADERS = {
+  'Content-Type': 'text/event-stream; charset=utf-8',
+  'Cache-Control': 'no-cache, no-transform',
+  'Connection': 'keep-alive',
+  'X-Accel-Buffering': 'no'
+}
+
+const HEARTBEAT_MS = 15000
+
+export function createSseStream(producer) {
+  const encoder = new TextEncoder()
+  const abort = new AbortController()
+  let heartbeat
+
+  return new ReadableStream({
+    async start(controller) {
+      const write = (text) => {
+        if (!abort.signal.aborted) {
+          controller.enqueue(encoder.encode(text))
+        }
+      }
+      const send = (event, data, id) => write(`${id ? `id: ${id}\n` : ''}event: ${event}\ndata: ${JSON.stringify(data)}\n\n`)
+
+      // Comment frames keep idle proxies from closing slow generations
+      heartbeat = setInterval(() => write(': ping\n\n'), HEARTBEAT_MS)
+      try {
+        await producer(send, abort.signal)
+      } catch (error) {
+        console.error('SSE producer error:', error)
+        send('error', { error: error.message || 'Stream failed' })
+      } finally {
+        clearInterval(heartbeat)
+        if (!abort.signal.aborted) {
+          controller.close()
+        }
+      }
+    },
+    cancel() {
+      clearInterval(heartbeat)
+      abort.abort()
+    }
+  })
+}
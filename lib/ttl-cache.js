@@ -0,0 +1,63 @@
+// In-process cache with per-entry TTL and LRU eviction.
+// A Map keeps insertion order, so re-inserting on access makes the first key
+// the least recently used one.
+export class TtlCache {
+  constructor({ maxEntries = 500, ttlMs = 60 * 60 * 1000 } = {}) {
+    this.maxEntries = maxEntries
+    this.ttlMs = ttlMs
+    this.entries = new Map()
+    this.hits = 0
+    this.misses = 0
+    this.evictions = 0
+    this.expirations = 0
+  }
+
+  get(key) {
+    const entry = this.entries.get(key)
+    if (!entry) {
+      this.misses++
+      return undefined
+    }
+    if (entry.expiresAt <= Date.now()) {
+      this.entries.delete(key)
+      this.expirations++
+      this.misses++
+      return undefined
+    }
+    this.entries.delete(key)
+    this.entries.set(key, entry)
+    this.hits++
+    return entry.value
+  }
+
+  set(key, value, ttlMs = this.ttlMs) {
+    this.entries.delete(key)
+    this.entries.set(key, { value, expiresAt: Date.now() + ttlMs })
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value)
+      this.evictions++
+    }
+  }
+
+  delete(key) {
+    return this.entries.delete(key)
+  }
+
+  clear() {
+    this.entries.clear()
+  }
+
+  stats() {
+    const lookups = this.hits + this.misses
+    return {
+      size: this.entries.size,
+      maxEntries: this.maxEntries,
+      ttlMs: this.ttlMs,
+      hits: this.hits,
+      misses: this.misses,
+      hitRate: lookups ? this.hits / lookups : 0,
+      evictions: this.evictions,
+      expirations: this.expirations
+    }
+  }
+}
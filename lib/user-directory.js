@@ -0,0 +1,82 @@
+// Display names and roles for the users a response mentions.
+// Known users (the mock accounts) sit in an id-keyed Map; everyone else is
+// fetched by `loadMany(ids)` in one bulk lookup per response and kept in a
+// bounded LRU. Ids the store does not know are cached as misses too, so a
+// response full of deleted authors does not query again every time.
+import { TtlCache } from '@/lib/ttl-cache'
+
+export class UserDirectory {
+  constructor(loadMany, { users = [], cache = new TtlCache() } = {}) {
+    this.loadMany = loadMany
+    this.index = new Map(users.map(user => [user.id, user]))
+    this.cache = cache
+    this.lookups = 0
+    this.loaded = 0
+    this.failures = 0
+  }
+
+  // Map of id -> user for `ids`; unknown ids are left out
+  async resolve(ids) {
+    const found = new Map()
+    const missing = []
+    for (const id of new Set(ids)) {
+      if (!id) {
+        continue
+      }
+      const known = this.index.get(id)
+      if (known) {
+        found.set(id, known)
+        continue
+      }
+      const cached = this.cache.get(id)
+      if (cached === undefined) {
+        missing.push(id)
+      } else if (cached) {
+        found.set(id, cached)
+      }
+    }
+
+    if (missing.length) {
+      this.lookups++
+      let loaded
+      try {
+        loaded = await this.loadMany(missing)
+      } catch (error) {
+        // Names are decoration: answer with what is known, cache nothing
+        console.error('User directory lookup failed:', error)
+        this.failures++
+        return found
+      }
+      this.loaded += loaded.length
+      for (const user of loaded) {
+        found.set(user.id, user)
+        this.cache.set(user.id, user)
+      }
+      for (const id of missing) {
+        if (!found.has(id)) {
+          this.cache.set(id, null)
+        }
+      }
+    }
+    return found
+  }
+
+  async get(id) {
+    return (await this.resolve([id])).get(id)
+  }
+
+  // Drop a cached entry after the user's profile changes
+  invalidate(id) {
+    this.cache.delete(id)
+  }
+
+  stats() {
+    return {
+      indexed: this.index.size,
+      lookups: this.lookups,
+      loaded: this.loaded,
+      failures: this.failures,
+      cache: this.cache.stats()
+    }
+  }
+}
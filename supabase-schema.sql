@@ -236,6 +236,55 @@ BEFORE UPDATE ON autism_profiles
 FOR EACH ROW 
 EXECUTE FUNCTION update_updated_at_column();
 
+-- Keyset pagination for GET /api/autism-profiles: newest first by (created_at, id)
+CREATE INDEX idx_autism_profiles_user_created ON autism_profiles(user_id, created_at DESC, id DESC);
+CREATE INDEX idx_autism_profiles_student_created ON autism_profiles(student_id, created_at DESC, id DESC);
+CREATE INDEX idx_student_advocate_assignments_active ON student_advocate_assignments(advocate_id, student_id) WHERE is_active = true;
+
+-- One page of the profiles an advocate can see, filtered by their active
+-- assignments in the database. Pass the last row's created_at and id to get
+-- the next page.
+CREATE OR REPLACE FUNCTION advocate_autism_profiles(
+  p_advocate_id UUID,
+  p_before TIMESTAMPTZ DEFAULT NULL,
+  p_before_id UUID DEFAULT NULL,
+  p_limit INTEGER DEFAULT 50
+)
+RETURNS TABLE (
+  id UUID,
+  student_id UUID,
+  generated_profile TEXT,
+  profile_type TEXT,
+  is_shared BOOLEAN,
+  created_at TIMESTAMPTZ,
+  students JSONB
+)
+LANGUAGE sql STABLE AS $$
+  SELECT
+    ap.id,
+    ap.student_id,
+    ap.generated_profile,
+    ap.profile_type,
+    ap.is_shared,
+    ap.created_at,
+    jsonb_build_object('id', s.id, 'name', s.name, 'grade_level', s.grade_level, 'parent_id', s.parent_id)
+  FROM autism_profiles ap
+  JOIN students s ON s.id = ap.student_id
+  WHERE EXISTS (
+    SELECT 1 FROM student_advocate_assignments sa
+    WHERE sa.student_id = ap.student_id
+    AND sa.advocate_id = p_advocate_id
+    AND sa.is_active = true
+  )
+  AND (
+    p_before IS NULL
+    OR ap.created_at < p_before
+    OR (ap.created_at = p_before AND ap.id < p_before_id)
+  )
+  ORDER BY ap.created_at DESC, ap.id DESC
+  LIMIT p_limit
+$$;
+
 -- ===============================================
 -- ROW LEVEL SECURITY (RLS) POLICIES
 -- ===============================================
@@ -457,6 +506,9 @@ CREATE INDEX idx_email_notifications_status ON email_notifications(status);
 CREATE INDEX idx_accommodation_sessions_created_by ON accommodation_sessions(created_by);
 CREATE INDEX idx_accommodation_sessions_for_parent ON accommodation_sessions(for_parent);
 CREATE INDEX idx_accommodation_sessions_created_at ON accommodation_sessions(created_at);
+-- Keyset pagination for GET /api/accommodations: a user's sessions newest first by (created_at, id)
+CREATE INDEX idx_accommodation_sessions_created_by_created ON accommodation_sessions(created_by, created_at DESC, id DESC);
+CREATE INDEX idx_accommodation_sessions_for_parent_created ON accommodation_sessions(for_parent, created_at DESC, id DESC);
 CREATE INDEX idx_session_comments_session_id ON session_comments(session_id);
 CREATE INDEX idx_advocate_assignments_advocate_parent ON advocate_assignments(advocate_id, parent_id);
 
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Per-endpoint latency benchmark with stored baselines
+Times every endpoint backend_test.py and autism_profile_test.py exercise,
+against a server wired to the local stand-ins, using the suites' own
+payloads. Each case is repeated --repeat times per round over --rounds
+interleaved rounds (so drift during the run hits every case alike), and
+summarized as p50/p95/mean/stdev.
+
+--update stores the summary as a JSON baseline under tests/bench/baselines/.
+Without it the run is compared to that baseline and fails when any
+endpoint's p95 regresses by more than --max-regression percent (and by more
+than --min-delta-ms, so sub-millisecond noise cannot fail a run).
+
+Usage (stand-ins and the Next.js server already running):
+    python -m tests.bench.endpoints --update          # record a baseline
+    python -m tests.bench.endpoints                   # compare against it
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from autism_profile_test import BASIC_PROFILE_PAYLOAD, HERO_PROFILE_PAYLOAD
+from backend_test import FREE_PLAN_PAYLOAD, HERO_PLAN_PAYLOAD
+from tests import standins
+from tests.engine import get_engine
+from tests.load import percentile
+
+API_BASE = f"{os.getenv('NEXT_PUBLIC_BASE_URL', 'http://localhost:3000')}/api"
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+
+class BenchCase:
+    """One request to time; non-2xx responses count as errors, not samples"""
+
+    def __init__(self, name, method, path, body=None, user=None, params=None, timeout=120):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.user = user
+        self.params = params
+        self.timeout = timeout
+
+    @property
+    def headers(self):
+        return standins.token_headers(self.user) if self.user else {"Content-Type": "application/json"}
+
+
+def default_cases():
+    """Every endpoint the two suites hit, with their payloads"""
+    batch = {"students": [{"studentId": s} for s in ("child_emma", "child_alex", "child_david")], "bypassCache": True}
+    return [
+        BenchCase("GET /root", "GET", "/root"),
+        BenchCase("POST /accommodations/generate (free)", "POST", "/accommodations/generate",
+                  body={**FREE_PLAN_PAYLOAD, "bypassCache": True}, user="parent_sarah"),
+        BenchCase("POST /accommodations/generate (hero)", "POST", "/accommodations/generate",
+                  body={**HERO_PLAN_PAYLOAD, "bypassCache": True}, user="parent_mike"),
+        BenchCase("POST /accommodations/generate (cached)", "POST", "/accommodations/generate",
+                  body=FREE_PLAN_PAYLOAD, user="parent_sarah"),
+        BenchCase("POST /accommodations/generate/batch", "POST", "/accommodations/generate/batch",
+                  body=batch, user="advocate_maria", timeout=300),
+        BenchCase("GET /accommodations (page)", "GET", "/accommodations", user="parent_sarah", params={"limit": 50}),
+        BenchCase("GET /accommodations (ndjson)", "GET", "/accommodations", user="parent_sarah",
+                  params={"format": "ndjson"}),
+        BenchCase("GET /cache/stats", "GET", "/cache/stats"),
+        BenchCase("GET /auth/profile", "GET", "/auth/profile", user="parent_sarah"),
+        BenchCase("POST /auth/check-plan", "POST", "/auth/check-plan",
+                  body={"userId": "parent_mike", "requiredPlan": "hero", "feature": "benchmark"}),
+        BenchCase("GET /students", "GET", "/students", user="parent_sarah"),
+        BenchCase("GET /autism-profiles", "GET", "/autism-profiles", user="parent_sarah"),
+        BenchCase("POST /autism-profiles/generate (free)", "POST", "/autism-profiles/generate",
+                  body=BASIC_PROFILE_PAYLOAD, user="parent_sarah"),
+        BenchCase("POST /autism-profiles/generate (hero)", "POST", "/autism-profiles/generate",
+                  body=HERO_PROFILE_PAYLOAD, user="parent_mike"),
+        BenchCase("POST /autism-profiles/generate/stream (hero)", "POST", "/autism-profiles/generate/stream",
+                  body=HERO_PROFILE_PAYLOAD, user="parent_mike")
+    ]
+
+
+# ----- measurement -----
+
+def time_case(engine, case):
+    """Seconds for one full response (body read), or None on error"""
+    started = time.perf_counter()
+    try:
+        response = engine.request(case.method, f"{API_BASE}{case.path}", json=case.body,
+                                  params=case.params, headers=case.headers, timeout=case.timeout)
+    except Exception:
+        return None
+    elapsed = time.perf_counter() - started
+    return elapsed if response.status_code < 400 else None
+
+
+def summarize(samples, errors):
+    if not samples:
+        return {"n": 0, "errors": errors, "p50": None, "p95": None, "mean": None, "stdev": None, "cv": None}
+    mean = statistics.fmean(samples)
+    stdev = statistics.stdev(samples) if len(samples) > 1 else 0.0
+    return {
+        "n": len(samples),
+        "errors": errors,
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "mean": mean,
+        "stdev": stdev,
+        "cv": stdev / mean if mean else 0.0
+    }
+
+
+def run_cases(cases, repeat=10, rounds=3, warmup=1, engine=None):
+    """{case name: summary}; rounds interleave the cases to spread drift evenly"""
+    engine = engine or get_engine()
+    for case in cases:
+        for _ in range(warmup):
+            time_case(engine, case)
+
+    samples = {case.name: [] for case in cases}
+    errors = {case.name: 0 for case in cases}
+    for round_number in range(rounds):
+        print(f"⏱️  Round {round_number + 1}/{rounds}", flush=True)
+        for case in cases:
+            for _ in range(repeat):
+                elapsed = time_case(engine, case)
+                if elapsed is None:
+                    errors[case.name] += 1
+                else:
+                    samples[case.name].append(elapsed)
+    return {case.name: summarize(samples[case.name], errors[case.name]) for case in cases}
+
+
+# ----- baselines -----
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_baseline(results, name, repeat, rounds):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    document = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "rounds": rounds,
+        "endpoints": results
+    }
+    with open(baseline_path(name), "w") as handle:
+        json.dump(document, handle, indent=2)
+        handle.write("\n")
+    return baseline_path(name)
+
+
+def load_baseline(name):
+    try:
+        with open(baseline_path(name)) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+
+
+def compare(results, baseline, max_regression=10.0, min_delta=0.002):
+    """Per-endpoint diff rows; `regressed` when p95 grew by more than both limits"""
+    rows = []
+    for name, current in results.items():
+        previous = baseline["endpoints"].get(name)
+        row = {"endpoint": name, "current": current, "baseline": previous, "change": None, "regressed": False}
+        if previous and previous["p95"] and current["p95"] is not None:
+            delta = current["p95"] - previous["p95"]
+            row["change"] = delta / previous["p95"] * 100
+            row["regressed"] = row["change"] > max_regression and delta > min_delta
+        rows.append(row)
+    return rows
+
+
+# ----- reporting -----
+
+def _ms(value):
+    return "-" if value is None else f"{value * 1000:.1f}"
+
+
+def print_results(results):
+    print("\n" + "=" * 100)
+    print("📏 ENDPOINT BENCHMARK")
+    print("=" * 100)
+    header = f"{'Endpoint':<48}{'n':>5}{'Err':>5}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'CV':>7}"
+    print(header)
+    print("-" * len(header))
+    for name, stats in results.items():
+        cv = "-" if stats["cv"] is None else f"{stats['cv']:.0%}"
+        print(f"{name:<48}{stats['n']:>5}{stats['errors']:>5}{_ms(stats['p50']):>10}{_ms(stats['p95']):>10}"
+              f"{_ms(stats['mean']):>10}{cv:>7}")
+
+
+def print_diff(rows, baseline, max_regression):
+    print("\n" + "=" * 100)
+    print(f"🔀 p95 VS BASELINE ({baseline.get('commit') or 'unknown commit'}, {baseline.get('created', '?')[:19]})")
+    print("=" * 100)
+    header = f"{'Endpoint':<48}{'base p95':>11}{'p95':>10}{'change':>10}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        base = row["baseline"]["p95"] if row["baseline"] else None
+        change = "new" if row["baseline"] is None else ("-" if row["change"] is None else f"{row['change']:+.1f}%")
+        flag = "  ❌" if row["regressed"] else ""
+        print(f"{row['endpoint']:<48}{_ms(base):>11}{_ms(row['current']['p95']):>10}{change:>10}{flag}")
+
+    regressed = [row["endpoint"] for row in rows if row["regressed"]]
+    print()
+    if regressed:
+        print(f"❌ p95 regressed by more than {max_regression:.0f}%: {', '.join(regressed)}")
+    else:
+        print(f"✅ No endpoint's p95 regressed by more than {max_regression:.0f}%")
+
+
+def run_benchmark(name="local", update=False, repeat=10, rounds=3, warmup=1, max_regression=10.0,
+                  min_delta=0.002, only=None, cases=None):
+    """Measure, then store or compare against the baseline; returns True unless it regressed"""
+    cases = cases or default_cases()
+    if only:
+        cases = [case for case in cases if fnmatch.fnmatch(case.name, only)]
+    unavailable = [source for source in standins.SOURCES if not standins.available(source)]
+    if unavailable:
+        print(f"⚠️  Stand-ins not reachable: {', '.join(unavailable)} - timings include the real services")
+
+    results = run_cases(cases, repeat, rounds, warmup)
+    print_results(results)
+
+    failed = [name for name, stats in results.items() if stats["n"] == 0]
+    if failed:
+        print(f"\n❌ Every request failed for: {', '.join(failed)}")
+
+    if update:
+        print(f"\n📝 Baseline written to {os.path.relpath(save_baseline(results, name, repeat, rounds))}")
+        return not failed
+
+    baseline = load_baseline(name)
+    if baseline is None:
+        print(f"\n⚠️  No baseline '{name}' yet - run with --update to record one")
+        return not failed
+
+    rows = compare(results, baseline, max_regression, min_delta)
+    print_diff(rows, baseline, max_regression)
+    return not failed and not any(row["regressed"] for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-endpoint latency benchmark with baseline gating")
+    parser.add_argument("--baseline", default="local", help="baseline name under tests/bench/baselines/")
+    parser.add_argument("--update", action="store_true", help="store this run as the baseline instead of comparing")
+    parser.add_argument("--repeat", type=int, default=10, help="requests per case per round")
+    parser.add_argument("--rounds", type=int, default=3, help="interleaved rounds over every case")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed requests per case first")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="allowed p95 growth in percent")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="p95 growth below this never fails")
+    parser.add_argument("--only", default=None, help="glob over case names, e.g. 'GET *'")
+    args = parser.parse_args()
+
+    passed = run_benchmark(
+        name=args.baseline, update=args.update, repeat=args.repeat, rounds=args.rounds, warmup=args.warmup,
+        max_regression=args.max_regression, min_delta=args.min_delta_ms / 1000, only=args.only
+    )
+    exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Event ingestion benchmark
+Drives the logging and analytics endpoints (/logging/plan-enforcement,
+/logging/advocate-match, /logging/signup, /analytics/hero-usage) at a fixed
+open-loop arrival rate and reports request latency (p50/p95/p99) next to
+ingest throughput: how fast the server's event buffer gets the accepted
+events into Mongo. The buffer is watched through /cache/stats until it has
+drained, and the Mongo proxy's insert counts show how many events each
+round-trip carried.
+
+Usage (stand-ins and the Next.js server already running):
+    python -m tests.bench.events --rate 2000 --requests 20000
+"""
+
+import argparse
+import os
+import time
+
+import httpx
+
+from tests import standins
+from tests.load import LoadTarget, print_load_report, run_load
+
+API_BASE = f"{os.getenv('NEXT_PUBLIC_BASE_URL', 'http://localhost:3000')}/api"
+
+# Events each endpoint writes per request at least (the advocate match notification
+# adds one more when both profiles exist)
+EVENTS_PER_REQUEST = {
+    "plan-enforcement": 1,
+    "hero-usage": 1,
+    "advocate-match": 2,
+    "signup": 1
+}
+
+
+def default_targets():
+    """One request shape per ingest endpoint, for seeded users"""
+    return [
+        LoadTarget("plan-enforcement", "POST", "/logging/plan-enforcement",
+                   json_body={"userId": "parent_sarah", "feature": "advanced_review", "action": "blocked"}),
+        LoadTarget("hero-usage", "POST", "/analytics/hero-usage",
+                   json_body={"userId": "parent_mike", "feature": "document_vault"}),
+        LoadTarget("advocate-match", "POST", "/logging/advocate-match",
+                   json_body={"parentId": "parent_sarah", "advocateId": "advocate_maria", "matchReason": "benchmark"}),
+        LoadTarget("signup", "POST", "/logging/signup",
+                   json_body={"userId": "parent_sarah", "userEmail": "sarah@example.com", "role": "parent",
+                              "planType": "free"})
+    ]
+
+
+def event_stats():
+    """The server's event buffer counters from /cache/stats, or None"""
+    try:
+        response = httpx.get(f"{API_BASE}/cache/stats", timeout=10)
+        return response.json().get("events") if response.status_code == 200 else None
+    except httpx.HTTPError:
+        return None
+
+
+def wait_for_drain(timeout=60, poll=0.05):
+    """Poll until the buffer has nothing pending; returns (stats, seconds waited)"""
+    started = time.perf_counter()
+    stats = event_stats()
+    while stats and (stats["pending"] or stats.get("backgroundTasks")) and time.perf_counter() - started < timeout:
+        time.sleep(poll)
+        stats = event_stats()
+    return stats, time.perf_counter() - started
+
+
+def _mongo_inserts(snapshot):
+    mongo = snapshot.get("mongo")
+    return None if mongo is None else mongo["detail"].get("insert user_events", 0)
+
+
+def run_benchmark(rate=2000, total_requests=20000, concurrency=200, targets=None):
+    """Run the load, wait for the buffer to drain and report; returns True if nothing was lost"""
+    targets = targets or default_targets()
+    before = event_stats()
+    if before is None:
+        print("❌ /cache/stats has no event buffer counters - is the server running?")
+        return False
+    mongo_before = standins.snapshot()
+    if mongo_before.get("mongo") is None:
+        print("⚠️  Mongo proxy not reachable - batch sizes will not be reported")
+
+    print(f"🚀 {total_requests} requests at {rate}/s, up to {concurrency} in flight")
+    started = time.perf_counter()
+    summary = run_load(API_BASE, targets, concurrency=concurrency, rate=rate, total_requests=total_requests)
+    after, drain = wait_for_drain()
+    ingest_elapsed = time.perf_counter() - started
+    mongo_after = standins.snapshot()
+    print_load_report(summary)
+
+    expected = sum(
+        EVENTS_PER_REQUEST[target.name] * (summary["endpoints"][target.endpoint]["requests"]
+                                           - summary["endpoints"][target.endpoint]["errors"])
+        for target in targets if target.endpoint in summary["endpoints"]
+    )
+    written = after["written"] - before["written"]
+    batches = after["batches"] - before["batches"]
+    dropped = after["dropped"] - before["dropped"]
+    failed = after["failed"] - before["failed"]
+
+    print("\n" + "=" * 70)
+    print("📥 EVENT INGESTION")
+    print("=" * 70)
+    print(f"Events written: {written} of {expected} expected in {ingest_elapsed:.2f}s "
+          f"({written / ingest_elapsed if ingest_elapsed > 0 else 0:.0f} events/s, drained {drain:.2f}s after the load)")
+    print(f"Batches: {batches} ({written / batches if batches else 0:.1f} events per insertMany)")
+    print(f"Dropped: {dropped}, failed writes: {failed}, pushes that waited on backpressure: "
+          f"{after['waited'] - before['waited']}")
+    inserts_before, inserts_after = _mongo_inserts(mongo_before), _mongo_inserts(mongo_after)
+    if inserts_before is not None and inserts_after is not None:
+        print(f"Mongo round-trips for user_events: {inserts_after - inserts_before}")
+
+    if after["pending"]:
+        print(f"❌ {after['pending']} events still pending after the drain timeout")
+    lost = written < expected or dropped or failed
+    if lost:
+        print("❌ Not every accepted event reached storage")
+    else:
+        print("✅ Every accepted event reached storage")
+    return not lost and not after["pending"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Logging/analytics event ingestion benchmark")
+    parser.add_argument("--rate", type=float, default=2000, help="request arrival rate per second")
+    parser.add_argument("--requests", type=int, default=20000, help="total requests to send")
+    parser.add_argument("--concurrency", type=int, default=200, help="maximum requests in flight")
+    args = parser.parse_args()
+
+    passed = run_benchmark(rate=args.rate, total_requests=args.requests, concurrency=args.concurrency)
+    exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
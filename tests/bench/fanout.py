@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Session event fan-out load test
+Opens --clients concurrent subscriptions to GET /session/:id/events spread
+over --sessions sessions, then posts --events comments round-robin over those
+sessions and times each push from the moment its POST was sent until every
+subscriber of the session has it. Reports connect time, delivery latency
+(p50/p95/p99/max), missed deliveries, and the server's RSS growth per open
+connection (read from /proc when the server runs on this machine).
+
+Every subscription is a real socket on both ends, so the open-file limit is
+raised to its hard limit first; a few thousand clients need `ulimit -n`
+headroom for the server process too.
+
+Usage (stand-ins and the Next.js server already running, with some sessions):
+    python -m tests.bench.fanout --clients 2000 --sessions 50 --events 40
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from urllib.parse import urlsplit
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from tests.engine import HttpEngine
+from tests.load import percentile
+from tests.soak import find_listening_pid, process_stats
+from tests.sse import aiter_events
+
+API_BASE = f"{os.getenv('NEXT_PUBLIC_BASE_URL', 'http://localhost:3000')}/api"
+
+SESSION_OWNER = "parent_sarah"
+COMMENT_AUTHOR = "advocate_maria"
+
+
+def raise_file_limit():
+    """Soft RLIMIT_NOFILE up to the hard limit; returns the limit in effect"""
+    if resource is None:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+            soft = hard
+        except (ValueError, OSError):
+            pass
+    return soft
+
+
+class FanoutRun:
+    """Subscribers, the comments posted to them and when each push arrived"""
+
+    def __init__(self, engine, session_ids, clients):
+        self.engine = engine
+        self.session_ids = session_ids
+        self.clients = clients
+        self.subscribers = {session_id: 0 for session_id in session_ids}
+        self.connect_times = []
+        self.failures = []
+        self.ready = 0
+        self.all_ready = asyncio.Event()
+        self.sent = {}
+        self.arrivals = {}
+        self.expected = 0
+        self.published = False
+        self.delivered = asyncio.Event()
+
+    async def subscribe(self, index):
+        session_id = self.session_ids[index % len(self.session_ids)]
+        started = time.perf_counter()
+        try:
+            async for event, data in aiter_events(self.engine, f"{API_BASE}/session/{session_id}/events",
+                                                  timeout=None):
+                if event == "ready":
+                    self.connect_times.append(time.perf_counter() - started)
+                    self.subscribers[session_id] += 1
+                    self.ready += 1
+                    if self.ready == self.clients:
+                        self.all_ready.set()
+                elif event == "comment":
+                    self.receive(data.get("text"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failures.append(str(e) or type(e).__name__)
+            if self.ready + len(self.failures) == self.clients:
+                self.all_ready.set()
+
+    def receive(self, marker):
+        if marker not in self.sent:
+            return
+        self.arrivals[marker].append(time.perf_counter() - self.sent[marker])
+        self.check_delivered()
+
+    def check_delivered(self):
+        # `expected` grows with every comment posted, so only judge once they all are
+        if self.published and sum(len(times) for times in self.arrivals.values()) >= self.expected:
+            self.delivered.set()
+
+    async def publish(self, count, interval):
+        for n in range(count):
+            session_id = self.session_ids[n % len(self.session_ids)]
+            marker = f"fanout {os.getpid()}-{n}"
+            self.arrivals[marker] = []
+            self.expected += self.subscribers[session_id]
+            self.sent[marker] = time.perf_counter()
+            response = await self.engine.arequest("POST", f"{API_BASE}/session/{session_id}/comments", timeout=30,
+                                                  json={"text": marker, "userId": COMMENT_AUTHOR})
+            response.raise_for_status()
+            if interval:
+                await asyncio.sleep(interval)
+        self.published = True
+        self.check_delivered()
+
+
+async def _run(engine, session_ids, clients, events, interval, connect_timeout, settle_timeout, pid):
+    run = FanoutRun(engine, session_ids, clients)
+    before = process_stats(pid)
+    tasks = [asyncio.create_task(run.subscribe(index)) for index in range(clients)]
+    try:
+        try:
+            await asyncio.wait_for(run.all_ready.wait(), connect_timeout)
+        except asyncio.TimeoutError:
+            pass
+        # Let the server settle after the connection burst before sampling memory
+        await asyncio.sleep(1)
+        connected = process_stats(pid)
+        stats = await engine.arequest("GET", f"{API_BASE}/cache/stats", timeout=30)
+        server_subscribers = stats.json().get("sessionEvents", {}).get("subscribers")
+
+        published_at = time.perf_counter()
+        await run.publish(events, interval)
+        try:
+            await asyncio.wait_for(run.delivered.wait(), settle_timeout)
+        except asyncio.TimeoutError:
+            pass
+        elapsed = time.perf_counter() - published_at
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return run, before, connected, server_subscribers, elapsed
+
+
+def run_fanout(clients=2000, sessions=50, events=40, interval=0.05, connect_timeout=120, settle_timeout=30):
+    """Run the fan-out test; returns True when every push reached every subscriber"""
+    limit = raise_file_limit()
+    if limit is not None and limit < clients + 64:
+        print(f"⚠️  Open-file limit is {limit}; {clients} clients will likely fail to connect")
+
+    engine = HttpEngine(max_connections=clients + 16, max_per_host=clients + 16)
+    try:
+        listing = engine.get(f"{API_BASE}/sessions/{SESSION_OWNER}", timeout=30)
+        listing.raise_for_status()
+        session_ids = [session["id"] for session in listing.json()[:sessions]]
+        if not session_ids:
+            print(f"❌ {SESSION_OWNER} has no sessions to subscribe to - seed some with tests/fixtures.py first")
+            return False
+
+        pid = find_listening_pid(urlsplit(API_BASE).port or 80)
+        print(f"🔌 {clients} subscribers over {len(session_ids)} sessions, {events} comments")
+        run, before, connected, server_subscribers, elapsed = engine.run(_run(
+            engine, session_ids, clients, events, interval, connect_timeout, settle_timeout, pid
+        ))
+    finally:
+        engine.close()
+
+    latencies = [latency for times in run.arrivals.values() for latency in times]
+    print("\n" + "=" * 70)
+    print("📡 SESSION EVENT FAN-OUT")
+    print("=" * 70)
+    print(f"Connected: {run.ready} of {clients} (server reports {server_subscribers}), "
+          f"{len(run.failures)} failed; connect p50 {percentile(run.connect_times, 50) * 1000:.0f}ms, "
+          f"p95 {percentile(run.connect_times, 95) * 1000:.0f}ms")
+    if run.failures:
+        print(f"    first failure: {run.failures[0]}")
+    print(f"Deliveries: {len(latencies)} of {run.expected} expected in {elapsed:.1f}s "
+          f"({len(latencies) / elapsed if elapsed > 0 else 0:.0f}/s)")
+    print(f"Delivery latency: p50 {percentile(latencies, 50) * 1000:.1f}ms, p95 {percentile(latencies, 95) * 1000:.1f}ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.1f}ms, max {max(latencies, default=0) * 1000:.1f}ms")
+    if before["rss"] is not None and connected["rss"] is not None and run.ready:
+        growth = connected["rss"] - before["rss"]
+        print(f"Server RSS: {before['rss'] / 2**20:.1f}MB -> {connected['rss'] / 2**20:.1f}MB "
+              f"({growth / run.ready / 1024:.1f}KB per connection), sockets {before['sockets']} -> {connected['sockets']}")
+    else:
+        print("Server RSS: not measured (server process not found on this machine)")
+
+    passed = run.ready == clients and len(latencies) == run.expected
+    print("✅ Every push reached every subscriber" if passed else "❌ Subscribers missing or pushes lost")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session event fan-out load test")
+    parser.add_argument("--clients", type=int, default=2000, help="concurrent SSE subscriptions")
+    parser.add_argument("--sessions", type=int, default=50, help="sessions the subscribers are spread over")
+    parser.add_argument("--events", type=int, default=40, help="comments to post")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between posted comments")
+    parser.add_argument("--connect-timeout", type=float, default=120)
+    parser.add_argument("--settle-timeout", type=float, default=30, help="wait for outstanding deliveries")
+    args = parser.parse_args()
+
+    passed = run_fanout(args.clients, args.sessions, args.events, args.interval, args.connect_timeout,
+                        args.settle_timeout)
+    exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
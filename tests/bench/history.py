@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Accommodation history benchmark
+Grows parent_sarah's accommodation history in the fake Supabase to each size
+in --sizes (benchmark rows are tagged and removed afterwards) and measures,
+per size:
+  - latency of the first keyset page and of a page deep into the history
+  - latency and client peak memory to find the newest record via the page
+    generator and via the NDJSON stream, stopping as soon as it is found
+  - client peak memory while streaming every record (optional, --full-scan)
+With keyset pagination and streaming all of these should stay flat as the
+history grows.
+
+Usage (fake Supabase and the Next.js server already running):
+    python -m tests.bench.history --sizes 1000,10000,100000
+"""
+
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from tests.engine import get_engine
+from tests.history import find_record, iter_history, stream_history
+from tests.standins import FAKE_SUPABASE_URL, token_headers
+
+API_BASE = f"{os.getenv('NEXT_PUBLIC_BASE_URL', 'http://localhost:3000')}/api"
+
+BENCH_USER = "parent_sarah"
+BENCH_TAG = "history-benchmark"
+BENCH_NAMESPACE = uuid.UUID("2b7d4f0e-9c3a-4e61-8f25-6a1d0c9e7b44")
+INSERT_BATCH = 5000
+
+
+def bench_row(index, created_at):
+    return {
+        "id": str(uuid.uuid5(BENCH_NAMESPACE, str(index))),
+        "student_id": "child_emma",
+        "child_name": f"BenchChild_{index}",
+        "grade_level": "3rd",
+        "diagnosis_areas": ["Autism Spectrum Disorder (ASD)"],
+        "sensory_preferences": ["Visual supports"],
+        "behavioral_challenges": ["Difficulty with transitions"],
+        "communication_method": "verbal",
+        "additional_info": BENCH_TAG,
+        "plan_type": "free",
+        "accommodations": [
+            {"title": f"Accommodation {n}", "description": "Benchmark filler " * 8, "category": "sensory"}
+            for n in range(5)
+        ],
+        "created_by": BENCH_USER,
+        "for_parent": BENCH_USER,
+        "created_at": created_at.isoformat(timespec="microseconds").replace("+00:00", "Z")
+    }
+
+
+def grow_history(client, seeded, target):
+    """Insert benchmark rows `seeded`..`target` (older than real data); returns the new count"""
+    oldest = datetime.now(timezone.utc) - timedelta(days=365)
+    while seeded < target:
+        batch = min(INSERT_BATCH, target - seeded)
+        response = client.post("/rest/v1/accommodation_sessions", json=[
+            bench_row(seeded + n, oldest - timedelta(seconds=seeded + n)) for n in range(batch)
+        ], headers={"Prefer": "resolution=merge-duplicates"})
+        response.raise_for_status()
+        seeded += batch
+    return seeded
+
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def traced(fn):
+    """(seconds, peak client bytes, result) for one call"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = fn()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def deep_page(engine, headers, depth):
+    """Latency of the page `depth` pages in (walks the cursors, times only the last request)"""
+    cursor = None
+    for _ in range(depth):
+        params = {"limit": 50}
+        if cursor:
+            params["cursor"] = cursor
+        started = time.perf_counter()
+        response = engine.get(f"{API_BASE}/accommodations", params=params, headers=headers, timeout=30)
+        elapsed = time.perf_counter() - started
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    return elapsed
+
+
+def measure(engine, size, repeat, full_scan):
+    headers = token_headers(BENCH_USER)
+    newest = engine.get(f"{API_BASE}/accommodations", params={"limit": 1}, headers=headers, timeout=30).json()[0]
+    target = newest["id"]
+
+    row = {"size": size}
+    row["first_page"], _ = timed(
+        lambda: engine.get(f"{API_BASE}/accommodations", params={"limit": 50}, headers=headers, timeout=30), repeat)
+    row["page_20"] = statistics.median(deep_page(engine, headers, 20) for _ in range(repeat))
+    row["find_paged"], row["find_paged_peak"], _ = traced(
+        lambda: find_record(iter_history(engine, API_BASE, headers=headers), lambda r: r["id"] == target))
+    row["find_stream"], row["find_stream_peak"], _ = traced(
+        lambda: find_record(stream_history(engine, API_BASE, headers=headers), lambda r: r["id"] == target))
+    if full_scan:
+        row["scan"], row["scan_peak"], row["scanned"] = traced(
+            lambda: sum(1 for _ in stream_history(engine, API_BASE, headers=headers, timeout=600)))
+    return row
+
+
+def print_report(rows, full_scan):
+    print("\n" + "=" * 100)
+    print("📚 ACCOMMODATION HISTORY BENCHMARK (latency ms / client peak KiB)")
+    print("=" * 100)
+    header = (f"{'Records':>9}{'Page 1':>9}{'Page 20':>9}{'Find paged':>12}{'KiB':>8}"
+              f"{'Find stream':>13}{'KiB':>8}")
+    if full_scan:
+        header += f"{'Full scan':>11}{'KiB':>8}{'rec/s':>10}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        line = (f"{row['size']:>9}{row['first_page'] * 1000:>9.1f}{row['page_20'] * 1000:>9.1f}"
+                f"{row['find_paged'] * 1000:>12.1f}{row['find_paged_peak'] / 1024:>8.0f}"
+                f"{row['find_stream'] * 1000:>13.1f}{row['find_stream_peak'] / 1024:>8.0f}")
+        if full_scan:
+            line += (f"{row['scan'] * 1000:>11.0f}{row['scan_peak'] / 1024:>8.0f}"
+                     f"{row['scanned'] / row['scan']:>10.0f}")
+        print(line)
+
+
+def run_history_benchmark(sizes, repeat=5, full_scan=False, keep=False):
+    client = httpx.Client(base_url=FAKE_SUPABASE_URL, timeout=120)
+    engine = get_engine()
+    rows = []
+    seeded = 0
+    try:
+        for size in sorted(sizes):
+            print(f"🌱 Growing history to {size} benchmark records...")
+            seeded = grow_history(client, seeded, size)
+            rows.append(measure(engine, size, repeat, full_scan))
+    finally:
+        if not keep:
+            client.delete("/rest/v1/accommodation_sessions", params={"additional_info": f"eq.{BENCH_TAG}"})
+        client.close()
+
+    print_report(rows, full_scan)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accommodation history pagination/streaming benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--full-scan", action="store_true", help="also stream every record at each size")
+    parser.add_argument("--keep", action="store_true", help="leave the benchmark records in place")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    run_history_benchmark(sizes, repeat=args.repeat, full_scan=args.full_scan, keep=args.keep)
+
+
+if __name__ == "__main__":
+    main()
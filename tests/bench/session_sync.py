@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Session workspace polling simulation
+Replays a collaborative session - a parent and an advocate each polling the
+workspace every --poll-interval seconds while comments arrive at
+--comments-per-hour and an advocate approval lands halfway - over --duration
+of simulated time, compressed so the run takes as long as the requests do.
+At every tick each participant polls both ways against the same server state:
+  full          GET /session/:id plus every comment page (what the
+                workspace transferred before comments were split out)
+  incremental   GET /session/:id with If-None-Match, then
+                GET /session/:id/comments?since=<previous X-Sync-Since>
+and the bytes on the wire and latency of each are compared. The incremental
+client's thread is checked against the full one at the end.
+
+The session is seeded with tests/fixtures.py (--initial-comments by directory
+users) unless --session-id names an existing one.
+
+Usage (stand-ins and the Next.js server already running):
+    python -m tests.bench.session_sync --duration 1h --poll-interval 5 --comments-per-hour 120
+"""
+
+import argparse
+import os
+import random
+import time
+
+from tests import fixtures
+from tests.engine import get_engine
+from tests.load import percentile
+from tests.soak import parse_duration
+
+API_BASE = f"{os.getenv('NEXT_PUBLIC_BASE_URL', 'http://localhost:3000')}/api"
+
+PARTICIPANTS = ("parent_sarah", "advocate_maria")
+PAGE_SIZE = 1000  # COMMENT_MAX_PAGE_SIZE in route.js
+
+
+def wire_bytes(response):
+    """Bytes received for a response: status line and headers plus the (encoded) body"""
+    headers = sum(len(name) + len(value) + 4 for name, value in response.headers.raw)
+    return len(f"HTTP/1.1 {response.status_code} {response.reason_phrase}\r\n") + headers + 2 + response.num_bytes_downloaded
+
+
+class Meter:
+    """Bytes and latency of one polling mode"""
+
+    def __init__(self):
+        self.polls = 0
+        self.requests = 0
+        self.bytes = 0
+        self.latencies = []
+        self.not_modified = 0
+
+    def get(self, engine, url, **kwargs):
+        started = time.perf_counter()
+        response = engine.get(url, timeout=60, **kwargs)
+        self.latencies[-1] += time.perf_counter() - started
+        self.requests += 1
+        self.bytes += wire_bytes(response)
+        self.not_modified += response.status_code == 304
+        if response.status_code not in (200, 304):
+            raise RuntimeError(f"GET {url} returned {response.status_code}")
+        return response
+
+    def start_poll(self):
+        self.polls += 1
+        self.latencies.append(0.0)
+
+
+def poll_full(engine, meter, session_id):
+    """The whole session and thread, every time"""
+    meter.start_poll()
+    meter.get(engine, f"{API_BASE}/session/{session_id}")
+    comments, cursor = [], None
+    while True:
+        params = {"limit": PAGE_SIZE, **({"cursor": cursor} if cursor else {})}
+        page = meter.get(engine, f"{API_BASE}/session/{session_id}/comments", params=params)
+        comments.extend(page.json())
+        cursor = page.headers.get("x-next-cursor")
+        if not cursor:
+            return comments
+
+
+def poll_incremental(engine, meter, session_id, state):
+    """Conditional session fetch plus the comments added since the last poll"""
+    meter.start_poll()
+    headers = {"If-None-Match": state["etag"]} if state.get("etag") else {}
+    response = meter.get(engine, f"{API_BASE}/session/{session_id}", headers=headers)
+    if response.status_code == 200:
+        state["etag"] = response.headers.get("etag")
+        state["session"] = response.json()
+
+    cursor = None
+    while True:
+        params = {"limit": PAGE_SIZE}
+        if cursor:
+            params["cursor"] = cursor
+        elif state.get("since"):
+            params["since"] = state["since"]
+        page = meter.get(engine, f"{API_BASE}/session/{session_id}/comments", params=params)
+        state.setdefault("comments", []).extend(page.json())
+        state["since"] = page.headers.get("x-sync-since") or state.get("since")
+        cursor = page.headers.get("x-next-cursor")
+        if not cursor:
+            return state["comments"]
+
+
+def comment_schedule(rng, duration, per_hour):
+    """Simulated arrival times (seconds) of new comments, a Poisson process"""
+    times, moment = [], 0.0
+    while per_hour > 0:
+        moment += rng.expovariate(per_hour / 3600)
+        if moment >= duration:
+            return times
+        times.append(moment)
+    return times
+
+
+def simulate(session_id, duration=3600, poll_interval=5, comments_per_hour=120, seed=0, engine=None):
+    """Run the simulation; returns {"full": Meter, "incremental": Meter, "posted", "consistent"}"""
+    engine = engine or get_engine()
+    rng = random.Random(seed)
+    arrivals = comment_schedule(rng, duration, comments_per_hour)
+    meters = {"full": Meter(), "incremental": Meter()}
+    states = {user: {} for user in PARTICIPANTS}
+    full_threads = {}
+    posted = approved = 0
+
+    ticks = int(duration // poll_interval)
+    for tick in range(ticks + 1):
+        now = tick * poll_interval
+        while arrivals and arrivals[0] <= now:
+            arrivals.pop(0)
+            author = rng.choice(PARTICIPANTS)
+            engine.post(f"{API_BASE}/session/{session_id}/comments", timeout=30, json={
+                "text": f"Simulated comment {posted} at {now:.0f}s", "userId": author,
+                "accommodationIndex": rng.randrange(5) if rng.random() < 0.5 else None
+            }).raise_for_status()
+            posted += 1
+        if not approved and now >= duration / 2:
+            engine.put(f"{API_BASE}/session/{session_id}/approval", timeout=30,
+                       json={"userId": "advocate_maria", "approved": True}).raise_for_status()
+            approved = 1
+
+        for user in PARTICIPANTS:
+            full_threads[user] = poll_full(engine, meters["full"], session_id)
+            poll_incremental(engine, meters["incremental"], session_id, states[user])
+
+        if tick and tick % max(1, ticks // 10) == 0:
+            print(f"   ⏱️  {now / 60:.0f} of {duration / 60:.0f} simulated minutes, {posted} comments posted")
+
+    consistent = all(
+        [c["id"] for c in states[user]["comments"]] == [c["id"] for c in full_threads[user]]
+        for user in PARTICIPANTS
+    )
+    return {**meters, "posted": posted, "consistent": consistent}
+
+
+def print_report(result, duration):
+    print("\n" + "=" * 78)
+    print(f"🔄 SESSION POLLING OVER {duration / 60:.0f} SIMULATED MINUTES ({result['posted']} new comments)")
+    print("=" * 78)
+    header = f"{'Mode':<14}{'Polls':>7}{'Reqs':>7}{'304s':>7}{'Total KB':>11}{'B/poll':>10}{'p50 ms':>9}{'p95 ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for mode in ("full", "incremental"):
+        meter = result[mode]
+        print(f"{mode:<14}{meter.polls:>7}{meter.requests:>7}{meter.not_modified:>7}{meter.bytes / 1024:>11.1f}"
+              f"{meter.bytes / max(meter.polls, 1):>10.0f}{percentile(meter.latencies, 50) * 1000:>9.1f}"
+              f"{percentile(meter.latencies, 95) * 1000:>9.1f}")
+    full, incremental = result["full"], result["incremental"]
+    if full.bytes:
+        print(f"\n📉 Incremental polling transferred {100 * (1 - incremental.bytes / full.bytes):.1f}% fewer bytes; "
+              f"p50 {percentile(full.latencies, 50) * 1000:.1f}ms -> {percentile(incremental.latencies, 50) * 1000:.1f}ms")
+    print("✅ Incremental thread matches the full reload" if result["consistent"]
+          else "❌ Incremental thread differs from the full reload")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session workspace polling simulation")
+    parser.add_argument("--duration", default="1h", help="simulated session length, e.g. 30m or 1h")
+    parser.add_argument("--poll-interval", type=float, default=5, help="simulated seconds between polls")
+    parser.add_argument("--comments-per-hour", type=float, default=120)
+    parser.add_argument("--initial-comments", type=int, default=200, help="thread size before the session starts")
+    parser.add_argument("--directory-users", type=int, default=fixtures.DEFAULT_DIRECTORY_USERS)
+    parser.add_argument("--session-id", default=None, help="poll an existing session instead of seeding one")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    session_id = args.session_id
+    if not session_id:
+        fixtures.seed_directory_users(args.directory_users)
+        session_id = fixtures.seed_wide_session(args.initial_comments, args.directory_users, tag="session-sync")
+        print(f"🌱 Seeded session {session_id} with {args.initial_comments} comments")
+
+    duration = parse_duration(args.duration)
+    result = simulate(session_id, duration, args.poll_interval, args.comments_per_hour, args.seed)
+    print_report(result, duration)
+    if not args.session_id:
+        # The simulated comments were posted through the API and carry no fixture tag
+        fixtures.clear_session(session_id)
+    exit(0 if result["consistent"] else 1)
+
+
+if __name__ == "__main__":
+    main()
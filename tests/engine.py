@@ -0,0 +1,333 @@
+"""
+Shared HTTP engine for the backend API test suites
+Runs one pooled httpx.AsyncClient (keep-alive, per-host connection limits) on a
+background event loop. Blocking test_* functions call it through the sync
+helpers, asyncio code (load generation) awaits it directly, and both share the
+same warm connections.
+
+Observers registered with add_observer() receive one record per request
+(status, size, connect/send/wait/receive timings, parsed Server-Timing
+phases) and per check, labelled
+with the check and payload variant they ran under, for tests/results.py.
+"""
+
+import asyncio
+import atexit
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import httpx
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_PER_HOST = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_TIMEOUT = 30.0
+
+# Labels for observed requests; they follow the caller into the engine loop
+# because run_coroutine_threadsafe schedules with the caller's context
+CURRENT_CHECK = contextvars.ContextVar("current_check", default=None)
+CURRENT_VARIANT = contextvars.ContextVar("current_variant", default=None)
+
+
+@contextmanager
+def variant(label):
+    """Label the requests made inside the block with a payload variant"""
+    token = CURRENT_VARIANT.set(label)
+    try:
+        yield
+    finally:
+        CURRENT_VARIANT.reset(token)
+
+
+def parse_server_timing(header):
+    """{phase: milliseconds} from 'auth;dur=1.2, openai;dur=830, ...' (repeats summed)"""
+    phases = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        if not name:
+            continue
+        duration = 0.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur":
+                try:
+                    duration = float(value.strip('"'))
+                except ValueError:
+                    pass
+        phases[name] = phases.get(name, 0.0) + duration
+    return phases
+
+
+class _Trace:
+    """httpcore trace hook: wall time of each connection/request phase"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks = {}
+
+    async def __call__(self, event, info):
+        self.marks[event] = time.perf_counter()
+
+    def _span(self, start_suffix, end_suffix):
+        start = next((t for name, t in self.marks.items() if name.endswith(start_suffix)), None)
+        end = next((t for name, t in self.marks.items() if name.endswith(end_suffix)), None)
+        return end - start if start is not None and end is not None else None
+
+    def timings(self, finished):
+        headers_done = next((t for name, t in self.marks.items()
+                             if name.endswith("receive_response_headers.complete")), None)
+        return {
+            # None when a pooled connection was reused
+            "connect": self._span("connect_tcp.started", "connect_tcp.complete"),
+            "send": self._span("send_request_headers.started", "send_request_body.complete"),
+            "wait": self._span("send_request_body.complete", "receive_response_headers.complete"),
+            "receive": finished - headers_done if headers_done is not None else None
+        }
+
+
+class HttpEngine:
+    """Pooled keep-alive HTTP client usable from threads and coroutines"""
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS, max_per_host=DEFAULT_MAX_PER_HOST,
+                 keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY, timeout=DEFAULT_TIMEOUT):
+        self.max_connections = max_connections
+        self.max_per_host = min(max_per_host, max_connections)
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._host_slots = {}
+        self._start_lock = threading.Lock()
+        self._observers = []
+
+    # ----- lifecycle -----
+
+    def start(self):
+        """Start the background loop and client (idempotent)"""
+        with self._start_lock:
+            if self._loop is not None:
+                return self
+            ready = threading.Event()
+
+            def serve():
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+                self._client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                        keepalive_expiry=self.keepalive_expiry
+                    ),
+                    timeout=self.timeout
+                )
+                ready.set()
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=serve, name="http-engine", daemon=True)
+            self._thread.start()
+            ready.wait()
+        return self
+
+    def close(self):
+        """Close pooled connections and stop the background loop"""
+        with self._start_lock:
+            if self._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+            self._client = None
+            self._host_slots = {}
+
+    @property
+    def loop(self):
+        return self.start()._loop
+
+    def run(self, coro):
+        """Run a coroutine on the engine loop and block until it finishes"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("HttpEngine.run() cannot be called from the engine loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    # ----- async API -----
+
+    def _slot(self, url):
+        host = httpx.URL(url)
+        key = (host.scheme, host.host, host.port)
+        if key not in self._host_slots:
+            self._host_slots[key] = asyncio.Semaphore(self.max_per_host)
+        return self._host_slots[key]
+
+    async def arequest(self, method, url, **kwargs):
+        """Send a request on the pooled client, honouring the per-host limit"""
+        async with self._slot(url):
+            if not self._observers:
+                return await self._client.request(method, url, **kwargs)
+
+            trace = _Trace()
+            kwargs["extensions"] = {**kwargs.get("extensions", {}), "trace": trace}
+            try:
+                response = await self._client.request(method, url, **kwargs)
+            except Exception as e:
+                self._observe_request(method, url, trace, None, e)
+                raise
+            self._observe_request(method, url, trace, response)
+            return response
+
+    async def _aopen_stream(self, method, url, **kwargs):
+        request = self._client.build_request(method, url, **kwargs)
+        if self._observers:
+            request.extensions["trace"] = _Trace()
+        response = await self._client.send(request, stream=True)
+        if response.is_error:
+            await response.aread()
+            await response.aclose()
+            response.raise_for_status()
+        return response
+
+    async def aiter_lines(self, method, url, keep_blank=False, **kwargs):
+        """Async iter_lines, for many streams held open at once on the engine loop"""
+        response = await self._aopen_stream(method, url, **kwargs)
+        try:
+            async for line in response.aiter_lines():
+                if line or keep_blank:
+                    yield line
+        finally:
+            await response.aclose()
+            self._observe_request(method, url, response.request.extensions.get("trace"), response, streamed=True)
+
+    # ----- blocking API (mirrors the subset of `requests` the suites use) -----
+
+    def request(self, method, url, **kwargs):
+        return self.run(self.arequest(method, url, **kwargs))
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def iter_lines(self, method, url, keep_blank=False, **kwargs):
+        """Yield lines of a streamed response as they arrive
+
+        Only the current chunk is held in memory. Closing the generator early
+        (or letting it be collected) closes the response and its connection.
+        Blank lines are dropped unless `keep_blank` (SSE frames end with one).
+        """
+        try:
+            response = self.run(self._aopen_stream(method, url, **kwargs))
+        except httpx.HTTPStatusError as e:
+            self._observe_request(method, url, e.request.extensions.get("trace"), e.response, streamed=True)
+            raise
+        lines = response.aiter_lines()
+        try:
+            while True:
+                try:
+                    line = self.run(lines.__anext__())
+                except StopAsyncIteration:
+                    return
+                if line or keep_blank:
+                    yield line
+        finally:
+            self.run(response.aclose())
+            self._observe_request(method, url, response.request.extensions.get("trace"), response, streamed=True)
+
+    # ----- observers -----
+
+    def add_observer(self, observer):
+        """Call `observer(record)` after every request and check (see module docstring)"""
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        self._observers.remove(observer)
+
+    def _notify(self, record):
+        record["check"] = CURRENT_CHECK.get()
+        record["variant"] = CURRENT_VARIANT.get()
+        for observer in list(self._observers):
+            try:
+                observer(record)
+            except Exception as e:
+                print(f"⚠️  Result observer failed - {e}")
+
+    def _observe_request(self, method, url, trace, response, error=None, streamed=False):
+        if not self._observers or trace is None:
+            return
+        finished = time.perf_counter()
+        record = {
+            "kind": "request",
+            "method": method,
+            "url": str(url),
+            "status": response.status_code if response is not None else None,
+            "ok": response is not None and response.status_code < 400,
+            "error": (str(error) or type(error).__name__) if error else None,
+            "elapsed": finished - trace.started,
+            "size": response.num_bytes_downloaded if response is not None else None,
+            "streamed": streamed,
+            # The engine never retries; kept so retrying callers share the schema
+            "retries": 0,
+            # {phase: ms} the server reported; empty when it sent no Server-Timing
+            "server_timing": parse_server_timing(response.headers.get("server-timing")) if response is not None else {}
+        }
+        record.update(trace.timings(finished))
+        self._notify(record)
+
+    # ----- check orchestration -----
+
+    def run_checks(self, checks, max_parallel=None):
+        """Run independent blocking checks concurrently over the shared pool
+
+        `checks` maps a result name to a zero-argument callable returning a
+        bool. Results come back in the same order as `checks`.
+        """
+        checks = dict(checks)
+        if not checks:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=max_parallel or len(checks)) as pool:
+            futures = {name: pool.submit(self.run_check, name, check) for name, check in checks.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+    def run_check(self, name, check):
+        """Run one blocking check with its requests labelled `name`; exceptions fail it"""
+        token = CURRENT_CHECK.set(name)
+        started = time.perf_counter()
+        try:
+            try:
+                passed = bool(check())
+            except Exception as e:
+                print(f"❌ {name}: Check raised - {e}")
+                passed = False
+            if self._observers:
+                self._notify({"kind": "check", "passed": passed, "elapsed": time.perf_counter() - started})
+        finally:
+            CURRENT_CHECK.reset(token)
+        return passed
+
+
+_default_engine = None
+_default_lock = threading.Lock()
+
+
+def get_engine():
+    """Process-wide engine shared by backend_test and autism_profile_test"""
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = HttpEngine()
+            atexit.register(_default_engine.close)
+        return _default_engine
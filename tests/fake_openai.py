@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI chat-completions endpoint
+Returns canned, schema-valid accommodation, autism profile, insights and
+advanced review replies so perf runs measure our own server overhead instead
+of GPT-4o noise. `stream: true` requests get SSE chunks paced by
+tokens_per_second. Latency, token-rate throttling, 429/5xx faults, fenced or
+malformed bodies and oversized accommodation lists (cut at max_tokens) are
+injectable and can be changed at runtime.
+
+Point the Next.js server at it with:
+    OPENAI_BASE_URL=http://localhost:8089/v1 OPENAI_API_KEY=fake yarn dev
+
+Admin endpoints:
+    GET  /__stats    request counters by reply kind and status
+    POST /__reset    zero the counters
+    POST /__config   update any setting, e.g. {"rate_limit_ratio": 0.2, "seed": 7}
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8089
+
+ACCOMMODATION_CATEGORIES = ["Academic", "Behavioral", "Sensory", "Communication", "Environmental"]
+
+ACCOMMODATION_TEMPLATES = [
+    ("Visual Schedule", "Provide a visual schedule of daily routines and transitions"),
+    ("Movement Breaks", "Allow scheduled movement breaks to support sensory regulation"),
+    ("Advance Transition Warnings", "Give verbal and visual warnings before each transition"),
+    ("Noise-Reducing Headphones", "Offer headphones during loud activities to reduce auditory overload"),
+    ("Quiet Workspace", "Provide a low-distraction workspace for independent work"),
+    ("Extended Processing Time", "Allow extra time to process directions and respond"),
+    ("Chunked Assignments", "Break multi-step assignments into smaller supported steps"),
+    ("Visual Communication Supports", "Pair verbal instructions with picture or text supports"),
+    ("Calm-Down Space", "Provide access to a designated calm-down area with sensory tools"),
+    ("Social Stories", "Use social stories to preview new routines and social situations"),
+    ("Preferential Seating", "Seat the student away from high-traffic and noisy areas"),
+    ("Check-In/Check-Out", "Hold brief daily check-ins to support routine and predictability"),
+    ("AAC Access", "Ensure the student's AAC device is available across all settings"),
+    ("Fidget Tools", "Allow fidget tools to support attention and self-regulation"),
+    ("Modified Testing Environment", "Provide tests in a separate, quiet setting with breaks")
+]
+
+PROFILE_SECTIONS = [
+    "STUDENT OVERVIEW", "SENSORY CONSIDERATIONS", "COMMUNICATION APPROACH",
+    "BEHAVIORAL SUPPORTS", "RECOMMENDED CLASSROOM ACCOMMODATIONS", "GOALS AND PRIORITIES"
+]
+
+LATENCY_KINDS = ("none", "constant", "uniform", "normal", "lognormal")
+
+
+class LatencyModel:
+    """Sample reply latency (seconds) from a `kind:arg1,arg2` spec
+
+    none | constant:S | uniform:LOW,HIGH | normal:MEAN,STDDEV | lognormal:MU,SIGMA
+    """
+
+    def __init__(self, spec="none"):
+        kind, _, args = spec.partition(":")
+        if kind not in LATENCY_KINDS:
+            raise ValueError(f"Unknown latency kind '{kind}' (expected one of {', '.join(LATENCY_KINDS)})")
+        self.spec = spec
+        self.kind = kind
+        self.args = [float(a) for a in args.split(",") if a]
+
+    def sample(self, rng):
+        if self.kind == "constant":
+            return self.args[0]
+        if self.kind == "uniform":
+            return rng.uniform(self.args[0], self.args[1])
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(self.args[0], self.args[1]))
+        if self.kind == "lognormal":
+            return rng.lognormvariate(self.args[0], self.args[1])
+        return 0.0
+
+
+class FakeOpenAIConfig:
+    """Runtime-tunable behaviour of the stand-in"""
+
+    FIELDS = ("latency", "tokens_per_second", "rate_limit_ratio", "server_error_ratio",
+              "fence_ratio", "malformed_ratio", "oversize_ratio", "retry_after")
+
+    def __init__(self, latency="none", tokens_per_second=0, rate_limit_ratio=0.0, server_error_ratio=0.0,
+                 fence_ratio=0.0, malformed_ratio=0.0, oversize_ratio=0.0, retry_after=1, seed=None):
+        self.latency = LatencyModel(latency)
+        self.tokens_per_second = tokens_per_second
+        self.rate_limit_ratio = rate_limit_ratio
+        self.server_error_ratio = server_error_ratio
+        self.fence_ratio = fence_ratio
+        self.malformed_ratio = malformed_ratio
+        self.oversize_ratio = oversize_ratio
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+
+    def update(self, values):
+        for key, value in values.items():
+            if key == "seed":
+                # Re-seeding makes a fault sequence reproducible from a test
+                self.rng = random.Random(value)
+                continue
+            if key not in self.FIELDS:
+                raise ValueError(f"Unknown setting '{key}'")
+            setattr(self, key, LatencyModel(value) if key == "latency" else value)
+
+    def to_dict(self):
+        settings = {key: getattr(self, key) for key in self.FIELDS}
+        settings["latency"] = self.latency.spec
+        return settings
+
+
+# ----- canned replies -----
+
+def classify_request(messages):
+    """Work out which route.js call site sent this prompt"""
+    text = "\n".join(str(m.get("content", "")) for m in messages)
+    if '"accommodations"' in text:
+        return "accommodations"
+    if '"topNeeds"' in text:
+        return "insights"
+    if '"overall_assessment"' in text:
+        return "advanced_review"
+    return "profile"
+
+
+def build_accommodations(count):
+    accommodations = []
+    for i in range(count):
+        title, description = ACCOMMODATION_TEMPLATES[i % len(ACCOMMODATION_TEMPLATES)]
+        accommodations.append({
+            "title": title if i < len(ACCOMMODATION_TEMPLATES) else f"{title} ({i + 1})",
+            "description": f"{description}. Use whenever the student shows signs of sensory or routine stress.",
+            "category": ACCOMMODATION_CATEGORIES[i % len(ACCOMMODATION_CATEGORIES)],
+            "implementation": "Introduce the support with a visual cue, model it twice, then review weekly with the IEP team."
+        })
+    return {"accommodations": accommodations}
+
+
+def build_insights():
+    return {
+        "topNeeds": [f"Need {i + 1}: predictable routines with visual supports" for i in range(8)],
+        "topRecommendations": ["Use a visual schedule", "Offer movement breaks", "Preview transitions"],
+        "redFlags": ["Unannounced schedule changes", "Prolonged loud noise", "Crowded transitions"],
+        "helpfulSupports": ["Visual timers", "Calm-down space", "Fidget tools", "Clear expectations"],
+        "situationsToAvoid": ["Fire drills without warning", "Crowded hallways", "Rushed transitions", "Loud assemblies"],
+        "classroomTips": ["Give advance notice", "Pair words with pictures", "Allow processing time", "Praise effort"]
+    }
+
+
+def build_advanced_review():
+    return {
+        "overall_assessment": {"strength_score": "8", "compliance_score": "7",
+                               "summary": "The plan addresses core sensory and routine needs. Communication supports could be more specific."},
+        "detailed_review": {
+            "strengths": ["Clear sensory supports", "Predictable routines", "Visual supports"],
+            "concerns": ["Few measurable outcomes", "Limited communication detail", "No review dates"],
+            "missing_elements": ["Progress monitoring schedule", "Staff training plan"],
+            "legal_compliance": {"status": "concerns", "issues": ["Outcomes not measurable", "No data collection method"]}
+        },
+        "recommendations": {
+            "immediate_actions": ["Add measurable criteria", "Schedule a team review"],
+            "additional_accommodations": [{"title": "Structured Peer Support", "category": "Behavioral",
+                                           "description": "Pair the student with a trained peer buddy during unstructured times",
+                                           "priority": "medium"}],
+            "goals_suggestions": ["Uses a visual schedule independently 4 of 5 days", "Requests a break using AAC 80% of opportunities"]
+        },
+        "next_steps": {"timeline": "Within 30 days", "team_meeting": "Review data collection and outcomes",
+                       "monitoring": "Weekly data review by case manager"}
+    }
+
+
+def build_profile(prompt):
+    sections = list(PROFILE_SECTIONS)
+    if "ENHANCED HERO PROFILE" not in prompt:
+        sections = sections[:3]
+    name_match = re.search(r"Name: (.+)", prompt)
+    name = name_match.group(1).strip() if name_match else "The student"
+    paragraphs = [
+        f"{section}: {name} benefits from predictable routines, visual supports and sensory breaks. "
+        f"Educators should preview transitions, pair verbal directions with visuals and allow processing time."
+        for section in sections
+    ]
+    return "\n\n".join(paragraphs)
+
+
+def build_reply(kind, messages, oversized=False):
+    """Return the reply text for a request kind
+
+    `oversized` asks for far more accommodations than requested, so the reply
+    runs past max_tokens and is cut off like a real over-long completion.
+    """
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    if kind == "accommodations":
+        count_match = re.search(r"Create (\d+) personalized", prompt)
+        count = int(count_match.group(1)) if count_match else 8
+        return json.dumps(build_accommodations(count * 6 if oversized else count), indent=2)
+    if kind == "insights":
+        return json.dumps(build_insights(), indent=2)
+    if kind == "advanced_review":
+        return json.dumps(build_advanced_review(), indent=2)
+    return build_profile(prompt)
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+# ----- server -----
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, FakeOpenAIHandler)
+        self.config = config
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.stats = {"requests": 0, "by_kind": {}, "by_status": {}, "fenced": 0, "malformed": 0, "oversized": 0,
+                          "truncated": 0}
+
+    def count(self, kind, status, **flags):
+        with self.stats_lock:
+            self.stats["requests"] += 1
+            self.stats["by_kind"][kind] = self.stats["by_kind"].get(kind, 0) + 1
+            self.stats["by_status"][str(status)] = self.stats["by_status"].get(str(status), 0) + 1
+            for flag, value in flags.items():
+                if value:
+                    self.stats[flag] += 1
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY every
+    # keep-alive reply stalls ~40ms on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/__stats":
+            with self.server.stats_lock:
+                return self._send_json(200, {**self.server.stats, "config": self.server.config.to_dict()})
+        self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        if self.path == "/__reset":
+            self.server.reset_stats()
+            return self._send_json(200, {"success": True})
+        if self.path == "/__config":
+            try:
+                self.server.config.update(self._read_json())
+            except ValueError as e:
+                return self._send_json(400, {"error": str(e)})
+            return self._send_json(200, self.server.config.to_dict())
+        if self.path.rstrip("/").endswith("/chat/completions"):
+            return self._chat_completion()
+        self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def _chat_completion(self):
+        config = self.server.config
+        body = self._read_json()
+        messages = body.get("messages", [])
+        kind = classify_request(messages)
+
+        time.sleep(config.latency.sample(config.rng))
+
+        if config.rng.random() < config.rate_limit_ratio:
+            self.server.count(kind, 429)
+            return self._send_json(429, {"error": {"message": "Rate limit reached for gpt-4o", "type": "requests",
+                                                   "code": "rate_limit_exceeded"}},
+                                   headers={"Retry-After": config.retry_after})
+        if config.rng.random() < config.server_error_ratio:
+            self.server.count(kind, 500)
+            return self._send_json(500, {"error": {"message": "The server had an error while processing your request",
+                                                   "type": "server_error"}})
+
+        # Only drawn when enabled, so existing seeded fault sequences are unchanged
+        oversized = kind == "accommodations" and config.oversize_ratio > 0 and config.rng.random() < config.oversize_ratio
+        content = build_reply(kind, messages, oversized)
+        finish_reason = "stop"
+        fenced = malformed = truncated = False
+
+        if kind != "profile" and config.rng.random() < config.fence_ratio:
+            content = f"```json\n{content}\n```"
+            fenced = True
+        if kind != "profile" and config.rng.random() < config.malformed_ratio:
+            content = content[: max(1, len(content) // 2)]
+            malformed = True
+
+        max_tokens = body.get("max_tokens")
+        if max_tokens and estimate_tokens(content) > max_tokens:
+            content = content[: max_tokens * 4]
+            finish_reason = "length"
+            truncated = True
+
+        completion_tokens = estimate_tokens(content)
+        self.server.count(kind, 200, fenced=fenced, malformed=malformed, oversized=oversized, truncated=truncated)
+        if body.get("stream"):
+            return self._send_stream(body, content, finish_reason)
+
+        if config.tokens_per_second:
+            time.sleep(completion_tokens / config.tokens_per_second)
+
+        prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in messages)
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_stream(self, body, content, finish_reason):
+        """Send the reply as chat.completion.chunk SSE events, about one token per chunk"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model", "gpt-4o")
+        token_delay = 1 / self.server.config.tokens_per_second if self.server.config.tokens_per_second else 0
+
+        def event(delta, reason=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": reason}]
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+
+        try:
+            event({"role": "assistant", "content": ""})
+            for token in re.findall(r"\S+\s*|\s+", content):
+                if token_delay:
+                    time.sleep(token_delay)
+                event({"content": token})
+            event({}, finish_reason)
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away mid-stream
+            self.close_connection = True
+
+
+def start_server(host="127.0.0.1", port=DEFAULT_PORT, **config):
+    """Start the stand-in on a daemon thread and return the server (port=0 picks a free port)"""
+    server = FakeOpenAIServer((host, port), FakeOpenAIConfig(**config))
+    threading.Thread(target=server.serve_forever, name="fake-openai", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI chat-completions stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", default="none", help="none | constant:S | uniform:LOW,HIGH | normal:MEAN,SD | lognormal:MU,SIGMA")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="throttle replies to this completion token rate (0 = off)")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--server-error-ratio", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--fence-ratio", type=float, default=0.0, help="fraction of JSON replies wrapped in ```json fences")
+    parser.add_argument("--malformed-ratio", type=float, default=0.0, help="fraction of JSON replies cut in half")
+    parser.add_argument("--oversize-ratio", type=float, default=0.0,
+                        help="fraction of accommodation replies too long for max_tokens")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer((args.host, args.port), FakeOpenAIConfig(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        rate_limit_ratio=args.rate_limit_ratio,
+        server_error_ratio=args.server_error_ratio,
+        fence_ratio=args.fence_ratio,
+        malformed_ratio=args.malformed_ratio,
+        oversize_ratio=args.oversize_ratio,
+        retry_after=args.retry_after,
+        seed=args.seed
+    ))
+    print(f"🤖 Fake OpenAI listening on {server.url} (latency={args.latency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,726 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Supabase auth and PostgREST APIs used by route.js
+Serves /auth/v1/user plus an in-memory PostgREST subset (select with embeds,
+eq/in/lt/... filters, order, limit, insert, update, delete, rpc) over tables
+seeded with thousands of parents, advocates and students. Every request is
+counted so the harness can report how many Supabase round-trips each of our
+endpoints makes.
+
+Point the Next.js server at it with:
+    NEXT_PUBLIC_SUPABASE_URL=http://localhost:8090 NEXT_PUBLIC_SUPABASE_ANON_KEY=fake yarn dev
+
+Authenticate as any seeded user with `Authorization: Bearer token-<user id>`.
+
+Admin endpoints:
+    GET  /__stats           round-trip counters (total, by operation, by table)
+    POST /__reset           zero the counters
+    GET  /__users?role=...  seeded users with their bearer tokens
+"""
+
+import argparse
+import json
+import random
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+DEFAULT_PORT = 8090
+
+SEED_NAMESPACE = uuid.UUID("6f1c9a52-3d2e-4b8f-9a41-0c5e7d2b1a90")
+
+# (table, column, referenced table) - many-to-one foreign keys used for embedding
+FOREIGN_KEYS = [
+    ("students", "parent_id", "user_profiles"),
+    ("student_advocate_assignments", "student_id", "students"),
+    ("student_advocate_assignments", "advocate_id", "user_profiles"),
+    ("autism_profiles", "student_id", "students"),
+    ("autism_profiles", "user_id", "user_profiles"),
+    ("accommodation_sessions", "student_id", "students")
+]
+
+# Fixed users/students matching the ids used by autism_profile_test.py
+FIXED_USERS = [
+    ("parent_sarah", "Sarah", "Johnson", "parent", "free"),
+    ("parent_mike", "Mike", "Chen", "parent", "hero"),
+    ("parent_lisa", "Lisa", "Rodriguez", "parent", "hero"),
+    ("advocate_maria", "Maria", "Gonzalez", "advocate", "free"),
+    ("advocate_john", "John", "Thompson", "advocate", "free")
+]
+FIXED_STUDENTS = [
+    ("child_emma", "parent_sarah", "Emma Johnson", "3rd", "advocate_maria"),
+    ("child_alex", "parent_sarah", "Alex Johnson", "1st", "advocate_maria"),
+    ("child_david", "parent_mike", "David Chen", "5th", "advocate_maria"),
+    ("child_sofia", "parent_lisa", "Sofia Rodriguez", "2nd", "advocate_john")
+]
+
+FIRST_NAMES = ["Ava", "Ben", "Chloe", "Diego", "Ella", "Farah", "Gabe", "Hana", "Isaac", "Jada", "Kai", "Lena"]
+LAST_NAMES = ["Adams", "Brooks", "Cruz", "Diaz", "Evans", "Foster", "Garcia", "Hughes", "Ito", "Jones", "Khan", "Lopez"]
+GRADES = ["K", "1st", "2nd", "3rd", "4th", "5th", "6th", "7th", "8th"]
+DIAGNOSES = ["Autism Spectrum Disorder (ASD)", "ADHD", "Sensory Processing Disorder", "Speech/Language Delay"]
+SENSORY = ["Sound sensitivity (auditory)", "Need for movement breaks", "Visual processing strengths", "Tactile sensitivity"]
+BEHAVIORS = ["Difficulty with transitions", "Need for routine/predictability", "Executive functioning challenges"]
+
+
+def seeded_id(label):
+    return str(uuid.uuid5(SEED_NAMESPACE, label))
+
+
+def token_for(user_id):
+    return f"token-{user_id}"
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _iso(moment):
+    return moment.isoformat().replace("+00:00", "Z")
+
+
+# ----- in-memory database -----
+
+class FakeDatabase:
+    """Tables of dict rows with an id index and lazy per-column equality indexes"""
+
+    def __init__(self):
+        self.tables = {}
+        self.id_index = {}
+        self.column_indexes = {}
+        self.lock = threading.RLock()
+
+    def rows(self, table):
+        return self.tables.setdefault(table, [])
+
+    def get(self, table, row_id):
+        return self.id_index.setdefault(table, {}).get(row_id)
+
+    def lookup(self, table, column, value):
+        """Rows whose `column` equals `value`, via a lazily built hash index"""
+        with self.lock:
+            key = (table, column)
+            if key not in self.column_indexes:
+                index = {}
+                for row in self.rows(table):
+                    index.setdefault(str(row.get(column)), []).append(row)
+                self.column_indexes[key] = index
+            return self.column_indexes[key].get(str(value), [])
+
+    def invalidate(self, table):
+        for key in [key for key in self.column_indexes if key[0] == table]:
+            del self.column_indexes[key]
+
+    def insert(self, table, row):
+        with self.lock:
+            stamp = _iso(_now())
+            row = {"id": str(uuid.uuid4()), "created_at": stamp, "updated_at": stamp, **row}
+            self.rows(table).append(row)
+            self.id_index.setdefault(table, {})[row["id"]] = row
+            for (indexed_table, column), index in self.column_indexes.items():
+                if indexed_table == table:
+                    index.setdefault(str(row.get(column)), []).append(row)
+            return row
+
+    def upsert(self, table, row):
+        """Insert, or merge into the row with the same id (Prefer: resolution=merge-duplicates)"""
+        with self.lock:
+            existing = self.get(table, row.get("id"))
+            if existing is None:
+                return self.insert(table, row)
+            self.update(table, [existing], {**row, "updated_at": _iso(_now())})
+            return existing
+
+    def update(self, table, rows, changes):
+        with self.lock:
+            for row in rows:
+                row.update(changes)
+            self.invalidate(table)
+
+    def delete(self, table, doomed):
+        with self.lock:
+            doomed_ids = {id(row) for row in doomed}
+            self.tables[table] = [row for row in self.rows(table) if id(row) not in doomed_ids]
+            for row in doomed:
+                self.id_index.get(table, {}).pop(row.get("id"), None)
+            self.invalidate(table)
+
+    def seed(self, parents=2000, advocates=200, students_per_parent=2, advocates_per_student=1,
+             profiles_per_student=1, hero_ratio=0.3, caseloads=(), seed=42):
+        """Populate users, students, assignments and autism profiles"""
+        rng = random.Random(seed)
+        base = _now() - timedelta(days=365)
+
+        def add_user(user_id, first, last, role, plan):
+            self.insert("user_profiles", {
+                "id": user_id, "first_name": first, "last_name": last,
+                "email": f"{user_id}@example.com", "role": role, "plan_type": plan,
+                "is_active": True, "created_at": _iso(base)
+            })
+
+        def add_student(student_id, parent_id, name, grade, created_at):
+            self.insert("students", {
+                "id": student_id, "parent_id": parent_id, "name": name, "grade_level": grade,
+                "diagnosis_areas": rng.sample(DIAGNOSES, 2), "sensory_preferences": rng.sample(SENSORY, 2),
+                "behavioral_challenges": rng.sample(BEHAVIORS, 2), "communication_method": "verbal",
+                "additional_notes": "Responds well to visual supports", "is_active": True,
+                "created_at": _iso(created_at)
+            })
+
+        def assign(student_id, advocate_id, parent_id):
+            self.insert("student_advocate_assignments", {
+                "student_id": student_id, "advocate_id": advocate_id, "assigned_by": parent_id, "is_active": True
+            })
+
+        def add_profiles(student_id, parent_id, created_at):
+            for p in range(profiles_per_student):
+                self.insert("autism_profiles", {
+                    "user_id": parent_id, "student_id": student_id,
+                    "generated_profile": "STUDENT OVERVIEW: Benefits from predictable routines.",
+                    "profile_type": "standard", "is_shared": False,
+                    "created_at": _iso(created_at + timedelta(minutes=p))
+                })
+
+        for user_id, first, last, role, plan in FIXED_USERS:
+            add_user(user_id, first, last, role, plan)
+        for student_id, parent_id, name, grade, advocate_id in FIXED_STUDENTS:
+            add_student(student_id, parent_id, name, grade, base)
+            assign(student_id, advocate_id, parent_id)
+
+        advocate_ids = [seeded_id(f"advocate-{a}") for a in range(advocates)]
+        for advocate_id in advocate_ids:
+            add_user(advocate_id, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), "advocate", "free")
+
+        tick = 0
+        all_students = []
+        for p in range(parents):
+            parent_id = seeded_id(f"parent-{p}")
+            add_user(parent_id, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), "parent",
+                     "hero" if rng.random() < hero_ratio else "free")
+            for s in range(students_per_parent):
+                student_id = seeded_id(f"student-{p}-{s}")
+                created_at = base + timedelta(minutes=tick)
+                tick += 1
+                add_student(student_id, parent_id, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                            rng.choice(GRADES), created_at)
+                if advocate_ids:
+                    for advocate_id in rng.sample(advocate_ids, min(advocates_per_student, len(advocate_ids))):
+                        assign(student_id, advocate_id, parent_id)
+                add_profiles(student_id, parent_id, created_at)
+                all_students.append((student_id, parent_id))
+
+        # Advocates with a fixed caseload, for scaling checks (advocate_caseload_<n>)
+        for caseload in caseloads:
+            advocate_id = f"advocate_caseload_{caseload}"
+            add_user(advocate_id, "Caseload", str(caseload), "advocate", "free")
+            for student_id, parent_id in all_students[:caseload]:
+                assign(student_id, advocate_id, parent_id)
+
+    def summary(self):
+        return {table: len(rows) for table, rows in self.tables.items()}
+
+
+# ----- PostgREST subset -----
+
+def split_top_level(text, sep=","):
+    """Split on `sep` outside parentheses and double quotes"""
+    parts, depth, quoted, current = [], 0, False, ""
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == sep and depth == 0 and not quoted:
+            parts.append(current)
+            current = ""
+        else:
+            current += ch
+    if current:
+        parts.append(current)
+    return [p.strip() for p in parts if p.strip()]
+
+
+def parse_select(select):
+    """Parse a PostgREST select into [(alias, column)] and [(alias, table, inner, subselect)]"""
+    columns, embeds = [], []
+    for item in split_top_level(select or "*"):
+        alias, _, rest = item.partition(":") if ":" in item.split("(")[0] else ("", "", item)
+        if "(" in rest:
+            name, _, inner_select = rest.partition("(")
+            name, _, hint = name.partition("!")
+            embeds.append((alias or name, name, hint == "inner", inner_select[:-1]))
+        else:
+            columns.append((alias or rest, rest))
+    return columns, embeds
+
+
+def parse_value(raw):
+    if raw == "null":
+        return None
+    if raw in ("true", "false"):
+        return raw == "true"
+    return raw
+
+
+def parse_filter(expression):
+    """Turn `op.value` into a predicate on a column value"""
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, raw = expression.partition(".")
+    if op == "in":
+        values = {v.strip('"') for v in split_top_level(raw.strip("()"))}
+        test = lambda v: v is not None and str(v) in values
+    elif op == "is":
+        value = parse_value(raw)
+        test = lambda v: v is value or v == value
+    elif op in ("eq", "neq", "gt", "gte", "lt", "lte"):
+        value = parse_value(raw)
+        compare = {
+            "eq": lambda a, b: a == b, "neq": lambda a, b: a != b,
+            "gt": lambda a, b: a > b, "gte": lambda a, b: a >= b,
+            "lt": lambda a, b: a < b, "lte": lambda a, b: a <= b
+        }[op]
+
+        def test(v):
+            if v is None or value is None:
+                return op == "eq" and v is value
+            if isinstance(v, bool) or isinstance(value, bool):
+                return compare(v, value)
+            return compare(str(v), str(value))
+    elif op in ("like", "ilike"):
+        needle = raw.replace("*", "%").strip("%")
+        test = lambda v: v is not None and (needle.lower() in str(v).lower() if op == "ilike" else needle in str(v))
+    else:
+        raise ValueError(f"Unsupported filter operator '{op}'")
+    return (lambda v: not test(v)) if negate else test
+
+
+def parse_logic(expression, conjunction=any):
+    """Row predicate for an or=(...) / and(...) tree of `column.op.value` terms"""
+    terms = []
+    for term in split_top_level(expression.strip()[1:-1]):
+        if term.startswith(("and(", "or(")):
+            name, _, rest = term.partition("(")
+            terms.append(parse_logic("(" + rest, all if name == "and" else any))
+        else:
+            column, _, condition = term.partition(".")
+            test = parse_filter(condition)
+            terms.append(lambda row, column=column, test=test: test(row.get(column)))
+    return lambda row: conjunction(term(row) for term in terms)
+
+
+def relationship(table, other):
+    """Return ('one', fk column) or ('many', fk column) linking table -> other"""
+    for source, column, target in FOREIGN_KEYS:
+        if source == table and target == other:
+            return "one", column
+    for source, column, target in FOREIGN_KEYS:
+        if source == other and target == table:
+            return "many", column
+    raise ValueError(f"Could not find a relationship between '{table}' and '{other}'")
+
+
+class PostgrestQuery:
+    """A parsed PostgREST request against one table"""
+
+    RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+    def __init__(self, table, params):
+        self.table = table
+        self.select = "*"
+        self.order = []
+        self.limit = None
+        self.offset = 0
+        self.filters = []
+        self.row_filters = []
+        self.raw_filters = []
+        self.embed_filters = {}
+        for key, value in params:
+            if key == "select":
+                self.select = value
+            elif key == "order":
+                for part in value.split(","):
+                    column, _, direction = part.partition(".")
+                    self.order.append((column, direction.startswith("desc")))
+            elif key == "limit":
+                self.limit = int(value)
+            elif key == "offset":
+                self.offset = int(value)
+            elif key in self.RESERVED:
+                continue
+            elif key in ("or", "and"):
+                self.row_filters.append(parse_logic(value, any if key == "or" else all))
+            elif "." in key:
+                relation, _, column = key.partition(".")
+                self.embed_filters.setdefault(relation, []).append((column, parse_filter(value)))
+            else:
+                self.filters.append((key, parse_filter(value)))
+                op, _, raw = value.partition(".")
+                self.raw_filters.append((key, op, raw))
+
+    def matches(self, row):
+        return (all(test(row.get(column)) for column, test in self.filters)
+                and all(test(row) for test in self.row_filters))
+
+    def candidates(self, db):
+        # Serve equality filters from indexes instead of scanning the table
+        for column, op, raw in self.raw_filters:
+            if column == "id" and op == "eq":
+                row = db.get(self.table, raw)
+                return [row] if row else []
+            if column == "id" and op == "in":
+                rows = (db.get(self.table, v.strip('"')) for v in split_top_level(raw.strip("()")))
+                return [row for row in rows if row]
+        for column, op, raw in self.raw_filters:
+            if op == "eq" and raw not in ("true", "false", "null"):
+                return db.lookup(self.table, column, raw)
+        return db.rows(self.table)
+
+    def run(self, db):
+        rows = [row for row in self.candidates(db) if self.matches(row)]
+        for column, descending in reversed(self.order):
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column) or ""), reverse=descending)
+        shaped_rows = []
+        skipped = 0
+        for row in rows:
+            if self.limit is not None and len(shaped_rows) >= self.limit:
+                break
+            shaped = self.shape(db, self.table, row, self.select, "")
+            if shaped is None:
+                continue
+            if skipped < self.offset:
+                skipped += 1
+                continue
+            shaped_rows.append(shaped)
+        return shaped_rows
+
+    def shape(self, db, table, row, select, path):
+        """Project a row through a select list, resolving embeds; None drops it (!inner)"""
+        columns, embeds = parse_select(select)
+        shaped = {}
+        for alias, column in columns:
+            if column == "*":
+                shaped.update(row)
+            else:
+                shaped[alias] = row.get(column)
+        for alias, other, inner, subselect in embeds:
+            kind, fk = relationship(table, other)
+            relation_path = f"{path}{alias}"
+            filters = self.embed_filters.get(relation_path, [])
+            if kind == "one":
+                target = db.get(other, row.get(fk))
+                if target is not None and not all(test(target.get(c)) for c, test in filters):
+                    target = None
+                value = self.shape(db, other, target, subselect, relation_path + ".") if target else None
+                if value is None and inner:
+                    return None
+            else:
+                value = []
+                for child in db.lookup(other, fk, row.get("id")):
+                    if all(test(child.get(c)) for c, test in filters):
+                        shaped_child = self.shape(db, other, child, subselect, relation_path + ".")
+                        if shaped_child is not None:
+                            value.append(shaped_child)
+                if inner and not value:
+                    return None
+            shaped[alias] = value
+        return shaped
+
+
+# ----- rpc functions (supabase-schema.sql) -----
+
+def advocate_autism_profiles(db, args):
+    """Page of profiles for an advocate's active assignments, newest first by (created_at, id)"""
+    student_ids = {
+        row["student_id"] for row in db.lookup("student_advocate_assignments", "advocate_id", args.get("p_advocate_id"))
+        if row.get("is_active")
+    }
+    before, before_id = args.get("p_before"), args.get("p_before_id")
+    rows = []
+    for student_id in student_ids:
+        for row in db.lookup("autism_profiles", "student_id", student_id):
+            if before is None or row["created_at"] < before or (row["created_at"] == before and row["id"] < before_id):
+                rows.append(row)
+    rows.sort(key=lambda row: (row["created_at"], row["id"]), reverse=True)
+    page = []
+    for row in rows[: args.get("p_limit", 50)]:
+        student = db.get("students", row["student_id"])
+        page.append({
+            **{column: row.get(column) for column in
+               ("id", "student_id", "generated_profile", "profile_type", "is_shared", "created_at")},
+            "students": {column: student.get(column) for column in ("id", "name", "grade_level", "parent_id")}
+        })
+    return page
+
+
+RPCS = {
+    "advocate_autism_profiles": advocate_autism_profiles
+}
+
+
+# ----- server -----
+
+class FakeSupabaseServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, db):
+        super().__init__(address, FakeSupabaseHandler)
+        self.db = db
+        self.rpcs = dict(RPCS)
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.stats = {"total": 0, "by_operation": {}, "by_table": {}}
+
+    def count(self, operation, table):
+        with self.stats_lock:
+            self.stats["total"] += 1
+            key = f"{operation} {table}"
+            self.stats["by_operation"][key] = self.stats["by_operation"].get(key, 0) + 1
+            self.stats["by_table"][table] = self.stats["by_table"].get(table, 0) + 1
+
+    def snapshot(self):
+        with self.stats_lock:
+            return json.loads(json.dumps(self.stats))
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class FakeSupabaseHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY every
+    # keep-alive reply stalls ~40ms on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    # ----- plumbing -----
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def _bearer(self):
+        header = self.headers.get("Authorization", "")
+        return header[7:] if header.startswith("Bearer ") else None
+
+    def _route(self):
+        parts = urlsplit(self.path)
+        return parts.path, parse_qsl(parts.query, keep_blank_values=True)
+
+    def _wants_object(self):
+        return "application/vnd.pgrst.object+json" in self.headers.get("Accept", "")
+
+    def _prefers_representation(self):
+        return "return=representation" in self.headers.get("Prefer", "")
+
+    def _prefers_merge(self):
+        return "resolution=merge-duplicates" in self.headers.get("Prefer", "")
+
+    def _send_empty(self, status):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _respond_rows(self, rows, status=200):
+        if self._wants_object():
+            if len(rows) != 1:
+                return self._send_json(406, {
+                    "code": "PGRST116",
+                    "details": f"The result contains {len(rows)} rows",
+                    "hint": None,
+                    "message": "JSON object requested, multiple (or no) rows returned"
+                })
+            return self._send_json(status, rows[0])
+        end = max(len(rows) - 1, 0)
+        self._send_json(status, rows, headers={"Content-Range": f"0-{end}/*"})
+
+    def _table(self, path):
+        return path[len("/rest/v1/"):].strip("/")
+
+    # ----- verbs -----
+
+    def do_GET(self):
+        path, params = self._route()
+        if path == "/__stats":
+            return self._send_json(200, {**self.server.snapshot(), "rows": self.server.db.summary()})
+        if path == "/__users":
+            return self._list_users(dict(params))
+        if path == "/auth/v1/user":
+            return self._get_user()
+        if path.startswith("/rest/v1/"):
+            table = self._table(path)
+            self.server.count("select", table)
+            try:
+                with self.server.db.lock:
+                    rows = PostgrestQuery(table, params).run(self.server.db)
+            except ValueError as e:
+                return self._send_json(400, {"code": "PGRST100", "message": str(e)})
+            return self._respond_rows(rows)
+        self._send_json(404, {"message": f"Unknown path {path}"})
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_POST(self):
+        path, params = self._route()
+        if path == "/__reset":
+            self.server.reset_stats()
+            return self._send_json(200, {"success": True})
+        if path.startswith("/rest/v1/rpc/"):
+            return self._rpc(path[len("/rest/v1/rpc/"):], params)
+        if path.startswith("/rest/v1/"):
+            table = self._table(path)
+            self.server.count("insert", table)
+            payload = self._read_json()
+            records = payload if isinstance(payload, list) else [payload]
+            write = self.server.db.upsert if self._prefers_merge() else self.server.db.insert
+            inserted = [write(table, record) for record in records]
+            if not self._prefers_representation():
+                return self._send_empty(201)
+            query = PostgrestQuery(table, params)
+            with self.server.db.lock:
+                rows = [query.shape(self.server.db, table, row, query.select, "") for row in inserted]
+            return self._respond_rows(rows, status=201)
+        self._send_json(404, {"message": f"Unknown path {path}"})
+
+    def do_PATCH(self):
+        path, params = self._route()
+        if not path.startswith("/rest/v1/"):
+            return self._send_json(404, {"message": f"Unknown path {path}"})
+        table = self._table(path)
+        self.server.count("update", table)
+        changes = self._read_json() or {}
+        query = PostgrestQuery(table, params)
+        with self.server.db.lock:
+            updated = [row for row in query.candidates(self.server.db) if query.matches(row)]
+            self.server.db.update(table, updated, changes)
+            rows = [query.shape(self.server.db, table, row, query.select, "") for row in updated]
+        if not self._prefers_representation():
+            return self._send_empty(204)
+        self._respond_rows(rows)
+
+    def do_DELETE(self):
+        path, params = self._route()
+        if not path.startswith("/rest/v1/"):
+            return self._send_json(404, {"message": f"Unknown path {path}"})
+        table = self._table(path)
+        self.server.count("delete", table)
+        query = PostgrestQuery(table, params)
+        with self.server.db.lock:
+            doomed = [row for row in query.candidates(self.server.db) if query.matches(row)]
+            self.server.db.delete(table, doomed)
+        if not self._prefers_representation():
+            return self._send_empty(204)
+        self._respond_rows(doomed)
+
+    # ----- handlers -----
+
+    def _get_user(self):
+        self.server.count("auth", "users")
+        token = self._bearer() or ""
+        user_id = token[len("token-"):] if token.startswith("token-") else None
+        profile = self.server.db.get("user_profiles", user_id) if user_id else None
+        if not profile:
+            return self._send_json(401, {"code": 401, "error_code": "bad_jwt", "msg": "invalid JWT: unable to parse or verify signature"})
+        self._send_json(200, {
+            "id": profile["id"],
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": profile["email"],
+            "app_metadata": {"provider": "email"},
+            "user_metadata": {"role": profile["role"]},
+            "created_at": profile["created_at"]
+        })
+
+    def _rpc(self, name, params):
+        self.server.count("rpc", name)
+        handler = self.server.rpcs.get(name)
+        if handler is None:
+            return self._send_json(404, {"code": "PGRST202", "message": f"Could not find the function public.{name}"})
+        with self.server.db.lock:
+            result = handler(self.server.db, self._read_json() or {})
+        if isinstance(result, list):
+            query = PostgrestQuery(name, params)
+            if query.limit is not None:
+                result = result[: query.limit]
+            return self._respond_rows(result)
+        self._send_json(200, result)
+
+    def _list_users(self, params):
+        role = params.get("role")
+        limit = int(params.get("limit", 20))
+        users = [
+            {"id": row["id"], "role": row["role"], "plan_type": row["plan_type"], "token": token_for(row["id"])}
+            for row in self.server.db.rows("user_profiles")
+            if role is None or row["role"] == role
+        ]
+        self._send_json(200, users[:limit])
+
+
+def start_server(host="127.0.0.1", port=DEFAULT_PORT, **seed_options):
+    """Seed a database, start the stand-in on a daemon thread and return the server (port=0 picks a free port)"""
+    db = FakeDatabase()
+    db.seed(**seed_options)
+    server = FakeSupabaseServer((host, port), db)
+    threading.Thread(target=server.serve_forever, name="fake-supabase", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Supabase auth/PostgREST stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--parents", type=int, default=2000)
+    parser.add_argument("--advocates", type=int, default=200)
+    parser.add_argument("--students-per-parent", type=int, default=2)
+    parser.add_argument("--profiles-per-student", type=int, default=1)
+    parser.add_argument("--hero-ratio", type=float, default=0.3)
+    parser.add_argument("--caseloads", default="2000",
+                        help="comma-separated advocate caseload sizes, e.g. 1,10,100,1000")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    db = FakeDatabase()
+    db.seed(
+        parents=args.parents,
+        advocates=args.advocates,
+        students_per_parent=args.students_per_parent,
+        profiles_per_student=args.profiles_per_student,
+        hero_ratio=args.hero_ratio,
+        caseloads=[int(c) for c in args.caseloads.split(",") if c],
+        seed=args.seed
+    )
+    server = FakeSupabaseServer((args.host, args.port), db)
+    rows = ", ".join(f"{table}={count}" for table, count in db.summary().items())
+    print(f"🗄️  Fake Supabase listening on {server.url} ({rows})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
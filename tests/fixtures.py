@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Seeded large-dataset fixture builder for the Mongo collections
+Bulk-inserts synthetic accommodation_sessions, session_comments,
+document_vault, advanced_reviews and user_events documents shaped like the
+ones the API writes. Ids and owners derive from (seed, collection, index) and
+the remaining fields from one RNG per batch, so batches are generated
+independently by a pool of worker processes, each inserting with unordered
+insert_many on its own connection.
+
+A share of the data (--hot-ratio) belongs to the mock users (parent_sarah,
+advocate_maria, ...) so per-user endpoints such as /sessions/parent_sarah and
+/hero/vault/parent_mike see realistic volumes; the rest is spread over
+synthetic users. Every document carries `fixture: <tag>` so a run can be
+removed again with --clear.
+
+--wide-session adds one session with that many comments written by up to
+--directory-users synthetic users (fixture_user_<n>), whose profiles are
+upserted into the fake Supabase so the API can resolve their names.
+
+Usage:
+    python -m tests.fixtures --sessions 1000000 --workers 8
+    python -m tests.fixtures --sessions 0 --wide-session 5000 --directory-users 10000
+    python -m tests.fixtures --clear
+"""
+
+import argparse
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from multiprocessing import Pool
+
+import httpx
+
+from tests.standins import FAKE_SUPABASE_URL
+
+try:
+    from pymongo import MongoClient
+except ImportError:
+    MongoClient = None
+
+MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.getenv("DB_NAME", "test_database")
+
+DEFAULT_TAG = "fixture"
+DEFAULT_SEED = 42
+DEFAULT_CHUNK_SIZE = 50000
+DEFAULT_BATCH_SIZE = 5000
+
+# Documents per accommodation session for the dependent collections
+DEFAULT_RATIOS = {
+    "session_comments": 3.0,
+    "document_vault": 0.2,
+    "advanced_reviews": 0.1,
+    "user_events": 2.0
+}
+
+COLLECTIONS = ("accommodation_sessions",) + tuple(DEFAULT_RATIOS)
+
+NAMESPACE = uuid.UUID("6f1c8a52-7c1e-4d7a-9a51-1f0e6a3f5c11")
+
+# Mock users from the API and who advocates for whom
+MOCK_PARENTS = {
+    "parent_sarah": "advocate_maria",
+    "parent_mike": "advocate_maria",
+    "parent_lisa": "advocate_john"
+}
+HERO_PARENTS = ("parent_mike", "parent_lisa")
+
+SYNTHETIC_PARENTS = 50000
+SYNTHETIC_ADVOCATES = 500
+
+DEFAULT_DIRECTORY_USERS = 10000
+DIRECTORY_BATCH_SIZE = 2000
+
+GRADES = ["Pre-K", "K", "1st", "2nd", "3rd", "4th", "5th", "6th", "7th", "8th", "9th", "10th", "11th", "12th"]
+DIAGNOSES = [
+    "Autism Spectrum Disorder (ASD)", "ADHD", "Sensory Processing Disorder", "Anxiety Disorder",
+    "Speech/Language Delay", "Learning Disability"
+]
+SENSORY = [
+    "Sound sensitivity (auditory)", "Visual processing strengths", "Need for movement breaks",
+    "Need for quiet environment", "Tactile sensitivity", "Seeks deep pressure"
+]
+BEHAVIORAL = [
+    "Difficulty with transitions", "Need for routine/predictability", "Emotional regulation",
+    "Social interaction challenges", "Attention and focus"
+]
+COMMUNICATION = ["verbal", "limited-verbal", "non-verbal", "aac-device"]
+CATEGORIES = ["Sensory", "Behavioral", "Communication", "Academic", "Social"]
+FIRST_NAMES = ["Emma", "Alex", "David", "Sofia", "Liam", "Noah", "Ava", "Mia", "Ethan", "Zoe", "Lucas", "Maya"]
+COMMENT_TEXTS = [
+    "Can we discuss this one at the next IEP meeting?",
+    "This worked really well at home last week.",
+    "The teacher suggested trying this in the afternoon too.",
+    "Should we add a visual schedule for this?",
+    "Agreed, let's keep this accommodation."
+]
+EVENT_TYPES = [
+    "accommodations_generated", "autism_profile_generated", "plan_enforcement", "advocate_match",
+    "signup", "hero_usage"
+]
+TEMPLATE_TYPES = ["full_iep", "accommodations_only", "meeting_prep"]
+
+TIME_SPAN = timedelta(days=730)
+
+# Distinct child/plan bodies generated per batch; sessions pick one at random
+SESSION_VARIANTS = 64
+
+
+@lru_cache(maxsize=None)
+def _id_prefix(seed, kind):
+    return str(uuid.uuid5(NAMESPACE, f"{seed}:{kind}"))[:24]
+
+
+def fixture_id(seed, kind, index):
+    """Stable UUID-shaped id for the index-th document of a collection"""
+    return f"{_id_prefix(seed, kind)}{index:012x}"
+
+
+def session_owner(index, hot_ratio):
+    """(forParent, advocate) for session `index` - deterministic, no RNG state needed"""
+    # Knuth multiplicative hash spreads consecutive indexes over the user space
+    spread = (index * 2654435761) & 0xFFFFFFFF
+    if spread / 0xFFFFFFFF < hot_ratio:
+        parent = list(MOCK_PARENTS)[index % len(MOCK_PARENTS)]
+        return parent, MOCK_PARENTS[parent]
+    parent_index = spread % SYNTHETIC_PARENTS
+    return f"fixture_parent_{parent_index}", f"fixture_advocate_{parent_index % SYNTHETIC_ADVOCATES}"
+
+
+def _timestamp(rng, now):
+    return now - timedelta(seconds=rng.random() * TIME_SPAN.total_seconds())
+
+
+def session_body(rng):
+    """Child and plan fields of a session, without id, owner or time"""
+    child = rng.choice(FIRST_NAMES)
+    hero = rng.random() < 0.3
+    return child, {
+        "gradeLevel": rng.choice(GRADES),
+        "diagnosisAreas": ["Autism Spectrum Disorder (ASD)"] + rng.sample(DIAGNOSES[1:], rng.randint(0, 2)),
+        "sensoryPreferences": rng.sample(SENSORY, rng.randint(1, 3)),
+        "behavioralChallenges": rng.sample(BEHAVIORAL, rng.randint(1, 3)),
+        "communicationMethod": rng.choice(COMMUNICATION),
+        "additionalInfo": f"{child} responds well to advance notice and visual supports.",
+        "planType": "hero" if hero else "free",
+        "accommodations": [
+            {
+                "title": f"{category} support {n + 1}",
+                "description": f"Provide {category.lower()} support during classroom activities for {child}.",
+                "category": category,
+                "implementation": "Teacher checks in at the start of each lesson."
+            }
+            for n, category in enumerate(rng.choices(CATEGORIES, k=rng.randint(5, 10) if hero else 5))
+        ]
+    }
+
+
+def build_session(rng, variants, seed, index, hot_ratio, now):
+    parent, advocate = session_owner(index, hot_ratio)
+    child, body = variants[int(rng.random() * len(variants))]
+    session = {
+        "id": fixture_id(seed, "session", index),
+        "childName": f"{child} {index}",
+        **body,
+        "createdBy": advocate if rng.random() < 0.4 else parent,
+        "forParent": parent,
+        "timestamp": _timestamp(rng, now)
+    }
+    if parent in HERO_PARENTS:
+        session["planType"] = "hero"
+    return session
+
+
+def build_comment(rng, seed, index, sessions, hot_ratio, now):
+    session_index = int(rng.random() * sessions)
+    parent, advocate = session_owner(session_index, hot_ratio)
+    return {
+        "id": fixture_id(seed, "comment", index),
+        "sessionId": fixture_id(seed, "session", session_index),
+        "userId": rng.choice((parent, advocate)),
+        "text": rng.choice(COMMENT_TEXTS),
+        "accommodationIndex": rng.randrange(5) if rng.random() < 0.6 else None,
+        "timestamp": _timestamp(rng, now)
+    }
+
+
+def build_vault_document(rng, seed, index, sessions, hot_ratio, now):
+    session_index = int(rng.random() * sessions)
+    parent, _ = session_owner(session_index, hot_ratio)
+    template_type = rng.choice(TEMPLATE_TYPES)
+    return {
+        "id": fixture_id(seed, "vault", index),
+        "userId": parent,
+        "sessionId": fixture_id(seed, "session", session_index),
+        "documentType": template_type,
+        "title": f"IEP Template - Child {session_index}",
+        "template": {
+            "id": fixture_id(seed, "template", index),
+            "type": template_type,
+            "sections": ["childInfo", "presentLevels", "accommodations", "goals"]
+        },
+        "timestamp": _timestamp(rng, now)
+    }
+
+
+def build_review(rng, seed, index, sessions, hot_ratio, now):
+    session_index = int(rng.random() * sessions)
+    parent, _ = session_owner(session_index, hot_ratio)
+    return {
+        "id": fixture_id(seed, "review", index),
+        "sessionId": fixture_id(seed, "session", session_index),
+        "userId": parent,
+        "advancedReview": {
+            "overallAssessment": {"score": rng.randint(60, 98), "summary": "Plan covers the documented needs."},
+            "recommendations": ["Add measurable outcomes", "Schedule quarterly review"]
+        },
+        "legalAnalysis": {
+            "risks": [{"type": "insufficient_sensory", "level": "medium"}] if rng.random() < 0.3 else [],
+            "warnings": [{"type": "evaluation_reminder"}]
+        },
+        "reviewType": "hero_advanced",
+        "timestamp": _timestamp(rng, now)
+    }
+
+
+def build_event(rng, seed, index, sessions, hot_ratio, now):
+    parent, _ = session_owner(int(rng.random() * sessions), hot_ratio)
+    timestamp = _timestamp(rng, now)
+    return {
+        "id": fixture_id(seed, "event", index),
+        "userId": parent,
+        "eventType": rng.choice(EVENT_TYPES),
+        "eventData": {"source": "fixture", "planType": rng.choice(("free", "hero"))},
+        "timestamp": timestamp,
+        "createdAt": timestamp
+    }
+
+
+BUILDERS = {
+    "session_comments": build_comment,
+    "document_vault": build_vault_document,
+    "advanced_reviews": build_review,
+    "user_events": build_event
+}
+
+
+def build_chunk(collection, start, stop, options):
+    """Documents [start, stop) of a collection (same batch bounds, same documents)"""
+    seed, hot_ratio, sessions, tag, now = (
+        options["seed"], options["hot_ratio"], options["sessions"], options["tag"], options["now"]
+    )
+    rng = random.Random(f"{seed}:{collection}:{start}")
+    if collection == "accommodation_sessions":
+        variants = [session_body(rng) for _ in range(SESSION_VARIANTS)]
+        documents = [build_session(rng, variants, seed, index, hot_ratio, now) for index in range(start, stop)]
+    else:
+        builder = BUILDERS[collection]
+        documents = [builder(rng, seed, index, sessions, hot_ratio, now) for index in range(start, stop)]
+    for document in documents:
+        document["fixture"] = tag
+    return documents
+
+
+# ----- worker processes -----
+
+_worker_db = None
+
+
+def _init_worker(mongo_url, db_name):
+    global _worker_db
+    _worker_db = MongoClient(mongo_url)[db_name]
+
+
+def _insert_chunk(task):
+    collection, start, stop, options, batch_size = task
+    target = _worker_db[collection]
+    for batch_start in range(start, stop, batch_size):
+        batch_stop = min(batch_start + batch_size, stop)
+        target.insert_many(build_chunk(collection, batch_start, batch_stop, options), ordered=False)
+    return collection, stop - start
+
+
+def plan(counts, chunk_size):
+    """(collection, start, stop) work items covering every collection"""
+    tasks = []
+    for collection, count in counts.items():
+        for start in range(0, count, chunk_size):
+            tasks.append((collection, start, min(start + chunk_size, count)))
+    return tasks
+
+
+def collection_counts(sessions, ratios=None):
+    ratios = {**DEFAULT_RATIOS, **(ratios or {})}
+    counts = {"accommodation_sessions": sessions}
+    for collection, ratio in ratios.items():
+        counts[collection] = int(sessions * ratio)
+    return counts
+
+
+def seed_fixtures(sessions, ratios=None, workers=None, seed=DEFAULT_SEED, hot_ratio=0.05, tag=DEFAULT_TAG,
+                  chunk_size=DEFAULT_CHUNK_SIZE, batch_size=DEFAULT_BATCH_SIZE,
+                  mongo_url=MONGO_URL, db_name=DB_NAME):
+    """Insert the fixture set in parallel; returns {collection: inserted}"""
+    if MongoClient is None:
+        raise RuntimeError("Fixture seeding needs pymongo (pip install pymongo)")
+
+    counts = collection_counts(sessions, ratios)
+    options = {
+        "seed": seed, "hot_ratio": hot_ratio, "sessions": max(sessions, 1), "tag": tag,
+        "now": datetime.now(timezone.utc)
+    }
+    tasks = [(collection, start, stop, options, batch_size) for collection, start, stop in plan(counts, chunk_size)]
+
+    inserted = {collection: 0 for collection in counts}
+    with Pool(processes=workers or os.cpu_count(), initializer=_init_worker,
+              initargs=(mongo_url, db_name)) as pool:
+        for collection, count in pool.imap_unordered(_insert_chunk, tasks):
+            inserted[collection] += count
+    return inserted
+
+
+def directory_user(index):
+    """user_profiles row of synthetic user `index` (same index, same row)"""
+    rng = random.Random(f"directory:{index}")
+    return {
+        "id": f"fixture_user_{index}",
+        "first_name": rng.choice(FIRST_NAMES),
+        "last_name": f"Fixture{index}",
+        "email": f"fixture_user_{index}@example.com",
+        "role": "advocate" if index % 10 == 0 else "parent",
+        "plan_type": "free",
+        "is_active": True
+    }
+
+
+def seed_directory_users(users, supabase_url=FAKE_SUPABASE_URL, batch_size=DIRECTORY_BATCH_SIZE):
+    """Upsert `users` synthetic profiles into the fake Supabase; returns how many were sent"""
+    with httpx.Client(base_url=supabase_url, timeout=60) as client:
+        for start in range(0, users, batch_size):
+            rows = [directory_user(index) for index in range(start, min(start + batch_size, users))]
+            response = client.post("/rest/v1/user_profiles", json=rows,
+                                   headers={"Prefer": "resolution=merge-duplicates"})
+            response.raise_for_status()
+    return users
+
+
+def wide_session_id(seed, comments):
+    return fixture_id(seed, "wide_session", comments)
+
+
+def seed_wide_session(comments, users=DEFAULT_DIRECTORY_USERS, seed=DEFAULT_SEED, tag=DEFAULT_TAG,
+                      mongo_url=MONGO_URL, db_name=DB_NAME):
+    """One session with `comments` comments by authors drawn from `users` synthetic users
+
+    Re-seeding the same (seed, comments) replaces the earlier copy; returns the session id.
+    """
+    if MongoClient is None:
+        raise RuntimeError("Fixture seeding needs pymongo (pip install pymongo)")
+
+    rng = random.Random(f"{seed}:wide_session:{comments}")
+    now = datetime.now(timezone.utc)
+    session_id = wide_session_id(seed, comments)
+    _, body = session_body(rng)
+    session = {
+        "id": session_id,
+        "childName": f"Wide session {comments}",
+        **body,
+        "createdBy": directory_user(1)["id"],
+        "forParent": directory_user(2)["id"],
+        "timestamp": now,
+        "fixture": tag
+    }
+    documents = [
+        {
+            "id": fixture_id(seed, f"wide_comment_{comments}", index),
+            "sessionId": session_id,
+            "userId": directory_user(rng.randrange(users))["id"],
+            "text": rng.choice(COMMENT_TEXTS),
+            "accommodationIndex": rng.randrange(5) if rng.random() < 0.6 else None,
+            "timestamp": now - timedelta(seconds=comments - index),
+            "fixture": tag
+        }
+        for index in range(comments)
+    ]
+
+    mongo = MongoClient(mongo_url)
+    try:
+        database = mongo[db_name]
+        database.accommodation_sessions.replace_one({"id": session_id}, session, upsert=True)
+        database.session_comments.delete_many({"sessionId": session_id})
+        for start in range(0, len(documents), DEFAULT_BATCH_SIZE):
+            database.session_comments.insert_many(documents[start:start + DEFAULT_BATCH_SIZE], ordered=False)
+    finally:
+        mongo.close()
+    return session_id
+
+
+def clear_fixtures(tag=DEFAULT_TAG, mongo_url=MONGO_URL, db_name=DB_NAME):
+    """Delete every document seeded with `tag`; returns {collection: deleted}"""
+    if MongoClient is None:
+        raise RuntimeError("Fixture clearing needs pymongo (pip install pymongo)")
+
+    mongo = MongoClient(mongo_url)
+    try:
+        database = mongo[db_name]
+        return {
+            collection: database[collection].delete_many({"fixture": tag}).deleted_count
+            for collection in COLLECTIONS
+        }
+    finally:
+        mongo.close()
+
+
+def clear_session(session_id, mongo_url=MONGO_URL, db_name=DB_NAME):
+    """Delete one session and every comment on it, including ones posted through the API
+    (those carry no fixture tag); returns {collection: deleted}"""
+    if MongoClient is None:
+        raise RuntimeError("Fixture clearing needs pymongo (pip install pymongo)")
+
+    mongo = MongoClient(mongo_url)
+    try:
+        database = mongo[db_name]
+        return {
+            "accommodation_sessions": database.accommodation_sessions.delete_many({"id": session_id}).deleted_count,
+            "session_comments": database.session_comments.delete_many({"sessionId": session_id}).deleted_count
+        }
+    finally:
+        mongo.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-seed synthetic Mongo fixtures")
+    parser.add_argument("--sessions", type=int, default=10000, help="accommodation_sessions to insert")
+    parser.add_argument("--comments", type=float, default=DEFAULT_RATIOS["session_comments"], help="comments per session")
+    parser.add_argument("--vault", type=float, default=DEFAULT_RATIOS["document_vault"], help="vault documents per session")
+    parser.add_argument("--reviews", type=float, default=DEFAULT_RATIOS["advanced_reviews"], help="advanced reviews per session")
+    parser.add_argument("--events", type=float, default=DEFAULT_RATIOS["user_events"], help="user events per session")
+    parser.add_argument("--hot-ratio", type=float, default=0.05, help="share of sessions owned by the mock users")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--wide-session", type=int, default=0, metavar="COMMENTS",
+                        help="also seed one session with this many comments")
+    parser.add_argument("--directory-users", type=int, default=DEFAULT_DIRECTORY_USERS,
+                        help="synthetic comment authors for --wide-session, upserted into the fake Supabase")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--tag", default=DEFAULT_TAG)
+    parser.add_argument("--clear", action="store_true", help="remove documents seeded with --tag and exit")
+    args = parser.parse_args()
+
+    if args.clear:
+        deleted = clear_fixtures(args.tag)
+        for collection, count in deleted.items():
+            print(f"🧹 {collection}: removed {count}")
+        return
+
+    ratios = {
+        "session_comments": args.comments,
+        "document_vault": args.vault,
+        "advanced_reviews": args.reviews,
+        "user_events": args.events
+    }
+    print(f"🌱 Seeding {args.sessions} sessions (+ dependents) into {DB_NAME} with tag '{args.tag}'...")
+    started = time.perf_counter()
+    inserted = seed_fixtures(
+        args.sessions, ratios, workers=args.workers, seed=args.seed, hot_ratio=args.hot_ratio, tag=args.tag,
+        chunk_size=args.chunk_size, batch_size=args.batch_size
+    )
+    elapsed = time.perf_counter() - started
+
+    total = sum(inserted.values())
+    for collection, count in inserted.items():
+        print(f"✅ {collection}: {count}")
+    print(f"⏱️  {total} documents in {elapsed:.1f}s ({total / elapsed:,.0f} docs/s)")
+
+    if args.wide_session:
+        seed_directory_users(args.directory_users)
+        session_id = seed_wide_session(args.wide_session, args.directory_users, seed=args.seed, tag=args.tag)
+        print(f"✅ wide session {session_id}: {args.wide_session} comments by {args.directory_users} users")
+
+
+if __name__ == "__main__":
+    main()
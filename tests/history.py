@@ -0,0 +1,54 @@
+"""
+Lazy iteration over the accommodation history API
+Both helpers are generators: callers stop as soon as they find what they are
+looking for, so neither client memory nor request count depends on how many
+records the history holds beyond the ones actually consumed.
+"""
+
+import json
+
+HISTORY_PAGE_SIZE = 50
+
+
+def iter_history(engine, api_base, page_size=HISTORY_PAGE_SIZE, headers=None, timeout=10):
+    """Yield the caller's history records newest first, one keyset page per request"""
+    cursor = None
+    while True:
+        params = {"limit": page_size}
+        if cursor:
+            params["cursor"] = cursor
+        response = engine.get(f"{api_base}/accommodations", params=params, headers=headers, timeout=timeout)
+        response.raise_for_status()
+        yield from response.json()
+
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return
+
+
+def stream_history(engine, api_base, headers=None, timeout=30):
+    """Yield the caller's history records newest first from the NDJSON stream"""
+    lines = engine.iter_lines(
+        "GET", f"{api_base}/accommodations",
+        params={"format": "ndjson"},
+        headers={**(headers or {}), "Accept": "application/x-ndjson"},
+        timeout=timeout
+    )
+    try:
+        for line in lines:
+            yield json.loads(line)
+    finally:
+        lines.close()
+
+
+def find_record(records, predicate):
+    """First record matching `predicate`, closing the iterator as soon as it is found"""
+    try:
+        for record in records:
+            if predicate(record):
+                return record
+        return None
+    finally:
+        close = getattr(records, "close", None)
+        if close:
+            close()
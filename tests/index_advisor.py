@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Index advisor for the hot Mongo query shapes in route.js
+Replays the API's query shapes against a seeded database (see
+tests/fixtures.py), captures explain() output, flags collection scans and
+in-memory sorts, proposes Equality-Sort-Range compound indexes for them,
+applies them and reports before/after latency. With --write the resulting
+index set is merged into lib/mongo-indexes.json, which the API applies on
+connect, so the indexes are versioned with the code that needs them.
+
+Usage:
+    python -m tests.fixtures --sessions 1000000
+    python -m tests.index_advisor --drop --write
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+try:
+    from pymongo import MongoClient
+except ImportError:
+    MongoClient = None
+
+MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.getenv("DB_NAME", "test_database")
+
+INDEX_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lib", "mongo-indexes.json")
+
+
+class QueryShape:
+    """One find() the API issues; `params` picks realistic values from the data"""
+
+    def __init__(self, name, collection, filter_fn, sort=None, limit=0, params=None):
+        self.name = name
+        self.collection = collection
+        self.filter_fn = filter_fn
+        self.sort = sort or {}
+        self.limit = limit
+        self.params = params
+
+    def filter(self, database):
+        return self.filter_fn(self.params(database) if self.params else None)
+
+
+def _sample(collection, field, query=None):
+    document = collection.find_one(query or {}, {field: 1}, sort=[("$natural", -1)])
+    return document.get(field) if document else None
+
+
+def _session_id(database):
+    return _sample(database["accommodation_sessions"], "id")
+
+
+def _commented_session_id(database):
+    return _sample(database["session_comments"], "sessionId")
+
+
+# Mirrors of the queries in app/api/[[...path]]/route.js
+QUERY_SHAPES = [
+    QueryShape("session by id (/session/:id, /hero/*)", "accommodation_sessions",
+               lambda session_id: {"id": session_id}, limit=1, params=_session_id),
+    QueryShape("sessions for parent (/sessions/:parent)", "accommodation_sessions",
+               lambda _: {"forParent": "parent_sarah"}, sort={"timestamp": -1}, limit=50),
+    QueryShape("sessions for advocate (/sessions/:advocate)", "accommodation_sessions",
+               lambda _: {"forParent": {"$in": ["parent_sarah", "parent_mike"]}}, sort={"timestamp": -1}, limit=50),
+    QueryShape("comments page (/session/:id/comments)", "session_comments",
+               lambda session_id: {"sessionId": session_id}, sort={"timestamp": 1, "id": 1}, limit=101,
+               params=_commented_session_id),
+    QueryShape("vault for user (/hero/vault/:user)", "document_vault",
+               lambda _: {"userId": "parent_mike"}, sort={"timestamp": -1})
+]
+
+
+# ----- explain analysis -----
+
+def explain(database, shape, query_filter):
+    command = {"find": shape.collection, "filter": query_filter}
+    if shape.sort:
+        command["sort"] = shape.sort
+    if shape.limit:
+        command["limit"] = shape.limit
+    return database.command({"explain": command, "verbosity": "executionStats"})
+
+
+def plan_stages(plan):
+    """Every stage name in a (winning) plan tree"""
+    stages = [plan.get("stage")]
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            stages.extend(plan_stages(plan[child_key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(plan_stages(child))
+    return [stage for stage in stages if stage]
+
+
+def analyze(explained):
+    """Summary of an explain(executionStats) result"""
+    planner = explained["queryPlanner"]
+    winning = planner["winningPlan"]
+    # SBE plans nest the classic tree under queryPlan
+    stages = plan_stages(winning.get("queryPlan", winning))
+    stats = explained.get("executionStats", {})
+    return {
+        "stages": stages,
+        "collscan": "COLLSCAN" in stages,
+        "in_memory_sort": "SORT" in stages,
+        "docs_examined": stats.get("totalDocsExamined", 0),
+        "keys_examined": stats.get("totalKeysExamined", 0),
+        "returned": stats.get("nReturned", 0),
+        "millis": stats.get("executionTimeMillis", 0)
+    }
+
+
+def needs_index(analysis):
+    scanned_too_much = analysis["docs_examined"] > max(analysis["returned"], 1) * 10
+    return analysis["collscan"] or analysis["in_memory_sort"] or scanned_too_much
+
+
+# ----- index proposals -----
+
+def propose_index(query_filter, sort):
+    """Equality, then sort, then range fields (the ESR rule)"""
+    equality, ranges = [], []
+    for field, condition in query_filter.items():
+        if field.startswith("$"):
+            continue
+        if isinstance(condition, dict) and any(op in condition for op in ("$gt", "$gte", "$lt", "$lte", "$ne")):
+            ranges.append(field)
+        else:
+            # Plain values, $eq and $in (merged per value by SORT_MERGE) sit in the equality prefix
+            equality.append(field)
+
+    key = [(field, 1) for field in equality]
+    key += [(field, direction) for field, direction in sort.items() if field not in equality]
+    key += [(field, 1) for field in ranges if field not in sort]
+    return key
+
+
+def index_name(key):
+    return "_".join(f"{field}_{direction}" for field, direction in key)
+
+
+def index_keys(index_information):
+    """The keys of pymongo's index_information() as [(field, direction), ...] lists"""
+    return [[(field, int(direction)) for field, direction in index["key"]] for index in index_information.values()]
+
+
+def covered_by(key, existing):
+    """True if one of the `existing` keys has `key` as a prefix (or its full reverse)"""
+    reversed_key = [(field, -direction) for field, direction in key]
+    return any(other[:len(key)] in (key, reversed_key) for other in existing)
+
+
+# ----- latency -----
+
+def measure_latency(database, shape, query_filter, repeat):
+    collection = database[shape.collection]
+    samples = []
+    for _ in range(repeat):
+        cursor = collection.find(query_filter)
+        if shape.sort:
+            cursor = cursor.sort(list(shape.sort.items()))
+        if shape.limit:
+            cursor = cursor.limit(shape.limit)
+        started = time.perf_counter()
+        for _document in cursor:
+            pass
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+# ----- index file -----
+
+def load_index_file(path=INDEX_FILE):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {"version": 0, "indexes": {}, "retired": {}}
+
+
+def write_index_file(proposals, path=INDEX_FILE):
+    """Merge proposals into the versioned index set; bumps the version on change"""
+    index_set = load_index_file(path)
+    changed = False
+    for collection, key in proposals:
+        entries = index_set["indexes"].setdefault(collection, [])
+        if covered_by(key, [list(entry["key"].items()) for entry in entries]):
+            continue
+        # Entries that are a prefix of the new key are served by it; retire them
+        retired = index_set.setdefault("retired", {}).setdefault(collection, [])
+        for entry in [entry for entry in entries if covered_by(list(entry["key"].items()), [key])]:
+            entries.remove(entry)
+            retired.append(entry["name"])
+        name = index_name(key)
+        entries.append({"key": dict(key), "name": name})
+        if name in retired:
+            retired.remove(name)
+        changed = True
+    if changed:
+        index_set["version"] += 1
+        with open(path, "w") as handle:
+            json.dump(index_set, handle, indent=2)
+            handle.write("\n")
+    return index_set, changed
+
+
+def apply_index_file(database, path=INDEX_FILE):
+    """Drop the retired indexes and create every index in the versioned set (what the API does on connect)"""
+    index_set = load_index_file(path)
+    for collection, names in index_set.get("retired", {}).items():
+        existing = database[collection].index_information()
+        for name in names:
+            if name in existing:
+                database[collection].drop_index(name)
+    for collection, entries in index_set["indexes"].items():
+        for entry in entries:
+            database[collection].create_index(list(entry["key"].items()), name=entry["name"])
+
+
+# ----- advisor -----
+
+def run_advisor(database, shapes=QUERY_SHAPES, repeat=20, apply=True, drop=False):
+    """Explain every shape, create missing indexes, re-measure; returns report rows"""
+    if drop:
+        for collection in {shape.collection for shape in shapes}:
+            database[collection].drop_indexes()
+
+    rows = []
+    proposals = []
+    for shape in shapes:
+        query_filter = shape.filter(database)
+        before = analyze(explain(database, shape, query_filter))
+        row = {
+            "shape": shape.name,
+            "collection": shape.collection,
+            "filter": query_filter,
+            "before": before,
+            "before_latency": measure_latency(database, shape, query_filter, repeat),
+            "proposal": None
+        }
+        if needs_index(before):
+            key = propose_index(query_filter, shape.sort)
+            existing = index_keys(database[shape.collection].index_information())
+            proposed = [other for collection, other in proposals if collection == shape.collection]
+            if key and not covered_by(key, existing + proposed):
+                # An earlier proposal that is a prefix of this key is served by it
+                for earlier in rows:
+                    if earlier["collection"] == shape.collection and earlier["proposal"] and \
+                            covered_by(earlier["proposal"], [key]):
+                        earlier["proposal"] = key
+                proposals = [(collection, other) for collection, other in proposals
+                             if collection != shape.collection or not covered_by(other, [key])]
+                row["proposal"] = key
+                proposals.append((shape.collection, key))
+        rows.append(row)
+
+    if apply:
+        for collection, key in proposals:
+            database[collection].create_index(key, name=index_name(key))
+
+    for shape, row in zip(shapes, rows, strict=True):
+        row["after"] = analyze(explain(database, shape, row["filter"]))
+        row["after_latency"] = measure_latency(database, shape, row["filter"], repeat)
+    return rows, proposals
+
+
+def describe(analysis):
+    flags = []
+    if analysis["collscan"]:
+        flags.append("COLLSCAN")
+    if analysis["in_memory_sort"]:
+        flags.append("SORT")
+    plan = "+".join(flags) if flags else "IXSCAN"
+    return f"{plan} {analysis['docs_examined']}/{analysis['returned']}"
+
+
+def print_report(rows):
+    print("\n" + "=" * 118)
+    print("🗂️  MONGO INDEX ADVISOR (plan, docs examined/returned, median latency)")
+    print("=" * 118)
+    header = f"{'Query':<46}{'Before':>24}{'ms':>9}{'After':>24}{'ms':>9}{'Speedup':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        speedup = row["before_latency"] / row["after_latency"] if row["after_latency"] else 0
+        print(f"{row['shape']:<46}{describe(row['before']):>24}{row['before_latency'] * 1000:>9.2f}"
+              f"{describe(row['after']):>24}{row['after_latency'] * 1000:>9.2f}{speedup:>8.1f}x")
+        if row["proposal"]:
+            print(f"    ➕ {row['collection']}: {dict(row['proposal'])}")
+    remaining = [row["shape"] for row in rows if needs_index(row["after"])]
+    print()
+    if remaining:
+        print(f"⚠️  Still scanning or sorting in memory: {', '.join(remaining)}")
+    else:
+        print("✅ Every query shape is served by an index")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Explain hot Mongo query shapes and propose indexes")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per query")
+    parser.add_argument("--drop", action="store_true", help="drop existing indexes first for an honest baseline")
+    parser.add_argument("--dry-run", action="store_true", help="report proposals without creating them")
+    parser.add_argument("--write", action="store_true", help=f"merge proposals into {os.path.relpath(INDEX_FILE)}")
+    parser.add_argument("--apply-file", action="store_true", help="only create the versioned index set and exit")
+    args = parser.parse_args()
+
+    if MongoClient is None:
+        print("❌ Index advisor needs pymongo (pip install pymongo)")
+        exit(1)
+
+    mongo = MongoClient(MONGO_URL)
+    database = mongo[DB_NAME]
+    try:
+        if args.apply_file:
+            apply_index_file(database)
+            print(f"✅ Applied index set v{load_index_file()['version']}")
+            return
+
+        rows, proposals = run_advisor(database, repeat=args.repeat, apply=not args.dry_run, drop=args.drop)
+        print_report(rows)
+        if args.write:
+            index_set, changed = write_index_file(proposals)
+            if changed:
+                print(f"📝 Index set bumped to v{index_set['version']}")
+            else:
+                print(f"📝 Index set v{index_set['version']} already covers every proposal")
+    finally:
+        mongo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Load generation helpers for the backend API test suites
+Replays fixed request payloads at a configurable concurrency and arrival rate
+and reports throughput plus latency percentiles per endpoint
+"""
+
+import asyncio
+import math
+import time
+
+from tests.engine import HttpEngine
+
+
+class LoadTarget:
+    """A single request shape to replay under load"""
+
+    def __init__(self, name, method, path, json_body=None, headers=None, timeout=60):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.json_body = json_body
+        self.headers = headers or {"Content-Type": "application/json"}
+        self.timeout = timeout
+
+    @property
+    def endpoint(self):
+        return f"{self.method} {self.path}"
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers (0 when empty)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+async def _send(engine, api_base, target):
+    """Issue one request and return a result record"""
+    started = time.perf_counter()
+    try:
+        response = await engine.arequest(
+            target.method,
+            f"{api_base}{target.path}",
+            json=target.json_body,
+            headers=target.headers,
+            timeout=target.timeout
+        )
+        status = response.status_code
+        error = None
+    except Exception as e:
+        status = None
+        error = str(e) or type(e).__name__
+    return {
+        "target": target.name,
+        "endpoint": target.endpoint,
+        "status": status,
+        "ok": status is not None and status < 400,
+        "error": error,
+        "latency": time.perf_counter() - started
+    }
+
+
+async def _generate(engine, api_base, targets, concurrency, rate, total_requests):
+    in_flight = asyncio.Semaphore(concurrency)
+    results = []
+
+    async def fire(target):
+        try:
+            results.append(await _send(engine, api_base, target))
+        finally:
+            in_flight.release()
+
+    tasks = []
+    started = time.perf_counter()
+    for i in range(total_requests):
+        if rate:
+            delay = started + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await in_flight.acquire()
+        tasks.append(asyncio.create_task(fire(targets[i % len(targets)])))
+    await asyncio.gather(*tasks)
+    return results, time.perf_counter() - started
+
+
+def run_load(api_base, targets, concurrency=10, rate=None, total_requests=100, engine=None):
+    """Replay targets round-robin with at most `concurrency` requests in flight
+
+    `rate` is the open-loop arrival rate in requests per second; when None the
+    generator is closed-loop and sends as fast as in-flight slots free up.
+    Without an explicit `engine` a dedicated pool sized to `concurrency` is used
+    so the shared per-host limit does not cap the offered load.
+    """
+    own_engine = engine is None
+    if own_engine:
+        engine = HttpEngine(max_connections=concurrency, max_per_host=concurrency)
+    try:
+        results, elapsed = engine.run(_generate(engine, api_base, targets, concurrency, rate, total_requests))
+    finally:
+        if own_engine:
+            engine.close()
+    return summarize(results, elapsed)
+
+
+def summarize(results, elapsed):
+    """Group result records per endpoint and compute throughput and percentiles"""
+    by_endpoint = {}
+    for record in results:
+        by_endpoint.setdefault(record["endpoint"], []).append(record)
+
+    summary = {"elapsed": elapsed, "total": len(results), "endpoints": {}}
+    for endpoint, records in by_endpoint.items():
+        latencies = [r["latency"] for r in records if r["ok"]]
+        errors = [r for r in records if not r["ok"]]
+        summary["endpoints"][endpoint] = {
+            "requests": len(records),
+            "errors": len(errors),
+            "statuses": _count_statuses(records),
+            "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99)
+        }
+    return summary
+
+
+def _count_statuses(records):
+    counts = {}
+    for record in records:
+        key = str(record["status"]) if record["status"] is not None else "error"
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def configuration_error(summary):
+    """A message when most responses were not 2xx, else None
+
+    A run like that measured how fast the server rejects requests (missing
+    auth, stand-ins not running), not how it handles the load.
+    """
+    statuses = {}
+    for stats in summary["endpoints"].values():
+        for status, count in stats["statuses"].items():
+            statuses[status] = statuses.get(status, 0) + count
+    succeeded = sum(count for status, count in statuses.items() if status.startswith("2"))
+    if not summary["total"] or succeeded * 2 > summary["total"]:
+        return None
+    breakdown = ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items()))
+    return (f"only {succeeded} of {summary['total']} responses were 2xx ({breakdown}) - "
+            f"check the auth headers and that the stand-ins are running")
+
+
+def print_load_report(summary):
+    """Print a per-endpoint throughput/latency table, or the configuration error"""
+    print("\n" + "=" * 70)
+    print("📈 LOAD TEST SUMMARY")
+    print("=" * 70)
+    print(f"Total requests: {summary['total']} in {summary['elapsed']:.1f}s")
+
+    error = configuration_error(summary)
+    if error:
+        print(f"❌ Configuration error: {error}")
+        for endpoint, stats in summary["endpoints"].items():
+            statuses = ", ".join(f"{status}: {count}" for status, count in sorted(stats["statuses"].items()))
+            print(f"    {endpoint} - {statuses}")
+        return
+
+    header = f"{'Endpoint':<36}{'Req':>6}{'Err':>6}{'RPS':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, stats in summary["endpoints"].items():
+        print(
+            f"{endpoint:<36}{stats['requests']:>6}{stats['errors']:>6}"
+            f"{stats['throughput']:>8.2f}{stats['p50'] * 1000:>10.1f}{stats['p95'] * 1000:>10.1f}{stats['p99'] * 1000:>10.1f}"
+        )
+        statuses = ", ".join(f"{status}: {count}" for status, count in sorted(stats["statuses"].items()))
+        print(f"    statuses - {statuses}")
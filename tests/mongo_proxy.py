@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Command-monitoring TCP proxy in front of mongod
+Forwards the wire protocol untouched and counts every OP_MSG command the
+Next.js server sends (find, insert, update, aggregate, getMore, ...) by
+command and collection, so the harness can report how many Mongo round-trips
+each endpoint makes. Driver handshake and heartbeat commands are not counted.
+
+Point the Next.js server at it with:
+    MONGO_URL='mongodb://localhost:27018/?directConnection=true' yarn dev
+
+Admin endpoints (on --admin-port):
+    GET  /__stats    command counters and open client connections
+    POST /__reset    zero the counters
+"""
+
+import argparse
+import asyncio
+import json
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 27018
+DEFAULT_ADMIN_PORT = 8091
+DEFAULT_UPSTREAM = "127.0.0.1:27017"
+
+OP_MSG = 2013
+HEADER = struct.Struct("<iiii")
+
+# Connection setup, auth and topology monitoring - not caused by our endpoints
+IGNORED_COMMANDS = {
+    "hello", "ismaster", "isMaster", "ping", "buildInfo", "buildinfo", "saslStart", "saslContinue",
+    "endSessions", "getLastError", "getFreeMonitoringStatus", "killCursors"
+}
+
+
+def parse_command(message):
+    """Return (command, collection) for an OP_MSG body, or None"""
+    # flagBits (uint32) then sections; section kind 0 carries the command document
+    offset = 4
+    while offset < len(message):
+        kind = message[offset]
+        offset += 1
+        if kind == 0:
+            # BSON: int32 size, then first element = type byte, cstring name, value
+            element_type = message[offset + 4]
+            name_end = message.index(b"\x00", offset + 5)
+            command = message[offset + 5:name_end].decode("utf-8", "replace")
+            collection = None
+            if element_type == 0x02:
+                length = struct.unpack_from("<i", message, name_end + 1)[0]
+                collection = message[name_end + 5:name_end + 4 + length].decode("utf-8", "replace")
+            return command, collection
+        # kind 1 document sequence: int32 size covers the identifier and documents
+        size = struct.unpack_from("<i", message, offset)[0]
+        offset += size
+    return None
+
+
+class CommandCounter:
+    """Thread-safe counters of Mongo commands seen by the proxy"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Connection gauges survive reset(): they describe the driver's pool, not a run
+        self.connections_open = 0
+        self.connections_opened = 0
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.total = 0
+            self.by_command = {}
+
+    def record(self, command, collection):
+        if command in IGNORED_COMMANDS:
+            return
+        key = f"{command} {collection}" if collection else command
+        with self.lock:
+            self.total += 1
+            self.by_command[key] = self.by_command.get(key, 0) + 1
+
+    def connection_opened(self):
+        with self.lock:
+            self.connections_open += 1
+            self.connections_opened += 1
+
+    def connection_closed(self):
+        with self.lock:
+            self.connections_open -= 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "total": self.total,
+                "by_command": dict(self.by_command),
+                "connections": {"open": self.connections_open, "opened": self.connections_opened}
+            }
+
+
+class MongoProxy:
+    """asyncio proxy that counts client -> server commands"""
+
+    def __init__(self, upstream=DEFAULT_UPSTREAM, counter=None):
+        host, _, port = upstream.partition(":")
+        self.upstream_host = host
+        self.upstream_port = int(port or 27017)
+        self.counter = counter or CommandCounter()
+        self.server = None
+
+    async def _pipe_client(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(HEADER.size)
+                length, _, _, op_code = HEADER.unpack(header)
+                body = await reader.readexactly(length - HEADER.size)
+                if op_code == OP_MSG:
+                    try:
+                        parsed = parse_command(body)
+                    except (IndexError, struct.error, ValueError):
+                        parsed = None
+                    if parsed:
+                        self.counter.record(*parsed)
+                writer.write(header + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _pipe_server(self, reader, writer):
+        try:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                writer.write(chunk)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, client_reader, client_writer):
+        try:
+            server_reader, server_writer = await asyncio.open_connection(self.upstream_host, self.upstream_port)
+        except OSError:
+            client_writer.close()
+            return
+        self.counter.connection_opened()
+        try:
+            await asyncio.gather(
+                self._pipe_client(client_reader, server_writer),
+                self._pipe_server(server_reader, client_writer)
+            )
+        finally:
+            self.counter.connection_closed()
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+
+class AdminHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/__stats":
+            return self._send_json(200, self.server.counter.snapshot())
+        self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path == "/__reset":
+            self.server.counter.reset()
+            return self._send_json(200, {"success": True})
+        self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+
+def start_admin(counter, host="127.0.0.1", port=DEFAULT_ADMIN_PORT):
+    admin = ThreadingHTTPServer((host, port), AdminHandler)
+    admin.daemon_threads = True
+    admin.counter = counter
+    threading.Thread(target=admin.serve_forever, name="mongo-proxy-admin", daemon=True).start()
+    return admin
+
+
+def start_proxy(upstream=DEFAULT_UPSTREAM, host="127.0.0.1", port=DEFAULT_PORT, admin_port=DEFAULT_ADMIN_PORT):
+    """Run the proxy and its admin endpoint on daemon threads; returns the CommandCounter"""
+    proxy = MongoProxy(upstream)
+    started = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(proxy.start(host, port))
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, name="mongo-proxy", daemon=True).start()
+    started.wait()
+    start_admin(proxy.counter, host, admin_port)
+    return proxy.counter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Counting MongoDB wire-protocol proxy")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--admin-port", type=int, default=DEFAULT_ADMIN_PORT)
+    parser.add_argument("--upstream", default=DEFAULT_UPSTREAM, help="host:port of the real mongod")
+    args = parser.parse_args()
+
+    proxy = MongoProxy(args.upstream)
+    start_admin(proxy.counter, args.host, args.admin_port)
+    print(f"🍃 Mongo proxy listening on {args.host}:{args.port} -> {args.upstream} "
+          f"(stats on http://{args.host}:{args.admin_port}/__stats)")
+
+    async def serve():
+        server = await proxy.start(args.host, args.port)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
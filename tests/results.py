@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Machine-readable results for the backend API test suites
+ResultsWriter observes the shared engine and appends one flat record per
+request (endpoint template, check, payload variant, status, latency and its
+connect/send/wait/receive breakdown, server_<phase> Server-Timing columns,
+response size, retries) and per check
+(pass/fail, duration) to a JSONL file, or to Parquet when the path ends in
+.parquet and pyarrow is installed. Every record carries the run id, so many
+runs can share one file.
+
+The aggregate command turns any number of result files into per-endpoint
+latency histograms and a per-run throughput trend without re-running:
+    python backend_test.py --results runs/backend.jsonl
+    python -m tests.results aggregate runs/*.jsonl
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from tests.load import percentile
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Path parameters of app/api/[[...path]]/route.js, most specific first
+ROUTE_TEMPLATES = [
+    (re.compile(r"^/session/[^/]+/comments$"), "/session/:id/comments"),
+    (re.compile(r"^/session/[^/]+/approval$"), "/session/:id/approval"),
+    (re.compile(r"^/session/[^/]+/events$"), "/session/:id/events"),
+    (re.compile(r"^/session/[^/]+$"), "/session/:id"),
+    (re.compile(r"^/sessions/[^/]+$"), "/sessions/:userId"),
+    (re.compile(r"^/hero/vault/[^/]+$"), "/hero/vault/:userId"),
+    (re.compile(r"^/hero/advocate-recommendations/[^/]+$"), "/hero/advocate-recommendations/:userId"),
+    (re.compile(r"^/autism-profiles/[^/]+/share$"), "/autism-profiles/:id/share"),
+    (re.compile(r"^/autism-profiles/(?!generate$)[^/]+$"), "/autism-profiles/:id"),
+    (re.compile(r"^/students/[^/]+/assign-advocate$"), "/students/:id/assign-advocate"),
+    (re.compile(r"^/students/[^/]+$"), "/students/:id"),
+    (re.compile(r"^/auth/user/[^/]+$"), "/auth/user/:userId")
+]
+
+TIMING_FIELDS = ("connect", "send", "wait", "receive")
+
+
+def endpoint_template(method, url):
+    """'GET /session/:id' for 'http://host/api/session/abc?x=1'"""
+    path = urlsplit(url).path
+    if path.startswith("/api/"):
+        path = path[len("/api"):]
+    for pattern, template in ROUTE_TEMPLATES:
+        if pattern.match(path):
+            path = template
+            break
+    return f"{method} {path}"
+
+
+class ResultsWriter:
+    """Engine observer writing flat result records (thread-safe)"""
+
+    def __init__(self, path, suite, run_id=None):
+        self.path = path
+        self.suite = suite
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.parquet = path.endswith(".parquet")
+        if self.parquet and pyarrow is None:
+            raise RuntimeError("Parquet results need pyarrow (pip install pyarrow); use a .jsonl path instead")
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.handle = None
+        if not self.parquet:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.handle = open(path, "a")
+
+    def __call__(self, record):
+        flat = {
+            "run_id": self.run_id,
+            "suite": self.suite,
+            "ts": datetime.now(timezone.utc).isoformat(),
+            **record
+        }
+        if record["kind"] == "request":
+            flat["endpoint"] = endpoint_template(record["method"], record["url"])
+            flat["query"] = urlsplit(record["url"]).query or None
+            # One column per server phase keeps the records flat for Parquet
+            for phase, duration in flat.pop("server_timing", {}).items():
+                flat[f"server_{phase}"] = duration
+        self.write(flat)
+
+    def write(self, record):
+        with self.lock:
+            if self.parquet:
+                self.buffer.append(record)
+            else:
+                self.handle.write(json.dumps(record, default=str) + "\n")
+
+    def close(self):
+        with self.lock:
+            if self.parquet:
+                _append_parquet(self.path, self.buffer)
+                self.buffer = []
+            elif self.handle:
+                self.handle.close()
+                self.handle = None
+
+
+def _append_parquet(path, records):
+    if not records:
+        return
+    columns = sorted({key for record in records for key in record})
+    table = pyarrow.Table.from_pylist([{key: record.get(key) for key in columns} for record in records])
+    if os.path.exists(path):
+        table = pyarrow.concat_tables([pyarrow.parquet.read_table(path), table], promote_options="default")
+    pyarrow.parquet.write_table(table, path)
+
+
+@contextmanager
+def recording(engine, path, suite):
+    """Write every request and check the engine makes inside the block to `path`
+
+    Adds a closing `run` record with the run's wall time and pass/fail;
+    set `passed` on the yielded dict for the run record. A None path records nothing.
+    """
+    if not path:
+        yield {}
+        return
+    writer = ResultsWriter(path, suite)
+    engine.add_observer(writer)
+    started = time.perf_counter()
+    outcome = {"passed": None}
+    try:
+        yield outcome
+    finally:
+        engine.remove_observer(writer)
+        writer({"kind": "run", "passed": outcome["passed"], "elapsed": time.perf_counter() - started})
+        writer.close()
+        print(f"📝 Results for run {writer.run_id} appended to {path}")
+
+
+# ----- aggregation -----
+
+def load_records(paths):
+    records = []
+    for path in paths:
+        if path.endswith(".parquet"):
+            if pyarrow is None:
+                raise RuntimeError(f"Reading {path} needs pyarrow")
+            records.extend(pyarrow.parquet.read_table(path).to_pylist())
+            continue
+        with open(path) as handle:
+            records.extend(json.loads(line) for line in handle if line.strip())
+    return records
+
+
+def _group_key(record, by):
+    if by == "check":
+        return record.get("check") or "-"
+    label = record.get("variant") or record.get("check")
+    return f"{record['endpoint']} [{label}]" if by == "variant" and label else record["endpoint"]
+
+
+def latency_groups(records, by="endpoint"):
+    """{group: {"latencies", "errors", "sizes", "timings", "server"}} over request records"""
+    groups = {}
+    for record in records:
+        if record.get("kind") != "request":
+            continue
+        group = groups.setdefault(_group_key(record, by), {
+            "latencies": [], "errors": 0, "sizes": [], "timings": {field: [] for field in TIMING_FIELDS},
+            "server": {}
+        })
+        if record.get("ok"):
+            group["latencies"].append(record["elapsed"])
+            if record.get("size") is not None:
+                group["sizes"].append(record["size"])
+            for field in TIMING_FIELDS:
+                if record.get(field) is not None:
+                    group["timings"][field].append(record[field])
+            for key, value in record.items():
+                if key.startswith("server_") and value is not None:
+                    group["server"].setdefault(key[len("server_"):], []).append(value)
+        else:
+            group["errors"] += 1
+    return groups
+
+
+def histogram(values, bins=10):
+    """Log-spaced (upper edge, count) buckets; latencies span orders of magnitude"""
+    if not values:
+        return []
+    low, high = max(min(values), 1e-6), max(values)
+    if high <= low:
+        return [(high, len(values))]
+    ratio = (high / low) ** (1 / bins)
+    edges = [low * ratio ** (i + 1) for i in range(bins)]
+    counts = [0] * bins
+    for value in values:
+        index = min(bins - 1, max(0, math.ceil(math.log(max(value, low) / low, ratio)) - 1))
+        counts[index] += 1
+    return list(zip(edges, counts, strict=True))
+
+
+def run_trend(records):
+    """Per-run summary rows ordered by start time"""
+    runs = {}
+    for record in records:
+        run = runs.setdefault(record["run_id"], {
+            "run_id": record["run_id"], "suite": record.get("suite"), "requests": 0, "errors": 0,
+            "latencies": [], "checks": 0, "checks_passed": 0, "start": None, "end": None, "passed": None
+        })
+        finished = datetime.fromisoformat(record["ts"]).timestamp()
+        begun = finished - (record.get("elapsed") or 0)
+        run["start"] = begun if run["start"] is None else min(run["start"], begun)
+        run["end"] = finished if run["end"] is None else max(run["end"], finished)
+        if record.get("kind") == "request":
+            run["requests"] += 1
+            if record.get("ok"):
+                run["latencies"].append(record["elapsed"])
+            else:
+                run["errors"] += 1
+        elif record.get("kind") == "check":
+            run["checks"] += 1
+            run["checks_passed"] += bool(record.get("passed"))
+        elif record.get("kind") == "run":
+            run["passed"] = record.get("passed")
+
+    rows = sorted(runs.values(), key=lambda run: run["start"])
+    for run in rows:
+        duration = run["end"] - run["start"]
+        run["duration"] = duration
+        run["throughput"] = run["requests"] / duration if duration > 0 else 0.0
+        run["p50"] = percentile(run["latencies"], 50)
+        run["p95"] = percentile(run["latencies"], 95)
+    return rows
+
+
+def print_histograms(groups, bins=10, width=40):
+    print("\n" + "=" * 96)
+    print("📊 LATENCY BY ENDPOINT")
+    print("=" * 96)
+    for name in sorted(groups):
+        group = groups[name]
+        latencies = group["latencies"]
+        mean_size = sum(group["sizes"]) / len(group["sizes"]) if group["sizes"] else 0
+        print(f"\n{name}: {len(latencies)} ok, {group['errors']} errors, p50 {percentile(latencies, 50) * 1000:.1f}ms, "
+              f"p95 {percentile(latencies, 95) * 1000:.1f}ms, mean size {mean_size / 1024:.1f}KB")
+        breakdown = ", ".join(
+            f"{field} {sum(values) / len(values) * 1000:.1f}ms"
+            for field, values in group["timings"].items() if values
+        )
+        if breakdown:
+            print(f"    mean {breakdown}")
+        server = sorted(((phase, sum(values) / len(values)) for phase, values in group["server"].items()),
+                        key=lambda item: item[1], reverse=True)
+        if server:
+            print("    server " + ", ".join(f"{phase} {mean:.1f}ms" for phase, mean in server))
+        buckets = histogram(latencies, bins)
+        peak = max((count for _, count in buckets), default=0)
+        for edge, count in buckets:
+            bar = "█" * (round(count / peak * width) if peak else 0)
+            print(f"    ≤{edge * 1000:>10.1f}ms {count:>6} {bar}")
+
+
+def print_trend(rows):
+    print("\n" + "=" * 96)
+    print("📈 THROUGHPUT BY RUN")
+    print("=" * 96)
+    header = f"{'Started':<21}{'Run':<14}{'Suite':<16}{'Req':>6}{'Err':>6}{'RPS':>8}{'p50 ms':>9}{'p95 ms':>9}{'Checks':>9}"
+    print(header)
+    print("-" * len(header))
+    for run in rows:
+        started = datetime.fromtimestamp(run["start"], timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        checks = f"{run['checks_passed']}/{run['checks']}" if run["checks"] else "-"
+        print(f"{started:<21}{run['run_id']:<14}{(run['suite'] or '-'):<16}{run['requests']:>6}{run['errors']:>6}"
+              f"{run['throughput']:>8.2f}{run['p50'] * 1000:>9.1f}{run['p95'] * 1000:>9.1f}{checks:>9}")
+
+
+def aggregate(paths, by="endpoint", bins=10):
+    records = load_records(paths)
+    print(f"📂 {len(records)} records from {len(paths)} file(s)")
+    print_histograms(latency_groups(records, by), bins)
+    print_trend(run_trend(records))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend test results tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    summarize = commands.add_parser("aggregate", help="latency histograms and throughput trend over result files")
+    summarize.add_argument("paths", nargs="+", help="JSONL or Parquet result files")
+    summarize.add_argument("--by", choices=("endpoint", "variant", "check"), default="endpoint")
+    summarize.add_argument("--bins", type=int, default=10, help="histogram buckets per group")
+    args = parser.parse_args()
+
+    if args.command == "aggregate":
+        aggregate(args.paths, args.by, args.bins)
+
+
+if __name__ == "__main__":
+    main()
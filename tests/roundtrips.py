@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Per-endpoint round-trip accounting (N+1 detector)
+Calls each API endpoint one at a time against a server wired to the local
+stand-ins and diffs their counters around the call, giving the number of
+Supabase, Mongo and OpenAI round-trips every endpoint causes. Endpoints are
+exercised at several result sizes (advocate caseloads) and any endpoint whose
+round-trip count grows with the result size is flagged.
+
+Usage (stand-ins and the Next.js server already running):
+    python -m tests.fake_supabase --caseloads 1,10,100
+    python -m tests.fake_openai
+    python -m tests.mongo_proxy
+    python -m tests.roundtrips --sizes 1,10,100
+"""
+
+import argparse
+import os
+import time
+
+from tests import standins
+from tests.engine import get_engine
+
+API_BASE = f"{os.getenv('NEXT_PUBLIC_BASE_URL', 'http://localhost:3000')}/api"
+
+SOURCES = ("supabase", "mongo", "openai")
+
+PROFILE_INTAKE = {
+    "sensoryPreferences": {"selected": ["auditory"], "calming_strategies": "quiet corner"},
+    "communicationStyle": {"primary_method": "Verbal", "effective_strategies": "visual schedules"},
+    "behavioralTriggers": {"triggers": ["transitions"], "other_triggers": "loud noises"},
+    "homeSupports": "Visual timer",
+    "goals": "Reduce transition anxiety"
+}
+
+
+class Scenario:
+    """One call to account for; `size` is the result size it was set up with"""
+
+    def __init__(self, endpoint, method, path, user=None, body=None, size=None):
+        self.endpoint = endpoint
+        self.method = method
+        self.path = path
+        self.user = user
+        self.body = body
+        self.size = size
+
+
+def default_scenarios(sizes):
+    """Every endpoint the two suites exercise, plus caseload-scaled advocate reads"""
+    scenarios = [
+        Scenario("GET /students (parent)", "GET", "/students", user="parent_sarah"),
+        Scenario("GET /autism-profiles (parent)", "GET", "/autism-profiles", user="parent_sarah"),
+        Scenario("POST /autism-profiles/generate (free)", "POST", "/autism-profiles/generate",
+                 user="parent_sarah", body={"studentId": "child_emma", **PROFILE_INTAKE}),
+        Scenario("POST /autism-profiles/generate (hero)", "POST", "/autism-profiles/generate",
+                 user="parent_mike", body={"studentId": "child_david", **PROFILE_INTAKE}),
+        Scenario("POST /accommodations/generate (parent)", "POST", "/accommodations/generate",
+                 user="parent_sarah", body={"studentId": "child_emma"}),
+        Scenario("POST /accommodations/generate (advocate)", "POST", "/accommodations/generate",
+                 user="advocate_maria", body={"studentId": "child_david"}),
+        Scenario("POST /accommodations/generate/batch", "POST", "/accommodations/generate/batch",
+                 user="advocate_maria",
+                 body={"students": [{"studentId": s} for s in ("child_emma", "child_alex", "child_david")]}),
+        Scenario("GET /accommodations", "GET", "/accommodations", user="parent_sarah"),
+        Scenario("POST /auth/check-plan", "POST", "/auth/check-plan",
+                 body={"userId": "parent_mike", "requiredPlan": "hero", "feature": "advanced_review"}),
+        Scenario("GET /sessions/:userId (parent)", "GET", "/sessions/parent_sarah"),
+        Scenario("GET /sessions/:userId (advocate)", "GET", "/sessions/advocate_maria"),
+        Scenario("POST /logging/advocate-match", "POST", "/logging/advocate-match",
+                 body={"parentId": "parent_sarah", "advocateId": "advocate_maria", "matchReason": "roundtrip-report"})
+    ]
+    for size in sizes:
+        advocate = f"advocate_caseload_{size}"
+        scenarios.append(Scenario("GET /students (advocate)", "GET", "/students", user=advocate, size=size))
+        scenarios.append(Scenario("GET /autism-profiles (advocate)", "GET", "/autism-profiles", user=advocate, size=size))
+    return scenarios
+
+
+def _result_count(response):
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    if isinstance(data, list):
+        return len(data)
+    for key in ("students", "profiles", "accommodations"):
+        if isinstance(data, dict) and isinstance(data.get(key), list):
+            return len(data[key])
+    return None
+
+
+def account(scenario, engine, settle=0.05):
+    """Call one scenario and return its round-trip record"""
+    headers = standins.token_headers(scenario.user) if scenario.user else {"Content-Type": "application/json"}
+    before = standins.snapshot()
+    started = time.perf_counter()
+    try:
+        response = engine.request(scenario.method, f"{API_BASE}{scenario.path}", json=scenario.body,
+                                  headers=headers, timeout=120)
+        status = response.status_code
+        results = _result_count(response)
+    except Exception as e:
+        print(f"❌ {scenario.endpoint}: Request failed - {e}")
+        status = None
+        results = None
+    elapsed = time.perf_counter() - started
+    # Let fire-and-forget writes (event logging) land before reading the counters
+    time.sleep(settle)
+    delta = standins.diff(before, standins.snapshot())
+    return {
+        "endpoint": scenario.endpoint,
+        "size": scenario.size,
+        "status": status,
+        "results": results,
+        "latency": elapsed,
+        "roundtrips": {source: (delta[source]["total"] if delta[source] else None) for source in SOURCES},
+        "detail": {source: (delta[source]["detail"] if delta[source] else {}) for source in SOURCES}
+    }
+
+
+def find_scaling(records):
+    """Endpoints whose round-trips grow with result size: {endpoint: [sources]}"""
+    by_endpoint = {}
+    for record in records:
+        if record["size"] is not None and record["status"] == 200:
+            by_endpoint.setdefault(record["endpoint"], []).append(record)
+
+    flagged = {}
+    for endpoint, rows in by_endpoint.items():
+        rows.sort(key=lambda r: r["size"])
+        if len(rows) < 2:
+            continue
+        smallest, largest = rows[0]["roundtrips"], rows[-1]["roundtrips"]
+        growing = [
+            source for source in SOURCES
+            if smallest[source] is not None and largest[source] is not None and largest[source] > smallest[source]
+        ]
+        if growing:
+            flagged[endpoint] = growing
+    return flagged
+
+
+def print_report(records, flagged):
+    print("\n" + "=" * 96)
+    print("🔁 ROUND-TRIP ACCOUNTING")
+    print("=" * 96)
+    header = f"{'Endpoint':<44}{'Size':>6}{'Status':>8}{'Rows':>6}{'Supabase':>10}{'Mongo':>7}{'OpenAI':>8}{'ms':>8}"
+    print(header)
+    print("-" * len(header))
+
+    def cell(value):
+        return "-" if value is None else str(value)
+
+    for record in records:
+        trips = record["roundtrips"]
+        print(
+            f"{record['endpoint']:<44}{cell(record['size']):>6}{cell(record['status']):>8}{cell(record['results']):>6}"
+            f"{cell(trips['supabase']):>10}{cell(trips['mongo']):>7}{cell(trips['openai']):>8}"
+            f"{record['latency'] * 1000:>8.0f}"
+        )
+        details = ", ".join(f"{key}: {count}" for source in SOURCES for key, count in record["detail"][source].items())
+        if details:
+            print(f"    {details}")
+
+    print()
+    if flagged:
+        for endpoint, sources in flagged.items():
+            print(f"⚠️  {endpoint}: {', '.join(sources)} round-trips grow with result size (N+1 suspect)")
+    else:
+        print("✅ No endpoint's round-trip count grows with result size")
+
+
+def run_roundtrip_report(sizes=(1, 10, 100), scenarios=None):
+    """Account every scenario and print the table; returns (records, flagged)"""
+    unavailable = [source for source in SOURCES if not standins.available(source)]
+    if unavailable:
+        print(f"⚠️  Stand-ins not reachable, their columns will show '-': {', '.join(unavailable)}")
+
+    engine = get_engine()
+    records = [account(scenario, engine) for scenario in (scenarios or default_scenarios(sizes))]
+    flagged = find_scaling(records)
+    print_report(records, flagged)
+    return records, flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-endpoint Supabase/Mongo/OpenAI round-trip report")
+    parser.add_argument("--sizes", default="1,10,100", help="advocate caseload sizes seeded in the fake Supabase")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    _, flagged = run_roundtrip_report(sizes)
+    exit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Per-phase server latency breakdown from Server-Timing headers
+route.js reports the phases of every request (auth, Supabase lookups, OpenAI
+calls, JSON parsing, inserts, Mongo) in a Server-Timing header. The engine
+parses it into each request record (parse_server_timing); PhaseBreakdown
+collects those records and prints, per endpoint, where the server spent its
+time.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from tests.results import endpoint_template
+
+
+class PhaseBreakdown:
+    """Engine observer averaging Server-Timing phases per endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def __call__(self, record):
+        if record["kind"] != "request" or not record.get("server_timing"):
+            return
+        endpoint = endpoint_template(record["method"], record["url"])
+        with self.lock:
+            stats = self.endpoints.setdefault(endpoint, {"n": 0, "client": 0.0, "phases": {}})
+            stats["n"] += 1
+            stats["client"] += record["elapsed"] * 1000
+            for phase, duration in record["server_timing"].items():
+                stats["phases"][phase] = stats["phases"].get(phase, 0.0) + duration
+
+    def rows(self):
+        """(endpoint, n, client ms, server total ms, [(phase, mean ms)] slowest first)"""
+        rows = []
+        for endpoint, stats in sorted(self.endpoints.items()):
+            n = stats["n"]
+            means = {phase: total / n for phase, total in stats["phases"].items()}
+            server = means.pop("total", None)
+            rows.append((endpoint, n, stats["client"] / n, server,
+                         sorted(means.items(), key=lambda item: item[1], reverse=True)))
+        return rows
+
+    def print_report(self):
+        rows = self.rows()
+        if not rows:
+            print("\nℹ️  No Server-Timing headers seen; per-phase breakdown unavailable")
+            return
+        print("\n" + "=" * 70)
+        print("🧩 SERVER PHASE BREAKDOWN (mean per request)")
+        print("=" * 70)
+        for endpoint, n, client, server, phases in rows:
+            server_text = f"{server:.0f}ms" if server is not None else "-"
+            print(f"{endpoint} ×{n}: client {client:.0f}ms, server {server_text}")
+            for phase, mean in phases:
+                share = f" ({mean / server:.0%})" if server else ""
+                print(f"    {phase:<24}{mean:>9.1f}ms{share}")
+
+
+@contextmanager
+def phase_breakdown(engine):
+    """Collect Server-Timing phases for requests made in the block, then print them"""
+    breakdown = PhaseBreakdown()
+    engine.add_observer(breakdown)
+    try:
+        yield breakdown
+    finally:
+        engine.remove_observer(breakdown)
+        breakdown.print_report()
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Soak mode: hours of mixed traffic with memory and connection-leak tracking
+Drives a weighted mix of generate, history, sessions, comments and vault
+requests against a server wired to the local stand-ins, and every --interval
+samples the server process (RSS, open fds and sockets from /proc), the Mongo
+connection count (serverStatus, or the Mongo proxy's open connections) and
+the interval's error rate and p95. After the warmup the samples are split
+into windows; a metric whose window medians rise monotonically by more than
+its threshold is reported as a leak and fails the run.
+
+Usage (stand-ins and the Next.js server already running):
+    python -m tests.fake_supabase
+    python -m tests.fake_openai
+    python -m tests.mongo_proxy
+    python -m tests.soak --duration 4h --concurrency 8 --rate 20
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import random
+import statistics
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+from tests import standins
+from tests.engine import HttpEngine
+from tests.load import percentile
+
+try:
+    from pymongo import MongoClient
+except ImportError:
+    MongoClient = None
+
+API_BASE = f"{os.getenv('NEXT_PUBLIC_BASE_URL', 'http://localhost:3000')}/api"
+MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
+
+# metric: (relative growth, absolute floor) a monotonic rise must exceed to count as a leak
+LEAK_THRESHOLDS = {
+    "rss": (0.20, 64 * 1024 * 1024),
+    "fds": (0.50, 50),
+    "sockets": (0.50, 20),
+    "mongo_connections": (0.50, 10)
+}
+
+
+class SoakTarget:
+    """A weighted request shape; `path` and `body` may be callables of the run state
+
+    A callable path returning None skips the pick (e.g. no session id known yet).
+    `collect(state, response)` lets a target feed ids to the others.
+    """
+
+    def __init__(self, name, method, path, weight=1, body=None, user=None, collect=None, timeout=60):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.weight = weight
+        self.body = body
+        self.user = user
+        self.collect = collect
+        self.timeout = timeout
+
+    def resolve(self, state):
+        path = self.path(state) if callable(self.path) else self.path
+        body = self.body(state) if callable(self.body) else self.body
+        return path, body
+
+    @property
+    def headers(self):
+        return standins.token_headers(self.user) if self.user else {"Content-Type": "application/json"}
+
+
+def _collect_sessions(state, response):
+    if response.status_code == 200:
+        ids = [session["id"] for session in response.json() if session.get("id")]
+        if ids:
+            state["session_ids"] = ids
+
+
+def _session_path(suffix=""):
+    def path(state):
+        ids = state.get("session_ids")
+        return f"/session/{state['rng'].choice(ids)}{suffix}" if ids else None
+    return path
+
+
+def default_targets():
+    """The mix a parent/advocate day produces, weighted towards reads"""
+    return [
+        SoakTarget("generate", "POST", "/accommodations/generate", weight=1, user="parent_sarah",
+                   body={"studentId": "child_emma", "bypassCache": True}),
+        SoakTarget("generate (cached)", "POST", "/accommodations/generate", weight=2, user="parent_sarah",
+                   body={"studentId": "child_emma"}),
+        SoakTarget("students", "GET", "/students", weight=2, user="parent_sarah"),
+        SoakTarget("history", "GET", "/accommodations?limit=50", weight=4, user="parent_sarah"),
+        SoakTarget("sessions", "GET", "/sessions/parent_sarah", weight=3, collect=_collect_sessions),
+        SoakTarget("session", "GET", _session_path(), weight=3),
+        SoakTarget("comment", "POST", _session_path("/comments"), weight=2,
+                   body=lambda state: {"text": f"Soak comment {state['rng'].random():.6f}", "userId": "parent_sarah"}),
+        SoakTarget("vault", "GET", "/hero/vault/parent_mike", weight=2)
+    ]
+
+
+# ----- process and pool sampling -----
+
+def find_listening_pid(port):
+    """PID of the local process listening on `port` (Linux /proc), or None"""
+    inodes = set()
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as handle:
+                next(handle)
+                for line in handle:
+                    fields = line.split()
+                    # st 0A is LISTEN; local address is HEXIP:HEXPORT
+                    if fields[3] == "0A" and int(fields[1].rsplit(":", 1)[1], 16) == port:
+                        inodes.add(fields[9])
+        except OSError:
+            continue
+    if not inodes:
+        return None
+
+    targets = {f"socket:[{inode}]" for inode in inodes}
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            for fd in os.listdir(f"/proc/{pid}/fd"):
+                if os.readlink(f"/proc/{pid}/fd/{fd}") in targets:
+                    return int(pid)
+        except OSError:
+            continue
+    return None
+
+
+def process_stats(pid):
+    """RSS bytes plus open fd and socket counts for `pid` (None values if unreadable)"""
+    stats = {"rss": None, "fds": None, "sockets": None}
+    if pid is None:
+        return stats
+    try:
+        with open(f"/proc/{pid}/status") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    stats["rss"] = int(line.split()[1]) * 1024
+                    break
+        links = []
+        for fd in os.listdir(f"/proc/{pid}/fd"):
+            try:
+                links.append(os.readlink(f"/proc/{pid}/fd/{fd}"))
+            except OSError:
+                continue
+        stats["fds"] = len(links)
+        stats["sockets"] = sum(1 for link in links if link.startswith("socket:"))
+    except OSError:
+        pass
+    return stats
+
+
+class MongoConnections:
+    """Current Mongo connection count: serverStatus when pymongo is available,
+    else the Mongo proxy's open client connections"""
+
+    def __init__(self, mongo_url=MONGO_URL):
+        self.client = None
+        if MongoClient is not None:
+            try:
+                self.client = MongoClient(mongo_url, serverSelectionTimeoutMS=2000)
+                self.client.admin.command("ping")
+            except Exception:
+                self.client = None
+
+    @property
+    def source(self):
+        return "serverStatus" if self.client else "mongo proxy"
+
+    def current(self):
+        if self.client:
+            try:
+                # Our own client holds one of these; it is constant over the run
+                return self.client.admin.command("serverStatus")["connections"]["current"]
+            except Exception:
+                return None
+        try:
+            response = httpx.get(f"{standins.MONGO_PROXY_URL}/__stats", timeout=5)
+            return response.json().get("connections", {}).get("open")
+        except (httpx.HTTPError, ValueError):
+            return None
+
+    def close(self):
+        if self.client:
+            self.client.close()
+
+
+# ----- traffic -----
+
+class Window:
+    """Request outcomes since the last sample"""
+
+    def __init__(self):
+        self.latencies = []
+        self.requests = 0
+        self.errors = 0
+
+
+async def _worker(engine, targets, weights, state, deadline, pacing):
+    rng = state["rng"]
+    while time.monotonic() < deadline:
+        if pacing is not None:
+            slot = pacing["next"]
+            pacing["next"] = max(slot, time.monotonic()) + pacing["gap"]
+            delay = slot - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        target = rng.choices(targets, weights)[0]
+        path, body = target.resolve(state)
+        if path is None:
+            await asyncio.sleep(0)
+            continue
+
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = await engine.arequest(target.method, f"{API_BASE}{path}", json=body,
+                                             headers=target.headers, timeout=target.timeout)
+            ok = response.status_code < 400
+            if target.collect:
+                target.collect(state, response)
+        except Exception:
+            pass
+        window = state["window"]
+        window.requests += 1
+        if ok:
+            window.latencies.append(time.perf_counter() - started)
+        else:
+            window.errors += 1
+
+
+async def _sampler(pid, mongo, state, started, deadline, interval, on_sample):
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(max(0.0, min(interval, deadline - time.monotonic())))
+        window, state["window"] = state["window"], Window()
+        sample = {"t": time.monotonic() - started}
+        sample.update(process_stats(pid))
+        sample["mongo_connections"] = await loop.run_in_executor(None, mongo.current)
+        sample["requests"] = window.requests
+        sample["errors"] = window.errors
+        sample["p95"] = percentile(window.latencies, 95)
+        on_sample(sample)
+        if time.monotonic() >= deadline:
+            return
+
+
+async def _soak(engine, targets, pid, mongo, duration, concurrency, rate, interval, seed, on_sample):
+    state = {"rng": random.Random(seed), "window": Window()}
+    weights = [target.weight for target in targets]
+    started = time.monotonic()
+    deadline = started + duration
+    pacing = {"next": started, "gap": 1.0 / rate} if rate else None
+    sampler = asyncio.create_task(_sampler(pid, mongo, state, started, deadline, interval, on_sample))
+    await asyncio.gather(*(
+        _worker(engine, targets, weights, state, deadline, pacing) for _ in range(concurrency)
+    ))
+    await sampler
+
+
+# ----- leak detection -----
+
+def detect_growth(samples, metric, warmup=0.0, windows=5, thresholds=LEAK_THRESHOLDS):
+    """Trend of one metric after warmup: window medians, growth and leak verdict
+
+    Returns None when there are too few samples to split into `windows`.
+    """
+    values = [(s["t"], s[metric]) for s in samples if s["t"] >= warmup and s.get(metric) is not None]
+    if len(values) < windows * 2:
+        return None
+
+    size = len(values) / windows
+    medians = [
+        statistics.median(value for _, value in values[int(i * size):int((i + 1) * size)])
+        for i in range(windows)
+    ]
+    monotonic = all(later >= earlier for earlier, later in zip(medians, medians[1:], strict=False))
+    growth = medians[-1] - medians[0]
+    relative, floor = thresholds[metric]
+    limit = max(floor, relative * medians[0])
+
+    # Least-squares slope, reported per hour
+    mean_t = statistics.fmean(t for t, _ in values)
+    mean_v = statistics.fmean(value for _, value in values)
+    spread = sum((t - mean_t) ** 2 for t, _ in values)
+    slope = sum((t - mean_t) * (value - mean_v) for t, value in values) / spread if spread else 0.0
+
+    return {
+        "medians": medians,
+        "growth": growth,
+        "limit": limit,
+        "per_hour": slope * 3600,
+        "leak": monotonic and growth > limit
+    }
+
+
+def analyze(samples, warmup=0.0, windows=5):
+    return {metric: detect_growth(samples, metric, warmup, windows) for metric in LEAK_THRESHOLDS}
+
+
+# ----- reporting -----
+
+def _fmt(metric, value):
+    if value is None:
+        return "-"
+    if metric == "rss":
+        return f"{value / (1024 * 1024):.1f}MB"
+    return f"{value:.0f}" if isinstance(value, float) else str(value)
+
+
+def print_sample(sample):
+    error_rate = sample["errors"] / sample["requests"] if sample["requests"] else 0.0
+    print(f"⏱️  {sample['t'] / 60:7.1f}m  rss {_fmt('rss', sample['rss']):>9}  fds {_fmt('fds', sample['fds']):>5}"
+          f"  sockets {_fmt('sockets', sample['sockets']):>5}  mongo {_fmt('mongo', sample['mongo_connections']):>4}"
+          f"  req {sample['requests']:>6}  err {error_rate:6.2%}  p95 {sample['p95'] * 1000:7.1f}ms", flush=True)
+
+
+def print_report(samples, verdicts, warmup):
+    print("\n" + "=" * 96)
+    print("🧪 SOAK SUMMARY")
+    print("=" * 96)
+    requests = sum(sample["requests"] for sample in samples)
+    errors = sum(sample["errors"] for sample in samples)
+    elapsed = samples[-1]["t"] if samples else 0
+    print(f"{requests} requests, {errors} errors in {elapsed / 60:.1f} minutes ({len(samples)} samples, "
+          f"warmup {warmup / 60:.1f} minutes excluded from trends)")
+
+    header = f"{'Metric':<20}{'First window':>14}{'Last window':>14}{'Growth':>12}{'Limit':>12}{'Per hour':>12}"
+    print(header)
+    print("-" * len(header))
+    for metric, verdict in verdicts.items():
+        if verdict is None:
+            print(f"{metric:<20}{'not enough samples':>26}")
+            continue
+        flag = "  ⚠️  leak" if verdict["leak"] else ""
+        print(f"{metric:<20}{_fmt(metric, verdict['medians'][0]):>14}{_fmt(metric, verdict['medians'][-1]):>14}"
+              f"{_fmt(metric, verdict['growth']):>12}{_fmt(metric, verdict['limit']):>12}"
+              f"{_fmt(metric, verdict['per_hour']):>12}{flag}")
+
+
+def write_csv(samples, path):
+    with open(path, "w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=list(samples[0].keys()))
+        writer.writeheader()
+        writer.writerows(samples)
+
+
+def parse_duration(text):
+    """'90s', '30m', '4h' or plain seconds"""
+    units = {"s": 1, "m": 60, "h": 3600}
+    text = str(text).strip().lower()
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def run_soak(duration=3600, concurrency=8, rate=None, interval=30, warmup=300, windows=5,
+             pid=None, seed=0, max_error_rate=0.01, csv_path=None, targets=None):
+    """Drive mixed traffic for `duration` seconds; returns (passed, samples, verdicts)"""
+    port = urlsplit(API_BASE).port or 80
+    pid = pid or find_listening_pid(port)
+    if pid is None:
+        print(f"⚠️  No local process listening on port {port}; RSS/fd/socket columns will show '-'")
+    else:
+        print(f"🔍 Sampling server pid {pid} (port {port})")
+
+    mongo = MongoConnections()
+    print(f"🍃 Mongo connections from {mongo.source}")
+    unavailable = [source for source in standins.SOURCES if not standins.available(source)]
+    if unavailable:
+        print(f"⚠️  Stand-ins not reachable: {', '.join(unavailable)} - their calls will hit the real services or fail")
+
+    samples = []
+
+    def on_sample(sample):
+        samples.append(sample)
+        print_sample(sample)
+
+    engine = HttpEngine(max_connections=concurrency, max_per_host=concurrency)
+    try:
+        engine.run(_soak(engine, targets or default_targets(), pid, mongo, duration, concurrency,
+                         rate, interval, seed, on_sample))
+    finally:
+        engine.close()
+        mongo.close()
+
+    verdicts = analyze(samples, warmup, windows)
+    print_report(samples, verdicts, warmup)
+    if csv_path and samples:
+        write_csv(samples, csv_path)
+        print(f"📝 Samples written to {csv_path}")
+
+    requests = sum(sample["requests"] for sample in samples)
+    error_rate = sum(sample["errors"] for sample in samples) / requests if requests else 1.0
+    leaks = [metric for metric, verdict in verdicts.items() if verdict and verdict["leak"]]
+
+    print()
+    if leaks:
+        print(f"❌ Monotonic growth beyond threshold: {', '.join(leaks)}")
+    if error_rate > max_error_rate:
+        print(f"❌ Error rate {error_rate:.2%} above {max_error_rate:.2%}")
+    passed = not leaks and error_rate <= max_error_rate
+    if passed:
+        print("✅ No leak detected")
+    return passed, samples, verdicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running mixed traffic with leak detection")
+    parser.add_argument("--duration", default="1h", help="how long to run, e.g. 90s, 30m, 4h")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight")
+    parser.add_argument("--rate", type=float, default=None, help="arrival rate in requests/second (default: closed loop)")
+    parser.add_argument("--interval", default="30s", help="time between samples")
+    parser.add_argument("--warmup", default="5m", help="initial period excluded from trends")
+    parser.add_argument("--windows", type=int, default=5, help="windows the post-warmup samples are split into")
+    parser.add_argument("--pid", type=int, default=None, help="server pid (default: whoever listens on the API port)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the traffic mix")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--csv", default=None, help="write every sample to this CSV file")
+    args = parser.parse_args()
+
+    passed, _, _ = run_soak(
+        duration=parse_duration(args.duration), concurrency=args.concurrency, rate=args.rate,
+        interval=parse_duration(args.interval), warmup=parse_duration(args.warmup), windows=args.windows,
+        pid=args.pid, seed=args.seed, max_error_rate=args.max_error_rate, csv_path=args.csv
+    )
+    exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
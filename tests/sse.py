@@ -0,0 +1,110 @@
+"""
+Server-sent event client for the streaming endpoints
+Parses `event:`/`data:` frames incrementally from HttpEngine.iter_lines (or
+aiter_lines, for many concurrent subscriptions) and times the milestones a
+user actually waits for: first frame, first token, first complete paragraph,
+insights, and the final `done` event.
+"""
+
+import json
+import time
+
+
+class FrameParser:
+    """Feed lines one at a time; `feed` returns (event, data) when a frame completes"""
+
+    def __init__(self):
+        self.event, self.data_lines = "message", []
+        self.last_id = None
+
+    def feed(self, line):
+        if line == "":
+            frame = None
+            if self.data_lines:
+                raw = "\n".join(self.data_lines)
+                try:
+                    data = json.loads(raw)
+                except ValueError:
+                    data = raw
+                frame = (self.event, data)
+            self.event, self.data_lines = "message", []
+            return frame
+        if line.startswith(":"):
+            # comment / heartbeat
+            return None
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "event":
+            self.event = value
+        elif field == "data":
+            self.data_lines.append(value)
+        elif field == "id":
+            self.last_id = value
+        return None
+
+
+def iter_events(engine, url, json_body=None, headers=None, timeout=90, method="POST"):
+    """Yield (event, data) as each SSE frame completes; data is JSON-decoded when possible"""
+    lines = engine.iter_lines(method, url, keep_blank=True, json=json_body, headers=headers, timeout=timeout)
+    parser = FrameParser()
+    try:
+        for line in lines:
+            frame = parser.feed(line)
+            if frame:
+                yield frame
+    finally:
+        lines.close()
+
+
+async def aiter_events(engine, url, headers=None, timeout=90, method="GET"):
+    """Async iter_events for subscriptions held open on the engine loop"""
+    parser = FrameParser()
+    async for line in engine.aiter_lines(method, url, keep_blank=True, headers=headers, timeout=timeout):
+        frame = parser.feed(line)
+        if frame:
+            yield frame
+
+
+def measure_stream(engine, url, json_body=None, headers=None, timeout=90):
+    """Consume a generation stream and return its timings (seconds from request start)
+
+    `first_event` is the time to the first frame the server flushes (its
+    `meta` event, sent before any OpenAI work), i.e. the time to first byte
+    as the user perceives it.
+    """
+    timings = {
+        "first_event": None, "first_token": None, "first_paragraph": None, "insights": None, "total": None,
+        "events": {}, "paragraphs": [], "text": "", "result": None, "error": None
+    }
+    started = time.perf_counter()
+    for event, data in iter_events(engine, url, json_body, headers, timeout):
+        elapsed = time.perf_counter() - started
+        timings["events"][event] = timings["events"].get(event, 0) + 1
+        if timings["first_event"] is None:
+            timings["first_event"] = elapsed
+        if event == "token":
+            if timings["first_token"] is None:
+                timings["first_token"] = elapsed
+            timings["text"] += data["text"]
+        elif event == "paragraph":
+            if timings["first_paragraph"] is None:
+                timings["first_paragraph"] = elapsed
+            timings["paragraphs"].append(data["text"])
+        elif event == "insights":
+            timings["insights"] = elapsed
+        elif event == "done":
+            timings["result"] = data
+        elif event == "error":
+            timings["error"] = data
+    timings["total"] = time.perf_counter() - started
+    return timings
+
+
+def format_timings(timings):
+    def ms(value):
+        return "-" if value is None else f"{value * 1000:.0f}ms"
+
+    return (f"first event {ms(timings['first_event'])}, first token {ms(timings['first_token'])}, "
+            f"first paragraph {ms(timings['first_paragraph'])}, insights {ms(timings['insights'])}, "
+            f"total {ms(timings['total'])}")
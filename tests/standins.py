@@ -0,0 +1,76 @@
+"""
+Client side of the local stand-ins (fake OpenAI, fake Supabase, Mongo proxy)
+Reads their round-trip counters so a check can diff them around a call.
+Stand-ins that are not running are reported as None rather than failing.
+"""
+
+import os
+
+import httpx
+
+FAKE_OPENAI_URL = os.getenv("FAKE_OPENAI_URL", "http://127.0.0.1:8089")
+FAKE_SUPABASE_URL = os.getenv("FAKE_SUPABASE_URL", "http://127.0.0.1:8090")
+MONGO_PROXY_URL = os.getenv("MONGO_PROXY_URL", "http://127.0.0.1:8091")
+
+SOURCES = {
+    "supabase": (FAKE_SUPABASE_URL, "total", "by_operation"),
+    "mongo": (MONGO_PROXY_URL, "total", "by_command"),
+    "openai": (FAKE_OPENAI_URL, "requests", "by_kind")
+}
+
+
+def token_headers(user_id):
+    """Auth headers accepted by the fake Supabase for a seeded user"""
+    return {"Content-Type": "application/json", "Authorization": f"Bearer token-{user_id}"}
+
+
+def _fetch(url):
+    try:
+        response = httpx.get(f"{url}/__stats", timeout=5)
+        return response.json() if response.status_code == 200 else None
+    except httpx.HTTPError:
+        return None
+
+
+def snapshot():
+    """Current counters of every reachable stand-in: {source: {"total", "detail"}}"""
+    counters = {}
+    for source, (url, total_key, detail_key) in SOURCES.items():
+        stats = _fetch(url)
+        counters[source] = None if stats is None else {
+            "total": stats.get(total_key, 0),
+            "detail": dict(stats.get(detail_key, {}))
+        }
+    return counters
+
+
+def diff(before, after):
+    """Round-trips made between two snapshots: {source: {"total", "detail"}} (None if unavailable)"""
+    delta = {}
+    for source in SOURCES:
+        if before.get(source) is None or after.get(source) is None:
+            delta[source] = None
+            continue
+        detail = {}
+        for key, count in after[source]["detail"].items():
+            change = count - before[source]["detail"].get(key, 0)
+            if change:
+                detail[key] = change
+        delta[source] = {"total": after[source]["total"] - before[source]["total"], "detail": detail}
+    return delta
+
+
+def stats(source):
+    """Full /__stats document of one stand-in, or None if it is not running"""
+    return _fetch(SOURCES[source][0])
+
+
+def configure_openai(**settings):
+    """Change fake OpenAI behaviour at runtime (latency, rate_limit_ratio, ...)"""
+    response = httpx.post(f"{FAKE_OPENAI_URL}/__config", json=settings, timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+
+def available(source):
+    return _fetch(SOURCES[source][0]) is not None